@@ -8,6 +8,7 @@ import os
 import logging
 from sqlalchemy import text
 from app.utils.logger import logger
+from app.utils.db_pool import engine_options, pool_metrics
 import traceback
 
 db = SQLAlchemy()
@@ -88,24 +89,38 @@ def create_app(test_config=None):
     if test_config is None:
         # Load the instance config, if it exists, when not testing
         app.config.from_object('config.Config')
+        if os.getenv('FLASK_ENV') == 'production' and os.getenv('AWS_SECRET_NAME'):
+            # Database credentials from Secrets Manager, fetched once per process
+            from .config import ProductionConfig
+            ProductionConfig.init_app(app)
     else:
         # Load the test config if passed in
         app.config.update(test_config)
 
+    # Pool sizing per deployment profile, unless the config sets engine options itself
+    if 'SQLALCHEMY_ENGINE_OPTIONS' not in app.config:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config.get('SQLALCHEMY_DATABASE_URI'), app.config)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
 
+    # Initialize filter suggestions cache
+    from .services.suggestions_cache import suggestions_cache
+    suggestions_cache.init_app(app)
+
     # Initialize Celery
     from .celery_app import create_celery_app
     celery = create_celery_app(app)
     app.celery = celery
 
     # Register blueprints
-    from .routes import auth, applications, departments
+    from .routes import auth, applications, audit_logs, dashboard, departments
     app.register_blueprint(auth.bp)
     app.register_blueprint(applications.bp)
+    app.register_blueprint(audit_logs.bp)
+    app.register_blueprint(dashboard.bp)
     app.register_blueprint(departments.bp)
 
     # Add health check endpoint
@@ -117,6 +132,7 @@ def create_app(test_config=None):
             return jsonify({
                 'status': 'healthy',
                 'database': 'connected',
+                'database_pool': pool_metrics.snapshot(db.engine),
                 'timestamp': datetime.utcnow().isoformat()
             }), 200
         except Exception as e:
@@ -127,16 +143,6 @@ def create_app(test_config=None):
                 'timestamp': datetime.utcnow().isoformat()
             }), 500
 
-    # Schedule periodic tasks
-    with app.app_context():
-        logger.info("Setting up periodic tasks")
-        celery.conf.beat_schedule = {
-            'check-applications-every-5-minutes': {
-                'task': 'tasks.schedule_health_checks',
-                'schedule': 300.0,  # 5 minutes
-            },
-        }
-
     return app
 
 __all__ = ['db', 'migrate', 'jwt', 'create_app']
\ No newline at end of file
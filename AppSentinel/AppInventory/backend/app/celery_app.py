@@ -1,13 +1,62 @@
+import os
 from celery import Celery
-from flask import Flask
+from flask import Flask, has_app_context
+from kombu import Queue
+
+# Queues per workload class. Interactive tasks are triggered by users for
+# a single application and must not wait behind fleet-wide sweeps, so each
+# queue gets its own worker (see docker-compose.yml).
+INTERACTIVE_QUEUE = 'interactive'
+BULK_QUEUE = 'bulk'
+
+# Redis emulates priorities with one list per step; 0 is consumed first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 3
+PRIORITY_LOW = 6
+PRIORITY_STEPS = [PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, 9]
+
+TASK_ROUTES = {
+    'tasks.check_application_health': {'queue': INTERACTIVE_QUEUE, 'priority': PRIORITY_HIGH},
+    'tasks.update_application_metadata': {'queue': INTERACTIVE_QUEUE, 'priority': PRIORITY_HIGH},
+    'tasks.check_applications_health': {'queue': BULK_QUEUE, 'priority': PRIORITY_NORMAL},
+    'tasks.update_applications_metadata': {'queue': BULK_QUEUE, 'priority': PRIORITY_LOW},
+    'tasks.schedule_health_checks': {'queue': BULK_QUEUE, 'priority': PRIORITY_NORMAL},
+    'tasks.schedule_metadata_updates': {'queue': BULK_QUEUE, 'priority': PRIORITY_LOW},
+    'tasks.downsample_health_probes': {'queue': BULK_QUEUE, 'priority': PRIORITY_LOW},
+    'tasks.ensure_audit_partitions': {'queue': BULK_QUEUE, 'priority': PRIORITY_NORMAL},
+    'tasks.archive_audit_logs': {'queue': BULK_QUEUE, 'priority': PRIORITY_LOW},
+}
+
+BEAT_SCHEDULE = {
+    'check-applications-every-5-minutes': {
+        'task': 'tasks.schedule_health_checks',
+        'schedule': 300.0,  # 5 minutes
+    },
+    'update-metadata-daily': {
+        'task': 'tasks.schedule_metadata_updates',
+        'schedule': 86400.0,  # 1 day
+    },
+    'downsample-health-probes-hourly': {
+        'task': 'tasks.downsample_health_probes',
+        'schedule': 3600.0,  # 1 hour
+    },
+    'ensure-audit-partitions-daily': {
+        'task': 'tasks.ensure_audit_partitions',
+        'schedule': 86400.0,  # 1 day
+    },
+    'archive-audit-logs-daily': {
+        'task': 'tasks.archive_audit_logs',
+        'schedule': 86400.0,  # 1 day
+    },
+}
 
 def create_celery_app(app: Flask = None):
     """Create and configure Celery instance"""
-    
+
     celery = Celery(
         'AppInventory',
-        broker='redis://redis:6379/0',
-        backend='redis://redis:6379/0',
+        broker=os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0'),
+        backend=os.environ.get('CELERY_RESULT_BACKEND', 'redis://redis:6379/0'),
         include=['app.tasks']
     )
 
@@ -20,20 +69,45 @@ def create_celery_app(app: Flask = None):
         enable_utc=True,
         task_track_started=True,
         task_time_limit=30 * 60,  # 30 minutes
+        task_queues=[Queue(INTERACTIVE_QUEUE), Queue(BULK_QUEUE)],
+        task_default_queue=INTERACTIVE_QUEUE,
+        task_default_priority=PRIORITY_NORMAL,
+        task_routes=TASK_ROUTES,
+        broker_transport_options={
+            'priority_steps': PRIORITY_STEPS,
+            'sep': ':',
+            'queue_order_strategy': 'priority',
+        },
+        # Acknowledge after running and reserve one task at a time, so a long
+        # sweep chunk never holds back tasks another worker process could run
+        task_acks_late=True,
         worker_prefetch_multiplier=1,
-        worker_concurrency=2
+        worker_concurrency=int(os.environ.get('CELERY_WORKER_CONCURRENCY', 2)),
+        beat_schedule=BEAT_SCHEDULE
     )
 
-    if app:
-        # Update celery with Flask context
-        class ContextTask(celery.Task):
-            def __call__(self, *args, **kwargs):
-                with app.app_context():
-                    return self.run(*args, **kwargs)
+    class ContextTask(celery.Task):
+        def __call__(self, *args, **kwargs):
+            if has_app_context():
+                return self.run(*args, **kwargs)
+            with _flask_app(app).app_context():
+                return self.run(*args, **kwargs)
 
-        celery.Task = ContextTask
+    celery.Task = ContextTask
 
     return celery
 
+_worker_app = None
+
+def _flask_app(app=None):
+    """The Flask app tasks run in; workers started from this module create their own"""
+    global _worker_app
+    if app is not None:
+        return app
+    if _worker_app is None:
+        from app import create_app
+        _worker_app = create_app()
+    return _worker_app
+
 # Create the celery app
 celery_app = create_celery_app()
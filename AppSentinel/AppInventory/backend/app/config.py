@@ -2,21 +2,31 @@ import os
 import boto3
 from botocore.exceptions import ClientError
 import json
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+_client = None
+_client_lock = threading.Lock()
+
+def _secrets_client():
+    """One Secrets Manager client per process, created on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            session = boto3.session.Session()
+            _client = session.client(
+                service_name='secretsmanager',
+                region_name=os.getenv('AWS_REGION', 'us-west-2')
+            )
+        return _client
+
 def get_secret(secret_name):
     """Retrieve secret from AWS Secrets Manager"""
     try:
-        session = boto3.session.Session()
-        client = session.client(
-            service_name='secretsmanager',
-            region_name=os.getenv('AWS_REGION', 'us-west-2')
-        )
-        
-        get_secret_value_response = client.get_secret_value(
+        get_secret_value_response = _secrets_client().get_secret_value(
             SecretId=secret_name
         )
     except ClientError as e:
@@ -27,6 +37,11 @@ def get_secret(secret_name):
         else:
             raise ValueError("Secret value is not a string")
 
+def database_uri_from_secret(secret_name):
+    secret = get_secret(secret_name)
+    return (f"postgresql://{secret['username']}:{secret['password']}@"
+            f"{secret['host']}:{secret['port']}/{secret['dbname']}")
+
 class Config:
     """Base configuration."""
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev')
@@ -38,19 +53,12 @@ class Config:
     # CORS Configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
     
-    # Database Configuration
-    if os.getenv('FLASK_ENV') == 'production':
-        try:
-            secret = get_secret(os.getenv('AWS_SECRET_NAME'))
-            SQLALCHEMY_DATABASE_URI = (f"postgresql://{secret['username']}:{secret['password']}@"
-                                   f"{secret['host']}:{secret['port']}/{secret['dbname']}")
-        except Exception as e:
-            print(f"Error getting database credentials from Secrets Manager: {e}")
-            raise
-    else:
-        SQLALCHEMY_DATABASE_URI = (f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@"
-                                f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}")
-    
+    # Database Configuration. In production the credentials come from
+    # Secrets Manager when the app is created (create_app calls
+    # ProductionConfig.init_app), not when this module is imported.
+    SQLALCHEMY_DATABASE_URI = (f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@"
+                               f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}")
+
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'false').lower() == 'true'
 
@@ -74,6 +82,14 @@ class ProductionConfig(Config):
     REMEMBER_COOKIE_SECURE = True
     REMEMBER_COOKIE_HTTPONLY = True
 
+    @staticmethod
+    def init_app(app):
+        try:
+            app.config['SQLALCHEMY_DATABASE_URI'] = database_uri_from_secret(os.getenv('AWS_SECRET_NAME'))
+        except Exception as e:
+            print(f"Error getting database credentials from Secrets Manager: {e}")
+            raise
+
 # Configuration dictionary
 config = {
     'development': DevelopmentConfig,
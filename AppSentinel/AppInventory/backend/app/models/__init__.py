@@ -12,6 +12,8 @@ from .application import Application
 from .security_control import SecurityControl
 from .application_control import ApplicationControl
 from .export_filter_preset import ExportFilterPreset
+from .health_probe import HealthProbe, HealthProbeRollup
+from .audit_log import AuditLog
 from app.utils import logger
 
 __all__ = [
@@ -23,6 +25,9 @@ __all__ = [
     'SecurityControl',
     'ApplicationControl',
     'ExportFilterPreset',
+    'HealthProbe',
+    'HealthProbeRollup',
+    'AuditLog',
     'logger'
 ]
 
@@ -2,8 +2,11 @@ from app import db
 from enum import Enum
 from datetime import datetime
 from sqlalchemy import event
+from sqlalchemy.orm import object_session
 from sqlalchemy.ext.declarative import declared_attr
 from app.utils import logger
+from app.services.audit_writer import audit_writer
+from app.services.suggestions_cache import attributes_changed, mark_suggestions_stale
 from .base import AuditableMixin
 
 class ApplicationType(Enum):
@@ -16,6 +19,11 @@ class ApplicationType(Enum):
 
 class Application(db.Model, AuditableMixin):
     __tablename__ = 'applications'
+    __table_args__ = (
+        # Serves department/team filtered listings ordered by name (keyset pagination)
+        db.Index('ix_applications_department_team_name', 'department_name', 'team_name', 'name', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -37,6 +45,18 @@ class Application(db.Model, AuditableMixin):
     data_classification = db.Column(db.String(50))
     authentication_method = db.Column(db.String(50))
     requires_2fa = db.Column(db.Boolean)
+    active = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+    health_check_url = db.Column(db.String(500))
+    health_status = db.Column(db.String(20))
+    last_health_check = db.Column(db.DateTime)
+    health_latency_ms = db.Column(db.Float)
+    # Upstream metadata document; `metadata` itself is reserved by SQLAlchemy
+    metadata_url = db.Column(db.String(500))
+    app_metadata = db.Column(db.JSON)
+    metadata_hash = db.Column(db.String(64))
+    metadata_etag = db.Column(db.String(255))
+    metadata_last_modified = db.Column(db.String(64))
+    last_metadata_update = db.Column(db.DateTime)
     
     # Relationships
     team = db.relationship('Team', back_populates='applications', overlaps="teams,applications")
@@ -50,7 +70,7 @@ class Application(db.Model, AuditableMixin):
                  team_name=None, team_id=None, test_score=None, test_score_date=None, last_security_review=None, 
                  next_security_review=None, deployment_date=None, last_update_date=None, vendor_name=None, 
                  vendor_contact=None, contract_expiration=None, data_classification=None, authentication_method=None, 
-                 requires_2fa=None, application_type=None):
+                 requires_2fa=None, application_type=None, active=True, health_check_url=None, metadata_url=None):
         self.name = name
         self.description = description
         self.owner_id = owner_id
@@ -71,6 +91,9 @@ class Application(db.Model, AuditableMixin):
         self.authentication_method = authentication_method
         self.requires_2fa = requires_2fa
         self.application_type = application_type
+        self.active = active
+        self.health_check_url = health_check_url
+        self.metadata_url = metadata_url
 
     def update(self, **kwargs):
         for key, value in kwargs.items():
@@ -100,9 +123,34 @@ class Application(db.Model, AuditableMixin):
             'data_classification': self.data_classification,
             'authentication_method': self.authentication_method,
             'requires_2fa': self.requires_2fa,
+            'active': self.active,
+            'health_check_url': self.health_check_url,
+            'health_status': self.health_status,
+            'last_health_check': self.last_health_check.isoformat() if self.last_health_check else None,
+            'metadata_url': self.metadata_url,
+            'last_metadata_update': self.last_metadata_update.isoformat() if self.last_metadata_update else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
     def __repr__(self):
         return f'<Application {self.name}>'
+
+audit_writer.register(Application)
+
+# Columns behind the filter suggestions and the cached listing totals
+SUGGESTION_ATTRIBUTES = ('department_name', 'team_name', 'name', 'description')
+
+def track_suggestion_changes(mapper, connection, target):
+    """Invalidate cached filter suggestions once the change commits"""
+    mark_suggestions_stale(object_session(target))
+
+def track_suggestion_updates(mapper, connection, target):
+    # Health checks and metadata refreshes update rows constantly without
+    # touching anything the suggestions are built from
+    if attributes_changed(target, SUGGESTION_ATTRIBUTES):
+        mark_suggestions_stale(object_session(target))
+
+event.listen(Application, 'after_insert', track_suggestion_changes)
+event.listen(Application, 'after_update', track_suggestion_updates)
+event.listen(Application, 'after_delete', track_suggestion_changes)
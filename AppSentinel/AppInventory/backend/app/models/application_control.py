@@ -1,6 +1,9 @@
 from app import db
 from enum import Enum
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
 from app.utils import logger
+from app.services.suggestions_cache import attributes_changed, mark_suggestions_stale
 from .base import AuditableMixin
 
 class ControlStatus(Enum):
@@ -49,3 +52,16 @@ class ApplicationControl(db.Model, AuditableMixin):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+def track_control_changes(mapper, connection, target):
+    """Invalidate cached filter suggestions when controls are added or removed"""
+    mark_suggestions_stale(object_session(target))
+
+def track_control_updates(mapper, connection, target):
+    # Only the implementation date range is suggested for controls
+    if attributes_changed(target, ('implementation_date',)):
+        mark_suggestions_stale(object_session(target))
+
+event.listen(ApplicationControl, 'after_insert', track_control_changes)
+event.listen(ApplicationControl, 'after_update', track_control_updates)
+event.listen(ApplicationControl, 'after_delete', track_control_changes)
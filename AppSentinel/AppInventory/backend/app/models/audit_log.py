@@ -1,9 +1,16 @@
 from app import db
 from datetime import datetime
 from app.utils import logger
+from app.services.audit_writer import audit_writer
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
+    # On PostgreSQL the table is range-partitioned by month on timestamp (see migrations)
+    __table_args__ = (
+        db.Index('ix_audit_logs_table_record_timestamp', 'table_name', 'record_id', 'timestamp'),
+        db.Index('ix_audit_logs_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_audit_logs_timestamp_id', 'timestamp', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     table_name = db.Column(db.String(100), nullable=False)
@@ -12,7 +19,7 @@ class AuditLog(db.Model):
     changed_fields = db.Column(db.JSON)
     user_id = db.Column(db.String(100))
     jira_ticket = db.Column(db.String(20))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     def __init__(self, table_name, record_id, action, changed_fields=None, user_id=None, jira_ticket=None):
         logger.debug(f"Creating new AuditLog entry", 
@@ -36,3 +43,6 @@ class AuditLog(db.Model):
             'jira_ticket': self.jira_ticket,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
+
+# Audit rows of registered models are collected per flush and written here in one INSERT
+audit_writer.configure(AuditLog.__table__)
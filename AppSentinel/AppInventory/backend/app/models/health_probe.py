@@ -0,0 +1,52 @@
+from app import db
+from datetime import datetime
+
+class HealthProbe(db.Model):
+    """One health check result. Raw probes are kept for HEALTH_PROBE_RAW_RETENTION_HOURS
+    and then folded into HealthProbeRollup buckets."""
+    __tablename__ = 'health_probes'
+    __table_args__ = (
+        db.Index('ix_health_probes_application_checked_at', 'application_id', 'checked_at'),
+        db.Index('ix_health_probes_checked_at', 'checked_at'),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id', ondelete='CASCADE'), nullable=False)
+    checked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    healthy = db.Column(db.Boolean, nullable=False)
+    # NULL when the probe got no response
+    latency_ms = db.Column(db.Float)
+
+    def to_dict(self):
+        return {
+            'application_id': self.application_id,
+            'checked_at': self.checked_at.isoformat() if self.checked_at else None,
+            'healthy': self.healthy,
+            'latency_ms': self.latency_ms
+        }
+
+
+class HealthProbeRollup(db.Model):
+    """Probes of one application downsampled into a fixed-width time bucket.
+
+    Latencies are kept as counts per LATENCY_BUCKETS_MS bucket, so rollups
+    can be merged across any window and still yield latency percentiles.
+    """
+    __tablename__ = 'health_probe_rollups'
+
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id', ondelete='CASCADE'), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    probes = db.Column(db.Integer, nullable=False, default=0)
+    healthy = db.Column(db.Integer, nullable=False, default=0)
+    latency_sum_ms = db.Column(db.Float, nullable=False, default=0.0)
+    latency_histogram = db.Column(db.JSON, nullable=False)
+
+    def to_dict(self):
+        return {
+            'application_id': self.application_id,
+            'bucket_start': self.bucket_start.isoformat() if self.bucket_start else None,
+            'probes': self.probes,
+            'healthy': self.healthy,
+            'latency_sum_ms': self.latency_sum_ms,
+            'latency_histogram': self.latency_histogram
+        }
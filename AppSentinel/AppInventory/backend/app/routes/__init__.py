@@ -8,10 +8,11 @@ bp = Blueprint('main', __name__, url_prefix='/api')
 
 def init_app(app):
     """Initialize application routes."""
-    from . import auth, dashboard, lifecycle, applications, departments
+    from . import auth, dashboard, lifecycle, applications, audit_logs, departments
     
     app.register_blueprint(auth.bp)
     app.register_blueprint(dashboard.bp)
     app.register_blueprint(lifecycle.bp)
     app.register_blueprint(applications.bp)
+    app.register_blueprint(audit_logs.bp)
     app.register_blueprint(departments.bp)
@@ -1,25 +1,76 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.application import Application
 from app.models.user import User
+from app.services.health_history import health_series, health_summary, parse_window
+from app.services.pagination import InvalidCursorError, PaginationService
+from app.services.suggestions_cache import suggestions_cache
 from app import db
 from app.utils.logger import logger
 from sqlalchemy import or_
 
 bp = Blueprint('applications', __name__, url_prefix='/api/applications')
 
+# Columns returned by get_applications; only these are selected from the database
+APPLICATION_LIST_COLUMNS = (
+    Application.id,
+    Application.name,
+    Application.description,
+    Application.application_type,
+    Application.owner_id,
+    Application.owner_email,
+    Application.department_name,
+    Application.team_name,
+    Application.team_id,
+    Application.test_score,
+    Application.test_score_date,
+    Application.last_security_review,
+    Application.next_security_review,
+    Application.deployment_date,
+    Application.last_update_date,
+    Application.vendor_name,
+    Application.vendor_contact,
+    Application.contract_expiration,
+    Application.data_classification,
+    Application.authentication_method,
+    Application.requires_2fa,
+    Application.active,
+    Application.health_check_url,
+    Application.health_status,
+    Application.last_health_check,
+    Application.metadata_url,
+    Application.last_metadata_update,
+    Application.created_at,
+    Application.updated_at
+)
+
+# Sort key for keyset pagination; (name, id) is non-null and unique
+APPLICATION_LIST_ORDER = (Application.name, Application.id)
+
+MAX_PER_PAGE = 100
+
+def _application_list_item(row):
+    return {
+        column.key: value.isoformat() if isinstance(value, datetime) else value
+        for column, value in zip(APPLICATION_LIST_COLUMNS, row)
+    }
+
 @bp.route('', methods=['GET'])
 @jwt_required()
 def get_applications():
     try:
+        # Passing `cursor` (empty for the first page) switches to keyset pagination
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), MAX_PER_PAGE)
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() == 'true'
         search_query = request.args.get('q', '')
         department = request.args.get('department', '')
         team = request.args.get('team', '')
 
-        # Start with base query
-        query = Application.query
+        # Start with a column-projected query
+        query = db.session.query(*APPLICATION_LIST_COLUMNS)
 
         # Apply search filter if provided
         if search_query:
@@ -37,20 +88,48 @@ def get_applications():
         if team:
             query = query.filter(Application.team_name == team)
 
-        # Get paginated results
-        paginated_apps = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        return jsonify({
-            'applications': [app.to_dict() for app in paginated_apps.items],
-            'total': paginated_apps.total,
-            'page': page,
-            'per_page': per_page,
-            'pages': paginated_apps.pages
-        }), 200
+        result = {'per_page': per_page}
+        if cursor is not None:
+            rows, next_cursor = PaginationService.keyset_page(
+                query, APPLICATION_LIST_ORDER, cursor=cursor, per_page=per_page
+            )
+            result['next_cursor'] = next_cursor
+        else:
+            rows = PaginationService.offset_page(query, APPLICATION_LIST_ORDER, page=page, per_page=per_page)
+            result['page'] = page
+
+        if include_total:
+            total = PaginationService.count(query, cache_key=('applications', search_query, department, team))
+            result['total'] = total
+            result['pages'] = (total + per_page - 1) // per_page
+
+        result['applications'] = [_application_list_item(row) for row in rows]
+        return jsonify(result), 200
+    except InvalidCursorError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching applications: {str(e)}")
         return jsonify({'message': 'Error fetching applications'}), 500
 
+def _compute_filter_suggestions():
+    departments = db.session.query(Application.department_name).distinct().all()
+    teams = db.session.query(Application.team_name).distinct().all()
+    return {
+        'departments': sorted(dept[0] for dept in departments if dept[0]),
+        'teams': sorted(team[0] for team in teams if team[0])
+    }
+
+@bp.route('/filter-suggestions', methods=['GET'])
+@jwt_required()
+def get_filter_suggestions():
+    """Departments and teams to offer in the listing filters"""
+    try:
+        # Served from cache until an application changes
+        return jsonify(suggestions_cache.get_or_compute('filters', _compute_filter_suggestions)), 200
+    except Exception as e:
+        logger.error(f"Error fetching filter suggestions: {str(e)}")
+        return jsonify({'message': 'Error fetching filter suggestions'}), 500
+
 @bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_application(id):
@@ -63,6 +142,57 @@ def get_application(id):
         logger.error(f"Error fetching application {id}: {str(e)}")
         return jsonify({'message': 'Error fetching application'}), 500
 
+@bp.route('/<int:id>/health', methods=['GET'])
+@jwt_required()
+def get_application_health(id):
+    """Availability and latency percentiles over SLO windows, e.g. ?windows=1h,24h,30d"""
+    try:
+        application = Application.query.get(id)
+        if not application:
+            return jsonify({'message': 'Application not found'}), 404
+
+        names = [name.strip() for name in
+                 request.args.get('windows', current_app.config.get('HEALTH_SLO_WINDOWS', '1h,24h,7d,30d')).split(',')
+                 if name.strip()]
+        try:
+            windows = [parse_window(name) for name in names]
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        if not windows:
+            return jsonify({'message': 'No windows provided'}), 400
+
+        summaries = health_summary(id, windows)
+        return jsonify({
+            'application_id': id,
+            'health_status': application.health_status,
+            'last_health_check': application.last_health_check.isoformat() if application.last_health_check else None,
+            'windows': [{'window': name, **summary} for name, summary in zip(names, summaries)]
+        }), 200
+    except Exception as e:
+        logger.error(f"Error fetching health of application {id}: {str(e)}")
+        return jsonify({'message': 'Error fetching application health'}), 500
+
+@bp.route('/<int:id>/health/series', methods=['GET'])
+@jwt_required()
+def get_application_health_series(id):
+    """Health time series, e.g. ?window=7d&step=1h"""
+    try:
+        if not Application.query.get(id):
+            return jsonify({'message': 'Application not found'}), 404
+
+        try:
+            window = parse_window(request.args.get('window', '24h'))
+            step = parse_window(request.args.get('step', '1h'))
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        until = datetime.utcnow()
+        points = health_series(id, until - window, until, step)
+        return jsonify({'application_id': id, 'points': points}), 200
+    except Exception as e:
+        logger.error(f"Error fetching health series of application {id}: {str(e)}")
+        return jsonify({'message': 'Error fetching application health'}), 500
+
 @bp.route('', methods=['POST'])
 @jwt_required()
 def create_application():
@@ -81,7 +211,10 @@ def create_application():
             name=data['name'],
             description=data['description'],
             application_type=data['application_type'],
-            owner_id=get_jwt_identity()
+            owner_id=get_jwt_identity(),
+            active=data.get('active', True),
+            health_check_url=data.get('health_check_url'),
+            metadata_url=data.get('metadata_url')
         )
         
         db.session.add(application)
@@ -106,7 +239,7 @@ def update_application(id):
             return jsonify({'message': 'No data provided'}), 400
             
         # Update fields
-        for field in ['name', 'description', 'application_type', 'state']:
+        for field in ['name', 'description', 'application_type', 'state', 'active', 'health_check_url', 'metadata_url']:
             if field in data:
                 setattr(application, field, data[field])
         
@@ -0,0 +1,135 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.models.audit_log import AuditLog
+from app.services.audit_archive import get_audit_archive
+from app.services.pagination import InvalidCursorError, PaginationService
+from app.utils.logger import logger
+
+bp = Blueprint('audit_logs', __name__, url_prefix='/api/audit-logs')
+
+# Sort key for keyset pagination, newest first
+AUDIT_LOG_ORDER = (AuditLog.timestamp, AuditLog.id)
+
+MAX_PER_PAGE = 100
+
+def _parse_timestamp_arg(name):
+    """Parse an ISO 8601 date or datetime query parameter, or return None"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} timestamp, expected ISO 8601")
+
+def _audit_log_to_item(log):
+    return {
+        'id': log.id,
+        'table_name': log.table_name,
+        'record_id': log.record_id,
+        'action': log.action,
+        'changed_fields': log.changed_fields,
+        'user_id': log.user_id,
+        'jira_ticket': log.jira_ticket,
+        'timestamp': log.timestamp.isoformat()
+    }
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+def get_audit_logs():
+    try:
+        # Passing `cursor` (empty for the first page) switches to keyset pagination
+        page = request.args.get('page', 1, type=int)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), MAX_PER_PAGE)
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() == 'true'
+        filters = {
+            'table_name': request.args.get('table_name'),
+            'record_id': request.args.get('record_id', type=int),
+            'action': request.args.get('action'),
+            'user_id': request.args.get('user_id'),
+            'jira_ticket': request.args.get('jira_ticket')
+        }
+
+        # Time window; bounding timestamp lets PostgreSQL prune monthly partitions
+        try:
+            since = _parse_timestamp_arg('since')
+            until = _parse_timestamp_arg('until')
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        query = AuditLog.query
+        for field, value in filters.items():
+            if value:
+                query = query.filter(getattr(AuditLog, field) == value)
+        if since:
+            query = query.filter(AuditLog.timestamp >= since)
+        if until:
+            query = query.filter(AuditLog.timestamp < until)
+
+        # Months older than the archive horizon live in compressed archive
+        # files; the database only answers for the rest of the window.
+        archive = get_audit_archive()
+        use_archive = archive.covers(since)
+        if use_archive:
+            query = query.filter(AuditLog.timestamp >= archive.horizon())
+
+        result = {'per_page': per_page}
+        hot_total = None
+        if cursor is not None:
+            audit_logs, next_cursor = PaginationService.keyset_page(
+                query, AUDIT_LOG_ORDER, cursor=cursor, per_page=per_page, descending=True
+            )
+            items = [_audit_log_to_item(log) for log in audit_logs]
+
+            if use_archive and next_cursor is None:
+                # Database rows are exhausted; continue into the archive
+                if audit_logs:
+                    before = (audit_logs[-1].timestamp, audit_logs[-1].id)
+                elif cursor:
+                    before = PaginationService.decode_keyset(cursor, AUDIT_LOG_ORDER)
+                else:
+                    before = None
+                remaining = per_page - len(items)
+                archived = archive.query(filters, since, until, before=before, limit=remaining + 1)
+                items.extend(archived[:remaining])
+                if len(archived) > remaining:
+                    last = items[-1]
+                    next_cursor = PaginationService.encode_cursor(
+                        [datetime.fromisoformat(last['timestamp']), last['id']]
+                    )
+            result['next_cursor'] = next_cursor
+        else:
+            offset = (max(page, 1) - 1) * per_page
+            if use_archive:
+                hot_total = PaginationService.count(query)
+                audit_logs = PaginationService.offset_page(
+                    query, AUDIT_LOG_ORDER, page=page, per_page=per_page, descending=True
+                ) if offset < hot_total else []
+                items = [_audit_log_to_item(log) for log in audit_logs]
+                if len(items) < per_page:
+                    items.extend(archive.query(
+                        filters, since, until, offset=max(offset - hot_total, 0), limit=per_page - len(items)
+                    ))
+            else:
+                audit_logs = PaginationService.offset_page(
+                    query, AUDIT_LOG_ORDER, page=page, per_page=per_page, descending=True
+                )
+                items = [_audit_log_to_item(log) for log in audit_logs]
+            result['page'] = page
+
+        if include_total:
+            total = hot_total if hot_total is not None else PaginationService.count(query)
+            if use_archive:
+                total += archive.count(filters, since, until)
+            result['total'] = total
+            result['total_pages'] = (total + per_page - 1) // per_page
+
+        result['items'] = items
+        return jsonify(result), 200
+    except InvalidCursorError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error fetching audit logs: {str(e)}")
+        return jsonify({'message': 'Error fetching audit logs'}), 500
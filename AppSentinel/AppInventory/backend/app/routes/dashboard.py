@@ -3,9 +3,12 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.application import Application
 from app.models.audit_log import AuditLog
 from app.models.user import User
-from app.models.security_control import SecurityControl
+from app.models.security_control import SecurityControl, ControlFamily
+from app.models.application_control import ApplicationControl, ControlStatus
+from app.services.suggestions_cache import suggestions_cache
+from app import db
 from app.utils.logger import logger
-from sqlalchemy import func
+from sqlalchemy import distinct, func
 from datetime import datetime, timedelta
 
 bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
@@ -122,3 +125,35 @@ def get_stats():
         return jsonify({
             'error': 'Failed to fetch dashboard statistics'
         }), 500
+
+def _compute_dashboard_filter_suggestions():
+    departments = db.session.query(distinct(Application.department_name)).\
+        filter(Application.department_name.isnot(None)).all()
+    teams = db.session.query(distinct(Application.team_name)).\
+        filter(Application.team_name.isnot(None)).all()
+    date_range = db.session.query(
+        func.min(ApplicationControl.implementation_date).label('min_date'),
+        func.max(ApplicationControl.implementation_date).label('max_date')
+    ).first()
+
+    return {
+        'departments': sorted(d[0] for d in departments),
+        'teams': sorted(t[0] for t in teams),
+        'control_families': [f.value for f in ControlFamily],
+        'statuses': [s.value for s in ControlStatus],
+        'implementation_date_range': {
+            'min': date_range.min_date.isoformat() if date_range.min_date else None,
+            'max': date_range.max_date.isoformat() if date_range.max_date else None
+        }
+    }
+
+@bp.route('/filters/suggestions', methods=['GET'])
+@jwt_required()
+def get_filter_suggestions():
+    """Filter values for the controls dashboard, based on existing data"""
+    try:
+        # Served from cache until an application or control status changes
+        return jsonify(suggestions_cache.get_or_compute('dashboard_filters', _compute_dashboard_filter_suggestions))
+    except Exception as e:
+        logger.error(f"Error fetching dashboard filter suggestions: {str(e)}")
+        return jsonify({'error': 'Failed to fetch filter suggestions'}), 500
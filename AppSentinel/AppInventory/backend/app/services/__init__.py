@@ -2,3 +2,4 @@
 Services package initialization.
 """
 from .auth_service import AuthService
+from .pagination import PaginationService, InvalidCursorError
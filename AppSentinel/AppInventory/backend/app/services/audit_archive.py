@@ -0,0 +1,301 @@
+import copy
+import gzip
+import hashlib
+import heapq
+import json
+import os
+import threading
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import JSON, DateTime, text
+from app import db
+from app.services.audit_partitions import add_months, partition_name, partitioning_enabled
+from app.utils.logger import logger
+
+MANIFEST_NAME = 'manifest.json'
+# Row counts kept for filtered counts over archive files
+MAX_CACHED_COUNTS = 1024
+ARCHIVE_COLUMNS = ('id', 'table_name', 'record_id', 'action', 'changed_fields', 'user_id', 'jira_ticket', 'timestamp')
+
+
+class AuditArchive:
+    """Monthly gzip JSONL files of audit log rows moved out of the database.
+
+    manifest.json lists every archive file with its month, row count,
+    timestamp range and checksum. Files are immutable once listed; archiving
+    more rows for a month that is already archived adds another part.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_mtime = None
+        self._counts = {}
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def load_manifest(self):
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            return {'files': []}
+        # The manifest is consulted on every audit log query, so reread it only when it changes
+        if mtime != self._manifest_mtime:
+            with open(self.manifest_path) as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def horizon(self):
+        """Start of the first month that is not archived, or None if nothing is"""
+        files = self.load_manifest()['files']
+        if not files:
+            return None
+        newest = max(date.fromisoformat(entry['month'] + '-01') for entry in files)
+        return datetime.combine(add_months(newest, 1), datetime.min.time())
+
+    def covers(self, since):
+        """Whether a query starting at since (None for all time) reaches archived months"""
+        horizon = self.horizon()
+        return horizon is not None and (since is None or since < horizon)
+
+    def write_month(self, month, rows):
+        """Write rows for month to a new archive file and record it in the manifest"""
+        entry = self.write_file(month, rows)
+        if entry:
+            self.record(entry)
+        return entry
+
+    def write_file(self, month, rows):
+        """Write rows for month to a new archive file without listing it yet.
+
+        Returns the manifest entry for record(), or None if there were no rows.
+        Until it is recorded the file is invisible to reads and can be
+        dropped with discard().
+        """
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            manifest = self.load_manifest()
+            part = sum(1 for entry in manifest['files'] if entry['month'] == month.strftime('%Y-%m'))
+            filename = f"{partition_name(month)}" + (f"-part{part + 1}" if part else '') + '.jsonl.gz'
+            path = os.path.join(self.directory, filename)
+
+            count = 0
+            min_timestamp = max_timestamp = None
+            tmp_path = path + '.tmp'
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for row in rows:
+                    record = {column: row[column] for column in ARCHIVE_COLUMNS}
+                    record['timestamp'] = row['timestamp'].isoformat()
+                    f.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+                    count += 1
+                    min_timestamp = min(min_timestamp or row['timestamp'], row['timestamp'])
+                    max_timestamp = max(max_timestamp or row['timestamp'], row['timestamp'])
+
+            if not count:
+                os.remove(tmp_path)
+                return None
+
+            with open(tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+            return {
+                'month': month.strftime('%Y-%m'),
+                'file': filename,
+                'rows': count,
+                'min_timestamp': min_timestamp.isoformat(),
+                'max_timestamp': max_timestamp.isoformat(),
+                'sha256': _sha256(path),
+                'archived_at': datetime.utcnow().isoformat()
+            }
+
+    def record(self, entry):
+        """List a file written by write_file in the manifest"""
+        with self._lock:
+            manifest = copy.deepcopy(self.load_manifest())
+            manifest['files'].append(entry)
+            tmp_manifest = self.manifest_path + '.tmp'
+            with open(tmp_manifest, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_manifest, self.manifest_path)
+
+    def discard(self, entry):
+        """Remove a file written by write_file that was never recorded"""
+        try:
+            os.remove(os.path.join(self.directory, entry['file']))
+        except OSError:
+            pass
+
+    def query(self, filters, since=None, until=None, before=None, offset=0, limit=None):
+        """Return archived rows matching filters, newest first.
+
+        before is an exclusive (timestamp, id) keyset bound. Files are read
+        newest first and reading stops once no older file can hold one of
+        the offset + limit newest matching rows.
+        """
+        wanted = offset + limit if limit is not None else None
+        if wanted == 0:
+            return []
+
+        # Min-heap of the `wanted` newest matches seen so far
+        newest = []
+        for entry in sorted(self._files_in_range(since, until, before),
+                            key=lambda entry: datetime.fromisoformat(entry['max_timestamp']), reverse=True):
+            if wanted is not None and len(newest) == wanted and \
+                    datetime.fromisoformat(entry['max_timestamp']) < newest[0][0][0]:
+                break
+            for key, record in self._matching(entry, filters, since, until, before):
+                if wanted is None or len(newest) < wanted:
+                    heapq.heappush(newest, (key, record))
+                elif key > newest[0][0]:
+                    heapq.heapreplace(newest, (key, record))
+
+        newest.sort(key=lambda item: item[0], reverse=True)
+        end = offset + limit if limit is not None else None
+        return [record for _, record in newest[offset:end]]
+
+    def count(self, filters, since=None, until=None):
+        """Count archived rows matching filters"""
+        total = 0
+        for entry in self._files_in_range(since, until):
+            inside = (since is None or datetime.fromisoformat(entry['min_timestamp']) >= since) and \
+                (until is None or datetime.fromisoformat(entry['max_timestamp']) < until)
+            if inside and not any(filters.values()):
+                # The manifest row count answers without opening the file
+                total += entry['rows']
+            else:
+                total += self._count_file(entry, filters, since if not inside else None,
+                                          until if not inside else None)
+        return total
+
+    def _count_file(self, entry, filters, since, until):
+        # Archive files never change, so their counts can be kept
+        key = (entry['file'], tuple(sorted((k, v) for k, v in filters.items() if v)), since, until)
+        with self._lock:
+            if key in self._counts:
+                return self._counts[key]
+        count = sum(1 for _ in self._matching(entry, filters, since, until))
+        with self._lock:
+            if len(self._counts) >= MAX_CACHED_COUNTS:
+                self._counts.pop(next(iter(self._counts)))
+            self._counts[key] = count
+        return count
+
+    def _files_in_range(self, since, until, before=None):
+        files = []
+        for entry in self.load_manifest()['files']:
+            if since and datetime.fromisoformat(entry['max_timestamp']) < since:
+                continue
+            if until and datetime.fromisoformat(entry['min_timestamp']) >= until:
+                continue
+            if before and datetime.fromisoformat(entry['min_timestamp']) > before[0]:
+                continue
+            files.append(entry)
+        return files
+
+    def _matching(self, entry, filters, since=None, until=None, before=None):
+        """Yield ((timestamp, id), record) for the rows of entry matching filters"""
+        before = tuple(before) if before else None
+        for record in self._read(entry):
+            timestamp = datetime.fromisoformat(record['timestamp'])
+            key = (timestamp, record['id'])
+            # Rows are written in (timestamp, id) order, so nothing later can match
+            if (until and timestamp >= until) or (before and key >= before):
+                break
+            if since and timestamp < since:
+                continue
+            if _matches(record, filters):
+                yield key, record
+
+    def _read(self, entry):
+        with gzip.open(os.path.join(self.directory, entry['file']), 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+_archives = {}
+
+
+def get_audit_archive():
+    """Return the AuditArchive for the configured AUDIT_ARCHIVE_DIR"""
+    directory = current_app.config.get('AUDIT_ARCHIVE_DIR', 'archive/audit_logs')
+    if directory not in _archives:
+        _archives[directory] = AuditArchive(directory)
+    return _archives[directory]
+
+
+def archive_audit_logs(archive, older_than_months=12, batch_size=5000):
+    """Move audit rows from months older than older_than_months into archive.
+
+    Returns the manifest entries written. On PostgreSQL an archived month's
+    partition is detached and dropped; rows elsewhere (e.g. the default
+    partition or unpartitioned tables) are deleted by timestamp range.
+    """
+    cutoff = add_months(date.today().replace(day=1), -older_than_months)
+    oldest = db.session.execute(
+        text("SELECT min(timestamp) AS oldest FROM audit_logs").columns(oldest=DateTime)
+    ).scalar()
+    if oldest is None:
+        return []
+
+    written = []
+    month = oldest.date().replace(day=1)
+    while month < cutoff:
+        next_month = add_months(month, 1)
+        bounds = {'start': month, 'end': next_month}
+
+        result = db.session.execute(
+            text(f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM audit_logs "
+                 "WHERE timestamp >= :start AND timestamp < :end ORDER BY timestamp, id")
+            .columns(timestamp=DateTime, changed_fields=JSON)
+            .execution_options(stream_results=True, yield_per=batch_size),
+            bounds
+        )
+        entry = archive.write_file(month, (row._mapping for row in result))
+
+        if entry:
+            # List the file only once its rows are gone from the database,
+            # so a failed delete cannot leave them readable twice
+            try:
+                _drop_month(month, bounds)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                archive.discard(entry)
+                raise
+            archive.record(entry)
+            written.append(entry)
+            logger.info(f"Archived {entry['rows']} audit log rows for {entry['month']} to {entry['file']}")
+        month = next_month
+
+    return written
+
+
+def _drop_month(month, bounds):
+    name = partition_name(month)
+    if partitioning_enabled() and db.session.execute(
+        text("SELECT to_regclass(:name)"), {'name': name}
+    ).scalar():
+        db.session.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+        db.session.execute(text(f"DROP TABLE {name}"))
+    # Catch rows that landed in the default partition or an unpartitioned table
+    db.session.execute(
+        text("DELETE FROM audit_logs WHERE timestamp >= :start AND timestamp < :end"),
+        bounds
+    )
+
+
+def _matches(record, filters):
+    return all(record.get(field) == value for field, value in filters.items() if value)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,55 @@
+from datetime import date
+from sqlalchemy import text
+from app import db
+from app.utils.logger import logger
+
+PARTITION_PREFIX = 'audit_logs_y'
+
+
+def add_months(month, count):
+    """Return the first day of the month count months after month"""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    """Name of the audit_logs partition holding month"""
+    return f"{PARTITION_PREFIX}{month.year}m{month.month:02d}"
+
+
+def partitioning_enabled():
+    """audit_logs is only range-partitioned on PostgreSQL"""
+    return db.engine.dialect.name == 'postgresql'
+
+
+def ensure_audit_partitions(months_ahead=3):
+    """Create monthly audit_logs partitions from the current month up to months_ahead"""
+    if not partitioning_enabled():
+        return []
+
+    existing = set(
+        db.session.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = 'audit_logs'"
+        )).scalars()
+    )
+
+    created = []
+    month = date.today().replace(day=1)
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        if name not in existing:
+            next_month = add_months(month, 1)
+            db.session.execute(text(
+                f"CREATE TABLE {name} PARTITION OF audit_logs "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+
+    db.session.commit()
+    if created:
+        logger.info(f"Created audit log partitions: {', '.join(created)}")
+    return created
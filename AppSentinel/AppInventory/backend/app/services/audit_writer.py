@@ -0,0 +1,115 @@
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.utils.logger import logger
+
+AUDIT_BUFFER = 'audit_buffer'
+
+
+class AuditWriter:
+    """Collects changes to audited models during a flush and writes them in bulk.
+
+    Changes are captured in before_flush, while attribute history is still
+    available, and written in after_flush with a single executemany INSERT on
+    the flush's connection, so audit rows commit or roll back with the data.
+    """
+
+    def __init__(self):
+        self._models = set()
+        self._table = None
+
+    def configure(self, audit_table):
+        """Set the table audit rows are written to"""
+        self._table = audit_table
+
+    def register(self, model):
+        """Audit inserts, updates and deletes of model"""
+        self._models.add(model)
+
+    def is_audited(self, obj):
+        return type(obj) in self._models
+
+    def collect(self, session):
+        """Buffer the pending changes of audited objects in session"""
+        buffer = []
+        for obj in session.new:
+            if self.is_audited(obj):
+                changed_fields = self._changed_fields(obj)
+                if changed_fields:
+                    buffer.append((obj, 'INSERT', changed_fields))
+        for obj in session.dirty:
+            if self.is_audited(obj) and session.is_modified(obj, include_collections=False):
+                changed_fields = self._changed_fields(obj)
+                if changed_fields:
+                    buffer.append((obj, 'UPDATE', changed_fields))
+        for obj in session.deleted:
+            if self.is_audited(obj):
+                buffer.append((obj, 'DELETE', None))
+        session.info[AUDIT_BUFFER] = buffer
+
+    def write(self, session):
+        """Insert all buffered audit rows in one statement"""
+        buffer = session.info.pop(AUDIT_BUFFER, None)
+        if not buffer or self._table is None:
+            return
+
+        timestamp = datetime.utcnow()
+        rows = [{
+            'table_name': obj.__tablename__,
+            'record_id': getattr(obj, 'id', None),
+            'action': action,
+            'changed_fields': changed_fields,
+            'user_id': getattr(obj, '_audit_user_id', None),
+            'jira_ticket': getattr(obj, '_audit_jira_ticket', None),
+            'timestamp': timestamp
+        } for obj, action, changed_fields in buffer]
+
+        session.connection().execute(self._table.insert(), rows)
+        logger.debug(f"Wrote {len(rows)} audit log entries")
+
+    def discard(self, session):
+        session.info.pop(AUDIT_BUFFER, None)
+
+    @staticmethod
+    def _changed_fields(obj):
+        state = inspect(obj)
+        changed_fields = {}
+        for attr in state.mapper.column_attrs:
+            hist = state.attrs[attr.key].history
+            if hist.has_changes():
+                changed_fields[attr.key] = {
+                    'old': _serialize(hist.deleted[0]) if hist.deleted else None,
+                    'new': _serialize(hist.added[0]) if hist.added else None
+                }
+        return changed_fields
+
+
+def _serialize(value):
+    """Convert a column value into its JSON representation"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+audit_writer = AuditWriter()
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_audit_changes(session, flush_context, instances):
+    audit_writer.collect(session)
+
+
+@event.listens_for(Session, 'after_flush')
+def _write_audit_changes(session, flush_context):
+    audit_writer.write(session)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_audit_changes(session):
+    audit_writer.discard(session)
@@ -0,0 +1,70 @@
+import asyncio
+import math
+import time
+import aiohttp
+from app.utils.logger import logger
+
+HEALTHY = 'HEALTHY'
+UNHEALTHY = 'UNHEALTHY'
+UNKNOWN = 'UNKNOWN'
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Nearest-rank percentiles of values, or None for each point if empty"""
+    ordered = sorted(values)
+    result = {}
+    for point in points:
+        if not ordered:
+            result[f'p{point}'] = None
+            continue
+        rank = max(1, math.ceil(point / 100 * len(ordered)))
+        result[f'p{point}'] = ordered[rank - 1]
+    return result
+
+
+class HealthChecker:
+    """Probes many health check URLs concurrently over one pooled HTTP session.
+
+    At most `concurrency` requests are in flight at once, sharing keep-alive
+    connections per host. Each URL is probed `samples` times; its status is
+    that of the last probe and latencies are reported in milliseconds.
+    """
+
+    def __init__(self, concurrency=100, timeout=10, samples=1, verify_ssl=False):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.samples = max(1, samples)
+        self.verify_ssl = verify_ssl
+
+    def check(self, targets):
+        """Probe {application_id: url} and return {application_id: result}"""
+        return asyncio.run(self.check_async(targets))
+
+    async def check_async(self, targets):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=None if self.verify_ssl else False)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*[
+                self._check_one(session, semaphore, url) for url in targets.values()
+            ])
+        return dict(zip(targets.keys(), results))
+
+    async def _check_one(self, session, semaphore, url):
+        if not url:
+            return {'status': UNKNOWN, 'latencies_ms': []}
+
+        status = UNHEALTHY
+        latencies = []
+        for _ in range(self.samples):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    async with session.get(url, allow_redirects=True) as response:
+                        status = HEALTHY if response.status == 200 else UNHEALTHY
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.debug(f"Health check of {url} failed: {str(e)}")
+                    status = UNHEALTHY
+        return {'status': status, 'latencies_ms': latencies}
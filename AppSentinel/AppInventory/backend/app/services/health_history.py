@@ -0,0 +1,254 @@
+import re
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert
+from app import db
+from app.models.health_probe import HealthProbe, HealthProbeRollup
+from app.services.health_checker import HEALTHY, UNKNOWN, percentiles
+from app.utils.logger import logger
+
+# Upper bounds of the rollup latency histogram buckets, 25% apart from 2ms
+# to ~36s; the last bucket counts everything slower than the largest bound
+LATENCY_BUCKETS_MS = tuple(round(2 * 1.25 ** i, 1) for i in range(45))
+WINDOW_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def parse_window(value):
+    """Parse a window such as '15m', '24h' or '30d' into a timedelta"""
+    match = re.fullmatch(r'(\d+)([mhd])', value.strip())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid window '{value}', expected e.g. 1h, 24h, 7d")
+    return timedelta(**{WINDOW_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def bucket_start(timestamp, resolution_seconds):
+    """Start of the resolution_seconds wide bucket holding timestamp"""
+    seconds = int((timestamp - datetime.min).total_seconds())
+    return datetime.min + timedelta(seconds=seconds - seconds % resolution_seconds)
+
+
+def _resolution():
+    return current_app.config.get('HEALTH_ROLLUP_RESOLUTION_SECONDS', 3600)
+
+
+def latency_bucket(latency_ms):
+    return bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+
+
+def histogram_percentiles(histogram, points=(50, 95, 99)):
+    """Percentiles from bucket counts, interpolated linearly within the bucket"""
+    total = sum(histogram)
+    result = {}
+    for point in points:
+        if not total:
+            result[f'p{point}'] = None
+            continue
+        rank = max(1, -(-point * total // 100))
+        seen = 0
+        for index, count in enumerate(histogram):
+            if seen + count >= rank:
+                if index >= len(LATENCY_BUCKETS_MS):
+                    # The overflow bucket has no upper bound; report the largest one
+                    result[f'p{point}'] = LATENCY_BUCKETS_MS[-1]
+                else:
+                    lower = LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+                    upper = LATENCY_BUCKETS_MS[index]
+                    result[f'p{point}'] = round(lower + (upper - lower) * (rank - seen) / count, 1)
+                break
+            seen += count
+    return result
+
+
+class ProbeStats:
+    """Availability and latency of a set of probes and rollups.
+
+    Latency percentiles are exact while only raw probes were added and come
+    from the merged histogram once any rollup is included.
+    """
+
+    def __init__(self):
+        self.probes = 0
+        self.healthy = 0
+        self.latency_sum_ms = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latencies = []
+        self.approximate = False
+
+    def add_probe(self, healthy, latency_ms):
+        self.probes += 1
+        self.healthy += 1 if healthy else 0
+        if latency_ms is not None:
+            self.latency_sum_ms += latency_ms
+            self.histogram[latency_bucket(latency_ms)] += 1
+            self.latencies.append(latency_ms)
+
+    def add_rollup(self, probes, healthy, latency_sum_ms, histogram):
+        self.probes += probes
+        self.healthy += healthy
+        self.latency_sum_ms += latency_sum_ms
+        for index, count in enumerate(histogram[:len(self.histogram)]):
+            self.histogram[index] += count
+        self.approximate = True
+
+    def summary(self, points=(50, 95, 99)):
+        latency_count = sum(self.histogram)
+        return {
+            'probes': self.probes,
+            'healthy': self.healthy,
+            'availability': round(self.healthy / self.probes, 6) if self.probes else None,
+            'latency_ms': (histogram_percentiles(self.histogram, points) if self.approximate
+                           else percentiles(self.latencies, points)),
+            'latency_avg_ms': round(self.latency_sum_ms / latency_count, 3) if latency_count else None,
+            'approximate': self.approximate
+        }
+
+
+def record_probes(results, checked_at):
+    """Insert one probe row per checked application from HealthChecker results"""
+    rows = [
+        {
+            'application_id': application_id,
+            'checked_at': checked_at,
+            'healthy': result['status'] == HEALTHY,
+            'latency_ms': percentiles(result['latencies_ms'], (50,))['p50']
+        }
+        for application_id, result in results.items()
+        if result['status'] != UNKNOWN
+    ]
+    if rows:
+        db.session.execute(insert(HealthProbe), rows)
+    return len(rows)
+
+
+def downsample_health_probes(raw_retention_hours=None, resolution_seconds=None, rollup_retention_days=None):
+    """Fold raw probes older than the raw retention into rollup buckets.
+
+    Only whole buckets are folded, so a bucket is never split between raw
+    probes and a rollup. Rollups older than the rollup retention are deleted.
+    """
+    config = current_app.config
+    if raw_retention_hours is None:
+        raw_retention_hours = config.get('HEALTH_PROBE_RAW_RETENTION_HOURS', 48)
+    if resolution_seconds is None:
+        resolution_seconds = _resolution()
+    if rollup_retention_days is None:
+        rollup_retention_days = config.get('HEALTH_ROLLUP_RETENTION_DAYS', 400)
+
+    now = datetime.utcnow()
+    cutoff = bucket_start(now - timedelta(hours=raw_retention_hours), resolution_seconds)
+
+    buckets = {}
+    probes = (
+        db.session.query(HealthProbe.application_id, HealthProbe.checked_at,
+                         HealthProbe.healthy, HealthProbe.latency_ms)
+        .filter(HealthProbe.checked_at < cutoff)
+        .yield_per(10000)
+    )
+    for application_id, checked_at, healthy, latency_ms in probes:
+        key = (application_id, bucket_start(checked_at, resolution_seconds))
+        stats = buckets.get(key)
+        if stats is None:
+            stats = buckets[key] = ProbeStats()
+        stats.add_probe(healthy, latency_ms)
+
+    if buckets:
+        # Merge into rollups already written for the same buckets
+        first_bucket = min(start for _, start in buckets)
+        existing = {
+            (rollup.application_id, rollup.bucket_start): rollup
+            for rollup in HealthProbeRollup.query.filter(
+                HealthProbeRollup.bucket_start >= first_bucket,
+                HealthProbeRollup.bucket_start < cutoff
+            )
+        }
+        for (application_id, start), stats in buckets.items():
+            rollup = existing.get((application_id, start))
+            if rollup is None:
+                db.session.add(HealthProbeRollup(
+                    application_id=application_id,
+                    bucket_start=start,
+                    probes=stats.probes,
+                    healthy=stats.healthy,
+                    latency_sum_ms=stats.latency_sum_ms,
+                    latency_histogram=stats.histogram
+                ))
+                continue
+            stats.add_rollup(rollup.probes, rollup.healthy, rollup.latency_sum_ms, rollup.latency_histogram)
+            rollup.probes = stats.probes
+            rollup.healthy = stats.healthy
+            rollup.latency_sum_ms = stats.latency_sum_ms
+            rollup.latency_histogram = stats.histogram
+
+    deleted_probes = HealthProbe.query.filter(HealthProbe.checked_at < cutoff).delete(synchronize_session=False)
+    expired_rollups = HealthProbeRollup.query.filter(
+        HealthProbeRollup.bucket_start < now - timedelta(days=rollup_retention_days)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+    logger.info(f"Downsampled {deleted_probes} health probes into {len(buckets)} rollups, "
+                f"expired {expired_rollups} rollups")
+    return {'probes': deleted_probes, 'rollups': len(buckets), 'expired_rollups': expired_rollups}
+
+
+def _load_history(application_id, since, until):
+    """Rollups and raw probes of an application from since up to until"""
+    rollups = (
+        db.session.query(HealthProbeRollup.bucket_start, HealthProbeRollup.probes, HealthProbeRollup.healthy,
+                         HealthProbeRollup.latency_sum_ms, HealthProbeRollup.latency_histogram)
+        .filter(HealthProbeRollup.application_id == application_id,
+                HealthProbeRollup.bucket_start >= bucket_start(since, _resolution()),
+                HealthProbeRollup.bucket_start < until)
+        .all()
+    )
+    probes = (
+        db.session.query(HealthProbe.checked_at, HealthProbe.healthy, HealthProbe.latency_ms)
+        .filter(HealthProbe.application_id == application_id,
+                HealthProbe.checked_at >= since,
+                HealthProbe.checked_at < until)
+        .all()
+    )
+    return rollups, probes
+
+
+def health_summary(application_id, windows, now=None):
+    """Availability and latency percentiles over each of windows (timedeltas) up to now.
+
+    Windows reaching into downsampled history include whole rollup buckets,
+    so their start is rounded down to the rollup resolution.
+    """
+    now = now or datetime.utcnow()
+    rollups, probes = _load_history(application_id, now - max(windows), now)
+
+    summaries = []
+    for window in windows:
+        since = now - window
+        stats = ProbeStats()
+        first_bucket = bucket_start(since, _resolution())
+        for start, count, healthy, latency_sum_ms, histogram in rollups:
+            if start >= first_bucket:
+                stats.add_rollup(count, healthy, latency_sum_ms, histogram)
+        for checked_at, healthy, latency_ms in probes:
+            if checked_at >= since:
+                stats.add_probe(healthy, latency_ms)
+        summaries.append({'since': since.isoformat(), 'until': now.isoformat(), **stats.summary()})
+    return summaries
+
+
+def health_series(application_id, since, until, step):
+    """Availability and latency per step wide bucket from since up to until"""
+    step_seconds = max(int(step.total_seconds()), _resolution())
+    rollups, probes = _load_history(application_id, since, until)
+
+    points = {}
+    for start, count, healthy, latency_sum_ms, histogram in rollups:
+        key = bucket_start(start, step_seconds)
+        points.setdefault(key, ProbeStats()).add_rollup(count, healthy, latency_sum_ms, histogram)
+    for checked_at, healthy, latency_ms in probes:
+        key = bucket_start(checked_at, step_seconds)
+        points.setdefault(key, ProbeStats()).add_probe(healthy, latency_ms)
+
+    return [
+        {'bucket_start': start.isoformat(), **points[start].summary()}
+        for start in sorted(points)
+    ]
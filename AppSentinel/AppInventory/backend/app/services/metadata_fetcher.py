@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+import aiohttp
+from sqlalchemy import bindparam, update
+from app import db
+from app.models.application import Application
+from app.utils.logger import logger
+
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+NOT_MODIFIED = 'not_modified'
+FAILED = 'failed'
+
+
+def metadata_hash(metadata):
+    """SHA-256 of the canonical JSON form of metadata"""
+    canonical = json.dumps(metadata, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class MetadataFetcher:
+    """Fetches metadata documents for many applications concurrently.
+
+    Requests carry the ETag and Last-Modified validators from the previous
+    fetch, so unchanged upstream documents come back as 304 without a body.
+    """
+
+    def __init__(self, concurrency=50, timeout=10, verify_ssl=False):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.verify_ssl = verify_ssl
+
+    def fetch(self, targets):
+        """Fetch {application_id: (url, etag, last_modified)} and return {application_id: result}"""
+        return asyncio.run(self.fetch_async(targets))
+
+    async def fetch_async(self, targets):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=None if self.verify_ssl else False)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*[
+                self._fetch_one(session, semaphore, *target) for target in targets.values()
+            ])
+        return dict(zip(targets.keys(), results))
+
+    async def _fetch_one(self, session, semaphore, url, etag=None, last_modified=None):
+        headers = {'Accept': 'application/json'}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        async with semaphore:
+            try:
+                async with session.get(url, headers=headers, allow_redirects=True) as response:
+                    if response.status == 304:
+                        return {'status': NOT_MODIFIED}
+                    if response.status != 200:
+                        return {'status': FAILED, 'error': f"HTTP {response.status}"}
+                    metadata = await response.json(content_type=None)
+                    return {
+                        'status': CHANGED,
+                        'metadata': metadata,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                    }
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.debug(f"Metadata fetch of {url} failed: {str(e)}")
+                return {'status': FAILED, 'error': str(e) or type(e).__name__}
+
+
+def refresh_metadata(applications, fetcher):
+    """Fetch metadata for applications and store only what changed, without committing.
+
+    Content changes are written through the ORM, so they are audited.
+    Documents whose hash matches the stored one are not written; if only
+    their validators changed, those are updated in one bulk statement
+    that bypasses auditing. Returns {application_id: status}.
+    """
+    applications = [application for application in applications if application.metadata_url]
+    if not applications:
+        return {}
+
+    results = fetcher.fetch({
+        application.id: (application.metadata_url, application.metadata_etag, application.metadata_last_modified)
+        for application in applications
+    })
+
+    statuses = {}
+    validators = []
+    now = datetime.utcnow()
+    for application in applications:
+        result = results[application.id]
+        status = result['status']
+        if status == CHANGED:
+            content_hash = metadata_hash(result['metadata'])
+            if content_hash == application.metadata_hash:
+                status = UNCHANGED
+                if (result['etag'], result['last_modified']) != (application.metadata_etag,
+                                                                  application.metadata_last_modified):
+                    validators.append({
+                        'application_id': application.id,
+                        'etag': result['etag'],
+                        'last_modified': result['last_modified']
+                    })
+            else:
+                application.app_metadata = result['metadata']
+                application.metadata_hash = content_hash
+                application.metadata_etag = result['etag']
+                application.metadata_last_modified = result['last_modified']
+                application.last_metadata_update = now
+        elif status == FAILED:
+            logger.warning(f"Metadata fetch for application {application.id} failed: {result['error']}")
+        statuses[application.id] = status
+
+    if validators:
+        table = Application.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam('application_id'))
+            # Keep updated_at as is: the application itself did not change
+            .values(metadata_etag=bindparam('etag'), metadata_last_modified=bindparam('last_modified'),
+                    updated_at=table.c.updated_at),
+            validators
+        )
+    return statuses
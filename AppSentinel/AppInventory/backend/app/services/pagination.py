@@ -0,0 +1,122 @@
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import DateTime, tuple_
+from app.utils.logger import logger
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+class PaginationService:
+    """Keyset and offset pagination over column-projected queries"""
+
+    _count_cache = {}
+    _count_cache_lock = threading.Lock()
+
+    @staticmethod
+    def encode_cursor(values):
+        """Encode the sort key of the last row of a page into an opaque cursor"""
+        payload = json.dumps(list(values), separators=(',', ':'), default=_to_cursor_value)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor, expected_length):
+        """Decode a cursor produced by encode_cursor back into its sort key"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        except (ValueError, UnicodeError) as e:
+            raise InvalidCursorError(f"Malformed cursor: {str(e)}")
+
+        if not isinstance(values, list) or len(values) != expected_length:
+            raise InvalidCursorError("Cursor does not match the requested ordering")
+        return values
+
+    @staticmethod
+    def decode_keyset(cursor, order_columns):
+        """Decode a cursor into values typed for comparison with order_columns"""
+        values = PaginationService.decode_cursor(cursor, len(order_columns))
+        try:
+            return [_from_cursor_value(column, value) for column, value in zip(order_columns, values)]
+        except (TypeError, ValueError) as e:
+            raise InvalidCursorError(f"Malformed cursor: {str(e)}")
+
+    @staticmethod
+    def count(query, cache_key=None):
+        """Count the rows matched by a query, optionally cached for APPLICATION_COUNT_CACHE_TTL seconds"""
+        ttl = current_app.config.get('APPLICATION_COUNT_CACHE_TTL', 0)
+        if cache_key is None or not ttl:
+            return PaginationService._count(query)
+
+        now = time.monotonic()
+        with PaginationService._count_cache_lock:
+            cached = PaginationService._count_cache.get(cache_key)
+        if cached and cached[1] > now:
+            logger.debug(f"Count cache hit for {cache_key}")
+            return cached[0]
+
+        total = PaginationService._count(query)
+        with PaginationService._count_cache_lock:
+            PaginationService._count_cache[cache_key] = (total, now + ttl)
+        return total
+
+    @staticmethod
+    def clear_count_cache():
+        """Drop all cached counts"""
+        with PaginationService._count_cache_lock:
+            PaginationService._count_cache.clear()
+
+    @staticmethod
+    def keyset_page(query, order_columns, cursor=None, per_page=10, descending=False):
+        """Return (rows, next_cursor) for the page that follows cursor.
+
+        order_columns must be non-nullable and together unique (e.g. name, id),
+        so that a row-value comparison continues exactly after the last row.
+        """
+        if cursor:
+            values = PaginationService.decode_keyset(cursor, order_columns)
+            if descending:
+                query = query.filter(tuple_(*order_columns) < tuple_(*values))
+            else:
+                query = query.filter(tuple_(*order_columns) > tuple_(*values))
+
+        ordering = [column.desc() for column in order_columns] if descending else order_columns
+        rows = query.order_by(*ordering).limit(per_page + 1).all()
+
+        next_cursor = None
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            last = rows[-1]
+            next_cursor = PaginationService.encode_cursor(
+                [getattr(last, column.key) for column in order_columns]
+            )
+        return rows, next_cursor
+
+    @staticmethod
+    def offset_page(query, order_columns, page=1, per_page=10, descending=False):
+        """Return the rows of a 1-based page using LIMIT/OFFSET"""
+        page = max(page, 1)
+        ordering = [column.desc() for column in order_columns] if descending else order_columns
+        return query.order_by(*ordering).limit(per_page).offset((page - 1) * per_page).all()
+
+    @staticmethod
+    def _count(query):
+        return query.order_by(None).count()
+
+
+def _to_cursor_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _from_cursor_value(column, value):
+    # Datetimes travel as ISO strings and must be compared as timestamps again
+    if value is not None and isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    return value
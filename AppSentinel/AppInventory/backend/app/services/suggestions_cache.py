@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.services.pagination import PaginationService
+from app.utils.logger import logger
+
+VERSION_KEY = 'appinventory:suggestions:version'
+VALUE_KEY = 'appinventory:suggestions:{name}:{version}'
+DIRTY_FLAG = 'suggestions_dirty'
+
+
+class SuggestionsCache:
+    """Cache for filter suggestions keyed by a dataset version.
+
+    The version is bumped after any transaction that touched applications or
+    application controls commits, so cached values never need to be expired
+    explicitly. With the 'redis' backend the version and values are shared by
+    all workers; the 'memory' backend is per process and additionally expires
+    entries after SUGGESTIONS_CACHE_TTL seconds so other workers catch up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._local = {}
+        self._redis = None
+        self._ttl = 300
+
+    def init_app(self, app):
+        self._ttl = app.config.get('SUGGESTIONS_CACHE_TTL', 300)
+        if app.config.get('SUGGESTIONS_CACHE_BACKEND', 'memory') == 'redis':
+            import redis
+            self._redis = redis.Redis.from_url(app.config.get('REDIS_URL', 'redis://redis:6379/0'))
+            logger.info("Using Redis backend for filter suggestions cache")
+
+    def version(self):
+        """Return the current dataset version"""
+        if self._redis is not None:
+            try:
+                return int(self._redis.get(VERSION_KEY) or 0)
+            except Exception as e:
+                logger.error(f"Error reading suggestions version from Redis: {str(e)}")
+                return None
+        return self._version
+
+    def get_or_compute(self, name, compute):
+        """Return the cached value for name, calling compute() on a miss"""
+        version = self.version()
+        if version is None:
+            return compute()
+
+        key = (name, version)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._local.get(key)
+        if cached and (self._redis is not None or cached[1] > now):
+            return cached[0]
+
+        value = None
+        if self._redis is not None:
+            value = self._redis_get(name, version)
+        if value is None:
+            logger.debug(f"Suggestions cache miss for {name} at version {version}")
+            value = compute()
+            if self._redis is not None:
+                self._redis_set(name, version, value)
+
+        with self._lock:
+            # Entries for older versions can never be read again
+            self._local = {k: v for k, v in self._local.items() if k[1] == version}
+            self._local[key] = (value, now + self._ttl)
+        return value
+
+    def invalidate(self):
+        """Move to a new dataset version"""
+        if self._redis is not None:
+            try:
+                self._redis.incr(VERSION_KEY)
+                return
+            except Exception as e:
+                logger.error(f"Error bumping suggestions version in Redis: {str(e)}")
+        with self._lock:
+            self._version += 1
+            self._local.clear()
+
+    def _redis_get(self, name, version):
+        try:
+            raw = self._redis.get(VALUE_KEY.format(name=name, version=version))
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            logger.error(f"Error reading suggestions from Redis: {str(e)}")
+            return None
+
+    def _redis_set(self, name, version, value):
+        try:
+            # Old versions are unreachable, so let Redis reclaim them eventually
+            self._redis.set(VALUE_KEY.format(name=name, version=version), json.dumps(value), ex=86400)
+        except Exception as e:
+            logger.error(f"Error writing suggestions to Redis: {str(e)}")
+
+
+suggestions_cache = SuggestionsCache()
+
+
+def mark_suggestions_stale(session):
+    """Flag a session so the suggestions cache is invalidated when it commits"""
+    if session is not None:
+        session.info[DIRTY_FLAG] = True
+
+
+def attributes_changed(target, attributes):
+    """Whether a flushed object changed any of attributes"""
+    state = inspect(target)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop(DIRTY_FLAG, False):
+        suggestions_cache.invalidate()
+        PaginationService.clear_count_cache()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(DIRTY_FLAG, None)
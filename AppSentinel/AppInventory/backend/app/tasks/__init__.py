@@ -1 +1,2 @@
 from .application_lifecycle import *
+from .audit_maintenance import *
@@ -1,10 +1,16 @@
 from app.celery_app import celery_app
 from app.models.application import Application
+from app.services.health_checker import HealthChecker, percentiles
+from app.services.health_history import downsample_health_probes, record_probes
+from app.services.metadata_fetcher import CHANGED, FAILED, MetadataFetcher, refresh_metadata
+from app.tasks.batching import enqueue_chunks
 from app.utils.logger import logger
 from app import db
 from datetime import datetime
+from flask import current_app
 import requests
 from celery.exceptions import MaxRetriesExceededError
+from sqlalchemy import bindparam, update
 from sqlalchemy.exc import SQLAlchemyError
 
 @celery_app.task(bind=True, max_retries=3, name='tasks.check_application_health')
@@ -22,6 +28,8 @@ def check_application_health(self, application_id):
         # Update application status
         application.last_health_check = datetime.utcnow()
         application.health_status = health_status
+        record_probes({application.id: {'status': health_status, 'latencies_ms': []}},
+                      application.last_health_check)
         db.session.commit()
 
         return health_status
@@ -35,22 +43,17 @@ def check_application_health(self, application_id):
 
 @celery_app.task(bind=True, max_retries=3, name='tasks.update_application_metadata')
 def update_application_metadata(self, application_id):
-    """Update application metadata"""
+    """Update application metadata if the upstream document changed"""
     try:
         application = Application.query.get(application_id)
         if not application:
             logger.error(f"Application {application_id} not found")
             return False
 
-        # Add metadata update logic here
-        metadata = _fetch_application_metadata(application)
-        
-        # Update application metadata
-        application.metadata = metadata
-        application.last_metadata_update = datetime.utcnow()
+        status = refresh_metadata([application], _metadata_fetcher()).get(application_id)
         db.session.commit()
 
-        return True
+        return status is not None and status != FAILED
 
     except SQLAlchemyError as e:
         logger.error(f"Database error updating application metadata: {str(e)}")
@@ -59,18 +62,139 @@ def update_application_metadata(self, application_id):
         logger.error(f"Error updating application metadata: {str(e)}")
         return False
 
+@celery_app.task(bind=True, max_retries=3, name='tasks.update_applications_metadata')
+def update_applications_metadata(self, application_ids):
+    """Refresh the metadata of a batch of applications concurrently in one transaction.
+
+    Only applications whose metadata document changed are written.
+    """
+    try:
+        applications = Application.query.filter(Application.id.in_(application_ids)).all()
+        statuses = refresh_metadata(applications, _metadata_fetcher())
+        db.session.commit()
+
+        summary = {'checked': len(statuses)}
+        for status in statuses.values():
+            summary[status] = summary.get(status, 0) + 1
+        summary['failed_ids'] = [application_id for application_id, status in statuses.items() if status == FAILED]
+        logger.info(f"Refreshed metadata of {len(statuses)} applications: {summary.get(CHANGED, 0)} changed, "
+                    f"{len(summary['failed_ids'])} failed")
+        return summary
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error updating application metadata: {str(e)}")
+        raise self.retry(exc=e, countdown=60)
+
+@celery_app.task(bind=True, max_retries=3, name='tasks.check_applications_health')
+def check_applications_health(self, application_ids):
+    """Check the health of a batch of applications concurrently"""
+    try:
+        targets = dict(
+            db.session.query(Application.id, Application.health_check_url)
+            .filter(Application.id.in_(application_ids))
+            .all()
+        )
+        if not targets:
+            return {'checked': 0}
+
+        config = current_app.config
+        checker = HealthChecker(
+            concurrency=config.get('HEALTH_CHECK_CONCURRENCY', 100),
+            timeout=config.get('HEALTH_CHECK_TIMEOUT', 10),
+            samples=config.get('HEALTH_CHECK_SAMPLES', 1),
+            verify_ssl=config.get('HEALTH_CHECK_VERIFY_SSL', False)
+        )
+        results = checker.check(targets)
+
+        # One executemany UPDATE keyed by primary key for the whole batch
+        checked_at = datetime.utcnow()
+        table = Application.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam('application_id'))
+            # Keep updated_at as is: a health check does not change the application
+            .values(health_status=bindparam('status'), last_health_check=bindparam('checked_at'),
+                    health_latency_ms=bindparam('latency_ms'), updated_at=table.c.updated_at),
+            [
+                {
+                    'application_id': application_id,
+                    'status': result['status'],
+                    'checked_at': checked_at,
+                    'latency_ms': percentiles(result['latencies_ms'], (50,))['p50']
+                }
+                for application_id, result in results.items()
+            ]
+        )
+        record_probes(results, checked_at)
+        db.session.commit()
+
+        latencies = [latency for result in results.values() for latency in result['latencies_ms']]
+        summary = {
+            'checked': len(results),
+            'healthy': sum(1 for result in results.values() if result['status'] == 'HEALTHY'),
+            'latency_ms': percentiles(latencies),
+            'applications': {
+                application_id: {'status': result['status'], **percentiles(result['latencies_ms'])}
+                for application_id, result in results.items()
+            }
+        }
+        logger.info(f"Checked health of {summary['checked']} applications: "
+                    f"{summary['healthy']} healthy, latency {summary['latency_ms']}")
+        return summary
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error checking application health: {str(e)}")
+        raise self.retry(exc=e, countdown=60)
+    except Exception as e:
+        logger.error(f"Error checking application health: {str(e)}")
+        return False
+
 @celery_app.task(name='tasks.schedule_health_checks')
 def schedule_health_checks():
-    """Schedule health checks for all active applications"""
+    """Schedule batched health checks for all active applications"""
     try:
-        applications = Application.query.filter_by(active=True).all()
-        for app in applications:
-            check_application_health.delay(app.id)
+        batch_size = current_app.config.get('HEALTH_CHECK_BATCH_SIZE', 200)
+        application_ids = [
+            application_id for (application_id,) in
+            db.session.query(Application.id)
+            .filter(Application.active.is_(True), Application.health_check_url.isnot(None))
+            .order_by(Application.id)
+        ]
+        enqueue_chunks(check_applications_health, application_ids, batch_size)
         return True
     except Exception as e:
         logger.error(f"Error scheduling health checks: {str(e)}")
         return False
 
+@celery_app.task(name='tasks.schedule_metadata_updates')
+def schedule_metadata_updates():
+    """Schedule batched metadata updates for all active applications on the bulk queue"""
+    try:
+        batch_size = current_app.config.get('METADATA_UPDATE_BATCH_SIZE', 100)
+        application_ids = [
+            application_id for (application_id,) in
+            db.session.query(Application.id)
+            .filter(Application.active.is_(True), Application.metadata_url.isnot(None))
+            .order_by(Application.id)
+        ]
+        enqueue_chunks(update_applications_metadata, application_ids, batch_size)
+        return True
+    except Exception as e:
+        logger.error(f"Error scheduling metadata updates: {str(e)}")
+        return False
+
+@celery_app.task(bind=True, max_retries=3, name='tasks.downsample_health_probes')
+def downsample_health_probes_task(self):
+    """Fold raw health probes past their retention into hourly rollups"""
+    try:
+        return downsample_health_probes()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error downsampling health probes: {str(e)}")
+        raise self.retry(exc=e, countdown=300)
+
 def _perform_health_check(application):
     """Perform health check for an application"""
     try:
@@ -91,16 +215,10 @@ def _perform_health_check(application):
     except requests.RequestException:
         return "UNHEALTHY"
 
-def _fetch_application_metadata(application):
-    """Fetch metadata for an application"""
-    # Implement metadata fetching logic here
-    # This could include:
-    # - Version information
-    # - Dependencies
-    # - Configuration
-    # - Usage statistics
-    return {
-        "last_checked": datetime.utcnow().isoformat(),
-        "version": application.version or "unknown",
-        "status": application.health_status or "unknown"
-    }
+def _metadata_fetcher():
+    config = current_app.config
+    return MetadataFetcher(
+        concurrency=config.get('METADATA_FETCH_CONCURRENCY', 50),
+        timeout=config.get('METADATA_FETCH_TIMEOUT', 10),
+        verify_ssl=config.get('METADATA_FETCH_VERIFY_SSL', False)
+    )
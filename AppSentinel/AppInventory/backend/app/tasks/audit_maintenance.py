@@ -0,0 +1,27 @@
+from flask import current_app
+from app.celery_app import celery_app
+from app.services.audit_archive import archive_audit_logs, get_audit_archive
+from app.services.audit_partitions import ensure_audit_partitions
+from app.utils.logger import logger
+from sqlalchemy.exc import SQLAlchemyError
+
+@celery_app.task(bind=True, max_retries=3, name='tasks.ensure_audit_partitions')
+def ensure_audit_partitions_task(self, months_ahead=3):
+    """Create upcoming monthly audit_logs partitions"""
+    try:
+        return ensure_audit_partitions(months_ahead)
+    except SQLAlchemyError as e:
+        logger.error(f"Database error creating audit log partitions: {str(e)}")
+        raise self.retry(exc=e, countdown=300)
+
+@celery_app.task(bind=True, max_retries=3, name='tasks.archive_audit_logs')
+def archive_audit_logs_task(self, older_than_months=None):
+    """Move audit log months older than AUDIT_ARCHIVE_AFTER_MONTHS to the archive"""
+    try:
+        if older_than_months is None:
+            older_than_months = current_app.config.get('AUDIT_ARCHIVE_AFTER_MONTHS', 12)
+        entries = archive_audit_logs(get_audit_archive(), older_than_months)
+        return [entry['file'] for entry in entries]
+    except SQLAlchemyError as e:
+        logger.error(f"Database error archiving audit logs: {str(e)}")
+        raise self.retry(exc=e, countdown=300)
@@ -0,0 +1,19 @@
+from celery import group
+
+def chunked(items, size):
+    """Split items into consecutive lists of at most size items"""
+    items = list(items)
+    size = max(1, size)
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+def enqueue_chunks(task, application_ids, chunk_size, **options):
+    """Enqueue task(chunk) for each chunk of application_ids.
+
+    Every chunk becomes one task taking a list of ids, published together
+    over one broker connection. options are passed to apply_async and
+    override the task's route, e.g. queue or priority.
+    """
+    chunks = chunked(application_ids, chunk_size)
+    if not chunks:
+        return None
+    return group(task.s(chunk) for chunk in chunks).apply_async(**options)
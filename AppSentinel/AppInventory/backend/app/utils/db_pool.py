@@ -0,0 +1,199 @@
+"""
+Database engine factory and connection pool metrics.
+
+AppInventory and AppScore each ship a copy of this module, as each backend
+is built from its own directory. The copies differ only in the
+service-specific values below the imports; keep the rest in sync
+(tests/unit/test_db_pool.py in each service checks that they match).
+
+The Flask app configures Flask-SQLAlchemy with engine_options(), and code
+outside it (services, scripts, one-off tools) should use get_engine(), so a
+process holds one pool per database.
+
+Pool settings come from a deployment profile, overridable per setting
+(explicit settings such as Config attributes, then environment variables):
+
+    DB_POOL_PROFILE     web (default) or worker, for Celery workers and
+                        other bulk jobs
+    DB_POOL_SIZE        connections kept open
+    DB_MAX_OVERFLOW     extra connections opened under load
+    DB_POOL_TIMEOUT     seconds to wait for a connection before failing
+    DB_POOL_RECYCLE     seconds after which a connection is replaced
+    DB_POOL_PRE_PING    test connections on checkout (default true)
+    DB_CONNECT_TIMEOUT  seconds to wait for Postgres to accept a connection
+    DB_PGBOUNCER        true when connecting through PgBouncer in
+                        transaction mode: PgBouncer does the pooling, so
+                        connections are not kept open here
+    DB_APPLICATION_NAME application_name reported to Postgres
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Mapping, Optional
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import NullPool, QueuePool
+
+# Service-specific values. Everything outside this block is identical in
+# AppInventory/backend/app/utils/db_pool.py and AppScore/backend/utils/db_pool.py.
+APPLICATION_NAME = 'appinventory'
+# Database used by get_engine() when no URL is given or configured
+DEFAULT_DATABASE_URL = None
+
+# End of service-specific values
+
+POOL_PROFILES = {
+    # Request handling: a few warm connections, bounded bursts, fail fast
+    'web': {'DB_POOL_SIZE': 5, 'DB_MAX_OVERFLOW': 5, 'DB_POOL_TIMEOUT': 10},
+    # Bulk jobs: fewer idle connections, longer waits instead of errors
+    'worker': {'DB_POOL_SIZE': 2, 'DB_MAX_OVERFLOW': 8, 'DB_POOL_TIMEOUT': 30},
+}
+DEFAULTS = {
+    'DB_POOL_PROFILE': 'web',
+    'DB_POOL_RECYCLE': 1800,
+    'DB_POOL_PRE_PING': True,
+    'DB_CONNECT_TIMEOUT': 5,
+    'DB_PGBOUNCER': False,
+}
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 't')
+    return bool(value)
+
+def pool_settings(settings: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """Effective DB_* pool settings: explicit settings, then environment, then profile defaults"""
+    settings = settings or {}
+
+    def _get(name, default=None):
+        value = settings.get(name)
+        if value is None:
+            value = os.getenv(name)
+        return default if value is None else value
+
+    profile = _get('DB_POOL_PROFILE', DEFAULTS['DB_POOL_PROFILE'])
+    if profile not in POOL_PROFILES:
+        raise ValueError(f"Unknown DB_POOL_PROFILE {profile!r}; expected one of {', '.join(POOL_PROFILES)}")
+    defaults = dict(DEFAULTS, **POOL_PROFILES[profile])
+    return {
+        'DB_POOL_PROFILE': profile,
+        'DB_POOL_SIZE': int(_get('DB_POOL_SIZE', defaults['DB_POOL_SIZE'])),
+        'DB_MAX_OVERFLOW': int(_get('DB_MAX_OVERFLOW', defaults['DB_MAX_OVERFLOW'])),
+        'DB_POOL_TIMEOUT': float(_get('DB_POOL_TIMEOUT', defaults['DB_POOL_TIMEOUT'])),
+        'DB_POOL_RECYCLE': int(_get('DB_POOL_RECYCLE', defaults['DB_POOL_RECYCLE'])),
+        'DB_POOL_PRE_PING': _flag(_get('DB_POOL_PRE_PING', defaults['DB_POOL_PRE_PING'])),
+        'DB_CONNECT_TIMEOUT': int(_get('DB_CONNECT_TIMEOUT', defaults['DB_CONNECT_TIMEOUT'])),
+        'DB_PGBOUNCER': _flag(_get('DB_PGBOUNCER', defaults['DB_PGBOUNCER'])),
+    }
+
+def engine_options(database_url: str, settings: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """Keyword arguments for create_engine (or SQLALCHEMY_ENGINE_OPTIONS) for database_url"""
+    if not database_url or database_url.startswith('sqlite'):
+        # SQLite picks its own pool class, which takes none of the options below
+        return {}
+
+    settings = pool_settings(settings)
+    options = {
+        'connect_args': {
+            'connect_timeout': settings['DB_CONNECT_TIMEOUT'],
+            'application_name': os.getenv('DB_APPLICATION_NAME', APPLICATION_NAME),
+        },
+    }
+    if settings['DB_PGBOUNCER']:
+        # PgBouncer hands out server connections per transaction; holding
+        # client connections here would only duplicate its pool
+        options['poolclass'] = InstrumentedNullPool
+        return options
+
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': settings['DB_POOL_SIZE'],
+        'max_overflow': settings['DB_MAX_OVERFLOW'],
+        'pool_timeout': settings['DB_POOL_TIMEOUT'],
+        'pool_recycle': settings['DB_POOL_RECYCLE'],
+        'pool_pre_ping': settings['DB_POOL_PRE_PING'],
+        # Reuse the most recent connection, so connections opened for a
+        # burst go idle and are recycled instead of being kept warm
+        'pool_use_lifo': True,
+    })
+    return options
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(database_url: str = None, settings: Optional[Mapping[str, Any]] = None):
+    """The process-wide engine for database_url (SQLALCHEMY_DATABASE_URI or DATABASE_URL by default)"""
+    database_url = (database_url or os.getenv('SQLALCHEMY_DATABASE_URI') or os.getenv('DATABASE_URL')
+                    or DEFAULT_DATABASE_URL)
+    with _engines_lock:
+        engine = _engines.get(database_url)
+        if engine is None:
+            engine = create_engine(database_url, **engine_options(database_url, settings))
+            _engines[database_url] = engine
+        return engine
+
+class PoolMetrics:
+    """Connection checkout counts and wait times for the pools of this process"""
+
+    def __init__(self, samples: int = 1000):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=samples)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self._waits.append(seconds)
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self, engine=None) -> Dict[str, Any]:
+        """Counters, recent checkout wait percentiles and, given an engine, its pool state"""
+        with self._lock:
+            waits = sorted(self._waits)
+            data = {'checkouts': self.checkouts, 'timeouts': self.timeouts}
+            max_wait = self.max_wait
+
+        def _percentile(fraction):
+            return round(waits[min(len(waits) - 1, int(fraction * len(waits)))] * 1000, 2) if waits else None
+
+        data['wait_ms'] = {'p50': _percentile(0.5), 'p95': _percentile(0.95), 'p99': _percentile(0.99),
+                           'max': round(max_wait * 1000, 2)}
+        pool = getattr(engine, 'pool', None)
+        if isinstance(pool, QueuePool):
+            data.update({
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                # overflow() counts up from -pool_size until the pool is full
+                'overflow': max(pool.overflow(), 0),
+            })
+        elif pool is not None:
+            data['pool'] = type(pool).__name__
+        return data
+
+pool_metrics = PoolMetrics()
+
+class _TimedCheckout:
+    """Records how long each checkout waited for (or opened) a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record(time.perf_counter() - started)
+        return connection
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class InstrumentedNullPool(_TimedCheckout, NullPool):
+    pass
@@ -21,6 +21,8 @@ while ! nc -z redis 6379; do
 done
 echo "Redis is ready!"
 
-# Start Celery worker
-echo "Starting Celery worker..."
-celery -A app.celery_app.celery_app worker --loglevel=info
+# Start Celery worker on the queues named in CELERY_QUEUES
+CELERY_QUEUES=${CELERY_QUEUES:-interactive,bulk}
+CELERY_WORKER_NAME=${CELERY_WORKER_NAME:-celery}
+echo "Starting Celery worker $CELERY_WORKER_NAME for queues: $CELERY_QUEUES"
+celery -A app.celery_app.celery_app worker --loglevel=info -Q "$CELERY_QUEUES" -n "$CELERY_WORKER_NAME@%h"
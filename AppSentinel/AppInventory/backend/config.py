@@ -7,6 +7,43 @@ class Config:
     LOG_LEVEL = 'INFO'
     # Use either SQLALCHEMY_DATABASE_URI or DATABASE_URL
     SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI') or os.environ.get('DATABASE_URL')
+    # Seconds to cache application listing totals; 0 disables the cache
+    APPLICATION_COUNT_CACHE_TTL = int(os.environ.get('APPLICATION_COUNT_CACHE_TTL', 0))
+    # Filter suggestions cache: 'memory' (per process) or 'redis' (shared across workers)
+    SUGGESTIONS_CACHE_BACKEND = os.environ.get('SUGGESTIONS_CACHE_BACKEND', 'memory')
+    SUGGESTIONS_CACHE_TTL = int(os.environ.get('SUGGESTIONS_CACHE_TTL', 300))
+    REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
+    # Connection pool: DB_POOL_PROFILE 'web' or 'worker' (Celery workers) sets the defaults,
+    # the other settings override them; DB_PGBOUNCER leaves pooling to PgBouncer.
+    # See app/utils/db_pool.py
+    DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE', 'web')
+    DB_POOL_SIZE = os.environ.get('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = os.environ.get('DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT = os.environ.get('DB_POOL_TIMEOUT')
+    DB_POOL_RECYCLE = os.environ.get('DB_POOL_RECYCLE')
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'false').lower() == 'true'
+    # Audit log months older than this are moved to gzip JSONL files in AUDIT_ARCHIVE_DIR
+    AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', 'archive/audit_logs')
+    AUDIT_ARCHIVE_AFTER_MONTHS = int(os.environ.get('AUDIT_ARCHIVE_AFTER_MONTHS', 12))
+    # Health sweeps probe this many applications per task, with up to
+    # HEALTH_CHECK_CONCURRENCY requests in flight
+    HEALTH_CHECK_BATCH_SIZE = int(os.environ.get('HEALTH_CHECK_BATCH_SIZE', 200))
+    HEALTH_CHECK_CONCURRENCY = int(os.environ.get('HEALTH_CHECK_CONCURRENCY', 100))
+    HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 10))
+    HEALTH_CHECK_SAMPLES = int(os.environ.get('HEALTH_CHECK_SAMPLES', 1))
+    HEALTH_CHECK_VERIFY_SSL = os.environ.get('HEALTH_CHECK_VERIFY_SSL', 'false').lower() == 'true'
+    # Metadata sweeps update this many applications per task on the bulk queue
+    METADATA_UPDATE_BATCH_SIZE = int(os.environ.get('METADATA_UPDATE_BATCH_SIZE', 100))
+    METADATA_FETCH_CONCURRENCY = int(os.environ.get('METADATA_FETCH_CONCURRENCY', 50))
+    METADATA_FETCH_TIMEOUT = float(os.environ.get('METADATA_FETCH_TIMEOUT', 10))
+    METADATA_FETCH_VERIFY_SSL = os.environ.get('METADATA_FETCH_VERIFY_SSL', 'false').lower() == 'true'
+    # Every probe is kept for HEALTH_PROBE_RAW_RETENTION_HOURS, then downsampled into
+    # buckets of HEALTH_ROLLUP_RESOLUTION_SECONDS kept for HEALTH_ROLLUP_RETENTION_DAYS
+    HEALTH_PROBE_RAW_RETENTION_HOURS = int(os.environ.get('HEALTH_PROBE_RAW_RETENTION_HOURS', 48))
+    HEALTH_ROLLUP_RESOLUTION_SECONDS = int(os.environ.get('HEALTH_ROLLUP_RESOLUTION_SECONDS', 3600))
+    HEALTH_ROLLUP_RETENTION_DAYS = int(os.environ.get('HEALTH_ROLLUP_RETENTION_DAYS', 400))
+    # Default SLO reporting windows for /api/applications/<id>/health
+    HEALTH_SLO_WINDOWS = os.environ.get('HEALTH_SLO_WINDOWS', '1h,24h,7d,30d')
 
 class DevelopmentConfig(Config):
     """Development configuration."""
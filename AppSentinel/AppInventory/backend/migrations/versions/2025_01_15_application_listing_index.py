@@ -0,0 +1,28 @@
+"""Add composite index for application listing
+
+Revision ID: 02_application_listing_index
+Revises: 01_initial_setup
+Create Date: 2025-01-15 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '02_application_listing_index'
+down_revision = '01_initial_setup'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Department/team equality filters followed by keyset ordering on (name, id)
+    op.create_index(
+        'ix_applications_department_team_name',
+        'applications',
+        ['department_name', 'team_name', 'name', 'id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_applications_department_team_name', table_name='applications')
@@ -0,0 +1,143 @@
+"""Partition audit_logs by month and add query indexes
+
+Revision ID: 03_partition_audit_logs
+Revises: 02_application_listing_index
+Create Date: 2025-01-20 10:00:00.000000
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '03_partition_audit_logs'
+down_revision = '02_application_listing_index'
+branch_labels = None
+depends_on = None
+
+# Monthly partitions created ahead of the current month; the
+# tasks.ensure_audit_partitions beat task keeps extending this window.
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    ('ix_audit_logs_table_record_timestamp', ['table_name', 'record_id', 'timestamp']),
+    ('ix_audit_logs_user_timestamp', ['user_id', 'timestamp']),
+    ('ix_audit_logs_timestamp_id', ['timestamp', 'id']),
+]
+
+COLUMNS = 'id, table_name, record_id, action, changed_fields, user_id, jira_ticket, timestamp'
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partitions(first_month, last_month):
+    month = first_month
+    while month <= last_month:
+        next_month = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS audit_logs_y{month.year}m{month.month:02d} "
+            f"PARTITION OF audit_logs FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+
+
+def upgrade():
+    bind = op.get_bind()
+    exists = sa.inspect(bind).has_table('audit_logs')
+
+    if bind.dialect.name != 'postgresql':
+        # Partitioning is PostgreSQL-only; other backends just get the indexes
+        if not exists:
+            op.create_table('audit_logs',
+                sa.Column('id', sa.Integer(), nullable=False),
+                sa.Column('table_name', sa.String(length=100), nullable=False),
+                sa.Column('record_id', sa.Integer(), nullable=False),
+                sa.Column('action', sa.String(length=20), nullable=False),
+                sa.Column('changed_fields', sa.JSON(), nullable=True),
+                sa.Column('user_id', sa.String(length=100), nullable=True),
+                sa.Column('jira_ticket', sa.String(length=20), nullable=True),
+                sa.Column('timestamp', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+                sa.PrimaryKeyConstraint('id')
+            )
+        for name, columns in INDEXES:
+            op.create_index(name, 'audit_logs', columns)
+        return
+
+    current_month = date.today().replace(day=1)
+    first_month = current_month
+
+    if exists:
+        op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+        # Free up constraint and index names for the partitioned table
+        op.execute("ALTER INDEX IF EXISTS audit_logs_pkey RENAME TO audit_logs_unpartitioned_pkey")
+        for name, _ in INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        oldest = bind.execute(sa.text("SELECT min(timestamp) FROM audit_logs_unpartitioned")).scalar()
+        if oldest is not None:
+            first_month = min(first_month, oldest.date().replace(day=1))
+    else:
+        op.execute("CREATE SEQUENCE audit_logs_id_seq")
+
+    # The partition key has to be part of the primary key. The existing id
+    # sequence is reused so ids keep increasing across the migration.
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            table_name VARCHAR(100) NOT NULL,
+            record_id INTEGER NOT NULL,
+            action VARCHAR(20) NOT NULL,
+            changed_fields JSON,
+            user_id VARCHAR(100),
+            jira_ticket VARCHAR(20),
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+
+    _create_month_partitions(first_month, _add_months(current_month, MONTHS_AHEAD))
+    op.execute("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    for name, columns in INDEXES:
+        op.create_index(name, 'audit_logs', columns)
+
+    if exists:
+        op.execute(f"""
+            INSERT INTO audit_logs ({COLUMNS})
+            SELECT id, table_name, record_id, action, changed_fields, user_id, jira_ticket,
+                   COALESCE(timestamp, CURRENT_TIMESTAMP)
+            FROM audit_logs_unpartitioned
+        """)
+        op.execute("DROP TABLE audit_logs_unpartitioned")
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='audit_logs')
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER INDEX IF EXISTS audit_logs_pkey RENAME TO audit_logs_partitioned_pkey")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq') PRIMARY KEY,
+            table_name VARCHAR(100) NOT NULL,
+            record_id INTEGER NOT NULL,
+            action VARCHAR(20) NOT NULL,
+            changed_fields JSON,
+            user_id VARCHAR(100),
+            jira_ticket VARCHAR(20),
+            timestamp TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned")
+    # Dropping the parent drops every partition with it
+    op.execute("DROP TABLE audit_logs_partitioned")
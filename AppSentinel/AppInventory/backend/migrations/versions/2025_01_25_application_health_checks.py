@@ -0,0 +1,34 @@
+"""Add application health check columns
+
+Revision ID: 04_application_health_checks
+Revises: 03_partition_audit_logs
+Create Date: 2025-01-25 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '04_application_health_checks'
+down_revision = '03_partition_audit_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.add_column(sa.Column('active', sa.Boolean(), nullable=False, server_default=sa.true()))
+        batch_op.add_column(sa.Column('health_check_url', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('health_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('last_health_check', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('health_latency_ms', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.drop_column('health_latency_ms')
+        batch_op.drop_column('last_health_check')
+        batch_op.drop_column('health_status')
+        batch_op.drop_column('health_check_url')
+        batch_op.drop_column('active')
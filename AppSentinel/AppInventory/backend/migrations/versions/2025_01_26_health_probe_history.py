@@ -0,0 +1,48 @@
+"""Add health probe history and rollup tables
+
+Revision ID: 05_health_probe_history
+Revises: 04_application_health_checks
+Create Date: 2025-01-26 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '05_health_probe_history'
+down_revision = '04_application_health_checks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('health_probes',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('checked_at', sa.DateTime(), nullable=False),
+        sa.Column('healthy', sa.Boolean(), nullable=False),
+        sa.Column('latency_ms', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_health_probes_application_checked_at', 'health_probes', ['application_id', 'checked_at'])
+    op.create_index('ix_health_probes_checked_at', 'health_probes', ['checked_at'])
+
+    op.create_table('health_probe_rollups',
+        sa.Column('application_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('probes', sa.Integer(), nullable=False),
+        sa.Column('healthy', sa.Integer(), nullable=False),
+        sa.Column('latency_sum_ms', sa.Float(), nullable=False),
+        sa.Column('latency_histogram', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('application_id', 'bucket_start')
+    )
+
+
+def downgrade():
+    op.drop_table('health_probe_rollups')
+    op.drop_index('ix_health_probes_checked_at', table_name='health_probes')
+    op.drop_index('ix_health_probes_application_checked_at', table_name='health_probes')
+    op.drop_table('health_probes')
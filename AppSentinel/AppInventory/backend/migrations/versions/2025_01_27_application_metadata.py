@@ -0,0 +1,36 @@
+"""Add application metadata columns
+
+Revision ID: 06_application_metadata
+Revises: 05_health_probe_history
+Create Date: 2025-01-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '06_application_metadata'
+down_revision = '05_health_probe_history'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.add_column(sa.Column('metadata_url', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('app_metadata', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('metadata_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('metadata_etag', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('metadata_last_modified', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('last_metadata_update', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.drop_column('last_metadata_update')
+        batch_op.drop_column('metadata_last_modified')
+        batch_op.drop_column('metadata_etag')
+        batch_op.drop_column('metadata_hash')
+        batch_op.drop_column('app_metadata')
+        batch_op.drop_column('metadata_url')
@@ -4,3 +4,30 @@ import sys
 # Add the backend directory to the Python path
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(backend_dir)
+
+import pytest
+
+@pytest.fixture
+def app():
+    """Application on an in-memory SQLite database with all tables created"""
+    from app import create_app, db
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'JWT_SECRET_KEY': 'test-secret-key-of-at-least-32-bytes',
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def auth_headers(app):
+    from flask_jwt_extended import create_access_token
+    from app import db
+    from app.models.user import User
+    user = User(username='tester', email='tester@example.com', password='secret')
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f"Bearer {create_access_token(identity=str(user.id))}"}
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+def test_health_check_url_is_set_and_returned(app, auth_headers):
+    client = app.test_client()
+    response = client.post('/api/applications', headers=auth_headers, json={
+        'name': 'billing', 'description': 'Billing', 'application_type': 'web',
+        'health_check_url': 'https://billing.example.com/healthz'
+    })
+    assert response.status_code == 201
+    assert response.json['health_check_url'] == 'https://billing.example.com/healthz'
+    assert response.json['active'] is True
+
+    response = client.put(f"/api/applications/{response.json['id']}", headers=auth_headers,
+                          json={'active': False, 'health_check_url': None})
+    assert response.json['active'] is False and response.json['health_check_url'] is None
+
+    listed = client.get('/api/applications', headers=auth_headers).json['applications']
+    assert listed[0]['active'] is False and listed[0]['health_check_url'] is None
+
+def test_schedule_health_checks_picks_active_applications_with_url(app, monkeypatch):
+    from app import db
+    from app.models import Application
+    from app.tasks import application_lifecycle
+
+    db.session.add_all([
+        Application(name='a', application_type='web', health_check_url='https://a.example.com'),
+        Application(name='b', application_type='web', health_check_url='https://b.example.com', active=False),
+        Application(name='c', application_type='web')
+    ])
+    db.session.commit()
+    enqueued = []
+    monkeypatch.setattr(application_lifecycle, 'enqueue_chunks',
+                        lambda task, ids, size: enqueued.append((task.name, ids)))
+
+    assert application_lifecycle.schedule_health_checks()
+    expected = [Application.query.filter_by(name='a').one().id]
+    assert enqueued == [('tasks.check_applications_health', expected)]
+
+def test_check_applications_health_writes_batch_without_touching_updated_at(app, monkeypatch):
+    from app import db
+    from app.models import Application, HealthProbe
+    from app.services.health_checker import HealthChecker
+    from app.tasks.application_lifecycle import check_applications_health
+
+    updated_at = datetime(2025, 1, 1)
+    applications = [
+        Application(name='up', application_type='web', health_check_url='https://up.example.com'),
+        Application(name='down', application_type='web', health_check_url='https://down.example.com')
+    ]
+    db.session.add_all(applications)
+    db.session.flush()
+    for application in applications:
+        application.updated_at = updated_at
+    db.session.commit()
+    up, down = (application.id for application in applications)
+
+    monkeypatch.setattr(HealthChecker, 'check', lambda self, targets: {
+        up: {'status': 'HEALTHY', 'latencies_ms': [12.0, 30.0]},
+        down: {'status': 'UNHEALTHY', 'latencies_ms': []}
+    })
+    summary = check_applications_health([up, down])
+    assert summary['checked'] == 2 and summary['healthy'] == 1
+
+    db.session.expire_all()
+    rows = {application.name: application for application in Application.query.all()}
+    assert rows['up'].health_status == 'HEALTHY' and rows['up'].health_latency_ms == 12.0
+    assert rows['down'].health_status == 'UNHEALTHY' and rows['down'].health_latency_ms is None
+    assert rows['up'].last_health_check is not None
+    assert {application.updated_at for application in rows.values()} == {updated_at}
+    assert HealthProbe.query.count() == 2
+
+def test_schedule_metadata_updates_picks_active_applications_with_url(app, monkeypatch):
+    from app import db
+    from app.models import Application
+    from app.tasks import application_lifecycle
+
+    db.session.add_all([
+        Application(name='a', application_type='web', metadata_url='https://a.example.com/meta'),
+        Application(name='b', application_type='web', metadata_url='https://b.example.com/meta', active=False),
+        Application(name='c', application_type='web')
+    ])
+    db.session.commit()
+    enqueued = []
+    monkeypatch.setattr(application_lifecycle, 'enqueue_chunks',
+                        lambda task, ids, size: enqueued.append((task.name, ids)))
+
+    assert application_lifecycle.schedule_metadata_updates()
+    expected = [Application.query.filter_by(name='a').one().id]
+    assert enqueued == [('tasks.update_applications_metadata', expected)]
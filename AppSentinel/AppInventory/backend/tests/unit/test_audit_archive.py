@@ -0,0 +1,100 @@
+import os
+import pytest
+from datetime import date, datetime
+from app.services.audit_archive import AuditArchive
+
+def _row(id, timestamp, table_name='applications', user_id='user123'):
+    return {
+        'id': id,
+        'table_name': table_name,
+        'record_id': 1,
+        'action': 'UPDATE',
+        'changed_fields': {'name': {'old': 'a', 'new': 'b'}},
+        'user_id': user_id,
+        'jira_ticket': 'JIRA-1',
+        'timestamp': timestamp
+    }
+
+def test_write_month_records_manifest(tmp_path):
+    archive = AuditArchive(str(tmp_path))
+    entry = archive.write_month(date(2023, 1, 1), [
+        _row(1, datetime(2023, 1, 5)),
+        _row(2, datetime(2023, 1, 20))
+    ])
+
+    assert entry['file'] == 'audit_logs_y2023m01.jsonl.gz'
+    assert entry['rows'] == 2
+    assert archive.load_manifest()['files'] == [entry]
+    assert archive.horizon() == datetime(2023, 2, 1)
+
+def test_query_filters_and_orders_newest_first(tmp_path):
+    archive = AuditArchive(str(tmp_path))
+    archive.write_month(date(2023, 1, 1), [
+        _row(1, datetime(2023, 1, 5)),
+        _row(2, datetime(2023, 1, 20), user_id='someone-else')
+    ])
+    archive.write_month(date(2023, 2, 1), [_row(3, datetime(2023, 2, 3))])
+
+    assert [r['id'] for r in archive.query({})] == [3, 2, 1]
+    assert [r['id'] for r in archive.query({'user_id': 'user123'})] == [3, 1]
+    assert [r['id'] for r in archive.query({}, since=datetime(2023, 1, 10))] == [3, 2]
+    assert [r['id'] for r in archive.query({}, before=(datetime(2023, 2, 3), 3), limit=1)] == [2]
+    assert archive.count({}) == 3
+
+def test_rearchiving_a_month_adds_a_part(tmp_path):
+    archive = AuditArchive(str(tmp_path))
+    archive.write_month(date(2023, 1, 1), [_row(1, datetime(2023, 1, 5))])
+    entry = archive.write_month(date(2023, 1, 1), [_row(2, datetime(2023, 1, 6))])
+
+    assert entry['file'] == 'audit_logs_y2023m01-part2.jsonl.gz'
+    assert [r['id'] for r in archive.query({})] == [2, 1]
+
+def test_query_stops_reading_once_page_is_filled(tmp_path, monkeypatch):
+    archive = AuditArchive(str(tmp_path))
+    for month in range(1, 5):
+        archive.write_month(date(2023, month, 1), [
+            _row(month * 10 + day, datetime(2023, month, day)) for day in range(1, 4)
+        ])
+    read = []
+    original = archive._read
+    monkeypatch.setattr(archive, '_read', lambda entry: read.append(entry['month']) or original(entry))
+
+    assert [r['id'] for r in archive.query({}, offset=2, limit=2)] == [41, 33]
+    assert read == ['2023-04', '2023-03']
+
+    read.clear()
+    assert archive.count({}, since=datetime(2023, 2, 2)) == 8
+    assert read == ['2023-02']
+    assert archive.count({'user_id': 'user123'}, since=datetime(2023, 2, 2)) == 8
+    read.clear()
+    assert archive.count({'user_id': 'user123'}, since=datetime(2023, 2, 2)) == 8
+    assert read == []
+
+def test_failed_delete_leaves_month_unarchived(app, tmp_path, monkeypatch):
+    from app import db
+    from app.models import AuditLog
+    from app.services.audit_archive import archive_audit_logs
+
+    db.session.execute(AuditLog.__table__.insert(), [{
+        'table_name': 'applications', 'record_id': i, 'action': 'UPDATE',
+        'timestamp': datetime(2023, 1, i + 1)
+    } for i in range(3)])
+    db.session.commit()
+    archive = AuditArchive(str(tmp_path))
+
+    def fail():
+        raise RuntimeError('connection lost')
+    monkeypatch.setattr(db.session, 'commit', fail)
+    with pytest.raises(RuntimeError):
+        archive_audit_logs(archive)
+
+    assert archive.load_manifest()['files'] == []
+    assert archive.query({}) == []
+    assert os.listdir(tmp_path) == []
+    assert db.session.query(AuditLog).count() == 3
+
+    monkeypatch.undo()
+    written = archive_audit_logs(archive)
+    assert [entry['file'] for entry in written] == ['audit_logs_y2023m01.jsonl.gz']
+    assert [r['record_id'] for r in archive.query({})] == [2, 1, 0]
+    assert db.session.query(AuditLog).count() == 0
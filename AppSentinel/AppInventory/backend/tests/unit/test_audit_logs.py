@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+def test_audit_logs_keyset_pages_within_window(app, auth_headers, tmp_path):
+    from app import db
+    from app.models import AuditLog
+
+    app.config['AUDIT_ARCHIVE_DIR'] = str(tmp_path)
+    start = datetime(2025, 1, 1)
+    db.session.execute(AuditLog.__table__.insert(), [{
+        'table_name': 'applications', 'record_id': i, 'action': 'UPDATE',
+        'timestamp': start + timedelta(days=i)
+    } for i in range(10)])
+    db.session.commit()
+
+    client = app.test_client()
+    record_ids, cursor = [], ''
+    while cursor is not None:
+        response = client.get('/api/audit-logs', headers=auth_headers, query_string={
+            'since': '2025-01-03', 'until': '2025-01-08', 'per_page': 2, 'cursor': cursor
+        })
+        assert response.status_code == 200
+        record_ids += [item['record_id'] for item in response.json['items']]
+        cursor = response.json['next_cursor']
+
+    assert record_ids == [6, 5, 4, 3, 2]
+    assert response.json['total'] == 5
+
+    response = client.get('/api/audit-logs', headers=auth_headers, query_string={'since': 'yesterday'})
+    assert response.status_code == 400
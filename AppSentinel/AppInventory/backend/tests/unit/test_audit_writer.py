@@ -0,0 +1,32 @@
+from sqlalchemy import event
+
+def _count_audit_inserts(engine):
+    statements = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO audit_logs'):
+            statements.append(parameters)
+    return statements
+
+def test_flush_writes_audit_rows_in_one_insert(app):
+    from app import db
+    from app.models import Application, AuditLog
+
+    statements = _count_audit_inserts(db.engine)
+    db.session.add_all([Application(name='billing', application_type='web'),
+                        Application(name='payroll', application_type='web')])
+    db.session.commit()
+
+    assert len(statements) == 1
+    assert sorted(log.action for log in AuditLog.query.all()) == ['INSERT', 'INSERT']
+
+    application = Application.query.filter_by(name='billing').one()
+    application.team_name = 'Payments'
+    application._audit_user_id = 'alice'
+    db.session.commit()
+
+    assert len(statements) == 2
+    log = AuditLog.query.filter_by(action='UPDATE').one()
+    assert (log.record_id, log.user_id) == (application.id, 'alice')
+    assert log.changed_fields['team_name'] == {'old': None, 'new': 'Payments'}
@@ -0,0 +1,13 @@
+def test_production_database_uri_comes_from_secrets_manager(monkeypatch):
+    from app import config, create_app
+
+    requested = []
+    secret = {'username': 'inventory', 'password': 's3cret', 'host': 'db', 'port': 5432, 'dbname': 'appinventory'}
+    monkeypatch.setattr(config, 'get_secret', lambda name: requested.append(name) or secret)
+    monkeypatch.setenv('FLASK_ENV', 'production')
+    monkeypatch.setenv('AWS_SECRET_NAME', 'appsentinel/prod/database')
+
+    app = create_app()
+
+    assert requested == ['appsentinel/prod/database']
+    assert app.config['SQLALCHEMY_DATABASE_URI'] == 'postgresql://inventory:s3cret@db:5432/appinventory'
@@ -0,0 +1,52 @@
+import os
+import pytest
+from sqlalchemy import create_engine, exc
+from app.utils.db_pool import InstrumentedNullPool, InstrumentedQueuePool, engine_options, pool_metrics
+from app.utils import db_pool
+
+POSTGRES_URL = 'postgresql://user:pass@db:5432/appinventory'
+SIBLING_DB_POOL = ('..', '..', '..', '..', 'AppScore', 'backend', 'utils', 'db_pool.py')
+
+def test_worker_profile_with_overrides():
+    options = engine_options(POSTGRES_URL, {'DB_POOL_PROFILE': 'worker', 'DB_MAX_OVERFLOW': '3'})
+
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_timeout']) == (2, 3, 30.0)
+    assert options['pool_pre_ping'] and options['pool_recycle'] == 1800
+
+def test_pgbouncer_leaves_pooling_to_pgbouncer():
+    options = engine_options(POSTGRES_URL, {'DB_PGBOUNCER': True})
+
+    assert options['poolclass'] is InstrumentedNullPool
+    assert 'pool_size' not in options and 'pool_pre_ping' not in options
+
+def test_sqlite_gets_no_pool_options():
+    assert engine_options('sqlite://', {'DB_POOL_PROFILE': 'worker'}) == {}
+
+def test_checkout_timeouts_are_counted(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    before = pool_metrics.snapshot()
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        state = pool_metrics.snapshot(engine)
+
+    assert state['checkouts'] == before['checkouts'] + 1
+    assert state['timeouts'] == before['timeouts'] + 1
+    assert (state['checked_out'], state['overflow']) == (1, 0)
+
+def _shared_part(path):
+    with open(path) as f:
+        source = f.read()
+    start = source.index('# Service-specific values.')
+    end = source.index('# End of service-specific values')
+    return source[:start] + source[end:]
+
+def test_copies_of_db_pool_match():
+    """The other service's copy of db_pool.py differs only in its service-specific values"""
+    sibling = os.path.join(os.path.dirname(os.path.abspath(__file__)), *SIBLING_DB_POOL)
+    if not os.path.exists(sibling):
+        pytest.skip('other service not checked out alongside this one')
+    assert _shared_part(db_pool.__file__) == _shared_part(sibling)
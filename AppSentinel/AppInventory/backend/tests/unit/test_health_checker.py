@@ -0,0 +1,13 @@
+from app.services.health_checker import HealthChecker, percentiles
+
+def test_percentiles_use_nearest_rank():
+    values = list(range(1, 101))
+    assert percentiles(values) == {'p50': 50, 'p95': 95, 'p99': 99}
+    assert percentiles([]) == {'p50': None, 'p95': None, 'p99': None}
+
+def test_missing_url_is_unknown_and_unreachable_is_unhealthy():
+    checker = HealthChecker(concurrency=2, timeout=2)
+    results = checker.check({1: None, 2: 'http://127.0.0.1:1/health'})
+
+    assert results[1] == {'status': 'UNKNOWN', 'latencies_ms': []}
+    assert results[2]['status'] == 'UNHEALTHY'
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+import pytest
+from app.services.health_history import (
+    LATENCY_BUCKETS_MS, ProbeStats, bucket_start, histogram_percentiles, parse_window
+)
+
+def test_parse_window():
+    assert parse_window('15m') == timedelta(minutes=15)
+    assert parse_window('24h') == timedelta(hours=24)
+    assert parse_window('30d') == timedelta(days=30)
+    for value in ('', '0h', '1w', 'h'):
+        with pytest.raises(ValueError):
+            parse_window(value)
+
+def test_bucket_start_rounds_down():
+    assert bucket_start(datetime(2025, 1, 1, 10, 59, 59), 3600) == datetime(2025, 1, 1, 10)
+    assert bucket_start(datetime(2025, 1, 1, 10, 7), 300) == datetime(2025, 1, 1, 10, 5)
+
+def test_raw_probes_give_exact_percentiles():
+    stats = ProbeStats()
+    for latency in range(1, 101):
+        stats.add_probe(True, float(latency))
+    stats.add_probe(False, None)
+
+    summary = stats.summary()
+    assert summary['probes'] == 101
+    assert summary['healthy'] == 100
+    assert summary['latency_ms'] == {'p50': 50.0, 'p95': 95.0, 'p99': 99.0}
+    assert summary['approximate'] is False
+
+def test_rollups_merge_into_histogram_percentiles():
+    raw = ProbeStats()
+    for latency in range(100, 300):
+        raw.add_probe(True, float(latency))
+
+    stats = ProbeStats()
+    stats.add_rollup(raw.probes, raw.healthy, raw.latency_sum_ms, raw.histogram)
+    stats.add_probe(False, None)
+
+    summary = stats.summary()
+    assert summary['probes'] == 201
+    assert summary['availability'] == round(200 / 201, 6)
+    assert summary['latency_avg_ms'] == 199.5
+    assert summary['approximate'] is True
+    # Within one 25% wide bucket of the exact values
+    assert 199 * 0.8 <= summary['latency_ms']['p50'] <= 199 * 1.25
+    assert 289 * 0.8 <= summary['latency_ms']['p95'] <= 289 * 1.25
+
+def test_histogram_overflow_and_empty():
+    histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    assert histogram_percentiles(histogram) == {'p50': None, 'p95': None, 'p99': None}
+    histogram[-1] = 3
+    assert histogram_percentiles(histogram, (50,)) == {'p50': LATENCY_BUCKETS_MS[-1]}
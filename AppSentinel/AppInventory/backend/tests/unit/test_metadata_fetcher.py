@@ -0,0 +1,152 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.services.metadata_fetcher import CHANGED, FAILED, NOT_MODIFIED, MetadataFetcher, metadata_hash
+
+DOCUMENT = {'version': '1.2.0', 'dependencies': ['flask', 'celery']}
+
+class MetadataHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path != '/metadata':
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(DOCUMENT).encode()
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def metadata_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MetadataHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+def test_metadata_hash_ignores_key_order():
+    assert metadata_hash({'a': 1, 'b': [1, 2]}) == metadata_hash({'b': [1, 2], 'a': 1})
+    assert metadata_hash({'a': 1}) != metadata_hash({'a': 2})
+
+def test_fetch_sends_validators(metadata_server):
+    fetcher = MetadataFetcher(concurrency=2, timeout=5)
+    results = fetcher.fetch({
+        1: (f'{metadata_server}/metadata', None, None),
+        2: (f'{metadata_server}/metadata', '"v1"', None),
+        3: (f'{metadata_server}/missing', None, None)
+    })
+
+    assert results[1] == {'status': CHANGED, 'metadata': DOCUMENT, 'etag': '"v1"', 'last_modified': None}
+    assert results[2] == {'status': NOT_MODIFIED}
+    assert results[3] == {'status': FAILED, 'error': 'HTTP 404'}
+
+class StubFetcher:
+    def __init__(self, results):
+        self.results = results
+        self.targets = None
+
+    def fetch(self, targets):
+        self.targets = targets
+        return {application_id: self.results[application_id] for application_id in targets}
+
+def _applications(updated_at):
+    from app import db
+    from app.models import Application
+
+    applications = {
+        name: Application(name=name, application_type='web', metadata_url=f'https://{name}.example.com/meta')
+        for name in ('new', 'same', 'cached', 'broken')
+    }
+    applications['nourl'] = Application(name='nourl', application_type='web')
+    db.session.add_all(applications.values())
+    db.session.flush()
+    for name in ('same', 'cached'):
+        applications[name].app_metadata = DOCUMENT
+        applications[name].metadata_hash = metadata_hash(DOCUMENT)
+        applications[name].metadata_etag = '"v1"'
+    for application in applications.values():
+        application.updated_at = updated_at
+    db.session.commit()
+    return applications
+
+def test_refresh_metadata_writes_only_changes(app):
+    from datetime import datetime
+    from app import db
+    from app.models import Application, AuditLog
+    from app.services.metadata_fetcher import UNCHANGED, refresh_metadata
+
+    updated_at = datetime(2025, 1, 1)
+    applications = _applications(updated_at)
+    ids = {name: application.id for name, application in applications.items()}
+    audit_rows = AuditLog.query.count()
+    fetcher = StubFetcher({
+        ids['new']: {'status': CHANGED, 'metadata': DOCUMENT, 'etag': '"v1"', 'last_modified': None},
+        # Same document under a new validator, e.g. after an upstream redeploy
+        ids['same']: {'status': CHANGED, 'metadata': dict(reversed(DOCUMENT.items())), 'etag': '"v2"',
+                      'last_modified': 'Wed, 01 Jan 2025 00:00:00 GMT'},
+        ids['cached']: {'status': NOT_MODIFIED},
+        ids['broken']: {'status': FAILED, 'error': 'HTTP 500'}
+    })
+
+    statuses = refresh_metadata(list(applications.values()), fetcher)
+    db.session.commit()
+
+    assert ids['nourl'] not in fetcher.targets
+    assert fetcher.targets[ids['cached']] == ('https://cached.example.com/meta', '"v1"', None)
+    assert statuses == {ids['new']: CHANGED, ids['same']: UNCHANGED,
+                        ids['cached']: NOT_MODIFIED, ids['broken']: FAILED}
+
+    db.session.expire_all()
+    rows = {application.name: application for application in Application.query.all()}
+    assert rows['new'].app_metadata == DOCUMENT and rows['new'].metadata_hash == metadata_hash(DOCUMENT)
+    assert rows['new'].last_metadata_update is not None and rows['new'].updated_at > updated_at
+    # Validators only: stored without an audit entry or a new updated_at
+    assert (rows['same'].metadata_etag, rows['same'].metadata_last_modified) == \
+        ('"v2"', 'Wed, 01 Jan 2025 00:00:00 GMT')
+    assert rows['same'].last_metadata_update is None
+    for name in ('same', 'cached', 'broken', 'nourl'):
+        assert rows[name].updated_at == updated_at
+
+    audits = AuditLog.query.order_by(AuditLog.id).all()[audit_rows:]
+    assert [(audit.record_id, audit.action) for audit in audits] == [(ids['new'], 'UPDATE')]
+    assert 'app_metadata' in audits[0].changed_fields
+
+def test_refresh_metadata_is_quiet_when_nothing_changed(app):
+    from datetime import datetime
+    from app import db
+    from app.models import Application, AuditLog
+    from app.services.metadata_fetcher import UNCHANGED, refresh_metadata
+
+    _applications(datetime(2025, 1, 1))
+    same = Application.query.filter_by(name='same').one()
+    audit_rows = AuditLog.query.count()
+
+    fetcher = StubFetcher({same.id: {'status': CHANGED, 'metadata': DOCUMENT, 'etag': '"v1"', 'last_modified': None}})
+    assert refresh_metadata([same], fetcher) == {same.id: UNCHANGED}
+    assert not db.session.dirty
+    db.session.commit()
+    assert AuditLog.query.count() == audit_rows
+
+def test_metadata_url_is_set_and_returned(app, auth_headers):
+    client = app.test_client()
+    response = client.post('/api/applications', headers=auth_headers, json={
+        'name': 'billing', 'description': 'Billing', 'application_type': 'web',
+        'metadata_url': 'https://billing.example.com/meta'
+    })
+    assert response.status_code == 201
+    assert response.json['metadata_url'] == 'https://billing.example.com/meta'
+    assert response.json['last_metadata_update'] is None
+
+    response = client.put(f"/api/applications/{response.json['id']}", headers=auth_headers,
+                          json={'metadata_url': 'https://billing.example.com/v2/meta'})
+    assert response.json['metadata_url'] == 'https://billing.example.com/v2/meta'
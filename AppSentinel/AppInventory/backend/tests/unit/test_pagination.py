@@ -0,0 +1,60 @@
+import pytest
+from app.services.pagination import PaginationService, InvalidCursorError
+
+def test_cursor_round_trip():
+    cursor = PaginationService.encode_cursor(["backend-api-service", 42])
+    assert PaginationService.decode_cursor(cursor, 2) == ["backend-api-service", 42]
+
+def test_cursor_is_url_safe():
+    cursor = PaginationService.encode_cursor(["a/b+c?d", 1])
+    assert '=' not in cursor
+    assert '/' not in cursor
+    assert '+' not in cursor
+
+def test_malformed_cursor_rejected():
+    with pytest.raises(InvalidCursorError):
+        PaginationService.decode_cursor("not-a-cursor!!", 2)
+
+def test_cursor_length_mismatch_rejected():
+    cursor = PaginationService.encode_cursor(["only-name"])
+    with pytest.raises(InvalidCursorError):
+        PaginationService.decode_cursor(cursor, 2)
+
+def test_datetime_cursor_round_trip():
+    from datetime import datetime
+    from app.models.audit_log import AuditLog
+    from app.services.pagination import _from_cursor_value
+
+    timestamp = datetime(2025, 1, 31, 23, 59, 59, 123456)
+    cursor = PaginationService.encode_cursor([timestamp, 7])
+    values = PaginationService.decode_cursor(cursor, 2)
+    assert _from_cursor_value(AuditLog.timestamp, values[0]) == timestamp
+    assert _from_cursor_value(AuditLog.id, values[1]) == 7
+
+def test_application_listing_walks_keyset_pages(app, auth_headers):
+    from app import db
+    from app.models.application import Application
+
+    for name in ['delta', 'alpha', 'charlie', 'bravo', 'echo']:
+        db.session.add(Application(name=name, department_name='Engineering', application_type='web'))
+    db.session.add(Application(name='foxtrot', department_name='Finance', application_type='web'))
+    db.session.commit()
+
+    client = app.test_client()
+    names, cursor = [], ''
+    while cursor is not None:
+        response = client.get('/api/applications', headers=auth_headers,
+                              query_string={'department': 'Engineering', 'per_page': 2, 'cursor': cursor})
+        assert response.status_code == 200
+        names += [item['name'] for item in response.json['applications']]
+        cursor = response.json['next_cursor']
+
+    assert names == ['alpha', 'bravo', 'charlie', 'delta', 'echo']
+    assert response.json['total'] == 5 and response.json['pages'] == 3
+    assert 'app_metadata' not in response.json['applications'][0]
+
+    response = client.get('/api/applications', headers=auth_headers, query_string={'page': 2, 'per_page': 4})
+    assert [item['name'] for item in response.json['applications']] == ['echo', 'foxtrot']
+
+    response = client.get('/api/applications', headers=auth_headers, query_string={'cursor': 'bogus!!'})
+    assert response.status_code == 400
@@ -0,0 +1,60 @@
+from app.services.suggestions_cache import SuggestionsCache
+
+def test_value_is_computed_once_per_version():
+    cache = SuggestionsCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'departments': ['Engineering']}
+
+    assert cache.get_or_compute('filters', compute) == {'departments': ['Engineering']}
+    assert cache.get_or_compute('filters', compute) == {'departments': ['Engineering']}
+    assert len(calls) == 1
+
+def test_invalidate_forces_recompute():
+    cache = SuggestionsCache()
+    values = iter([{'teams': ['Frontend']}, {'teams': ['Frontend', 'Backend']}])
+
+    assert cache.get_or_compute('filters', lambda: next(values)) == {'teams': ['Frontend']}
+    cache.invalidate()
+    assert cache.get_or_compute('filters', lambda: next(values)) == {'teams': ['Frontend', 'Backend']}
+
+def test_committed_application_change_refreshes_suggestions(app, auth_headers):
+    from app import db
+    from app.models.application import Application
+
+    client = app.test_client()
+    db.session.add(Application(name='billing', department_name='Finance', application_type='web'))
+    db.session.commit()
+    assert client.get('/api/applications/filter-suggestions', headers=auth_headers).json['departments'] == ['Finance']
+
+    application = Application.query.filter_by(name='billing').one()
+    application.department_name = 'Operations'
+    db.session.flush()
+    # Not committed yet, so the cached value is still served
+    assert client.get('/api/applications/filter-suggestions', headers=auth_headers).json['departments'] == ['Finance']
+    db.session.commit()
+    assert client.get('/api/applications/filter-suggestions', headers=auth_headers).json['departments'] == ['Operations']
+
+    response = client.get('/api/dashboard/filters/suggestions', headers=auth_headers)
+    assert response.status_code == 200 and response.json['departments'] == ['Operations']
+
+def test_only_suggestion_columns_invalidate(app):
+    from app import db
+    from app.models.application import Application
+    from app.services.suggestions_cache import suggestions_cache
+
+    application = Application(name='billing', department_name='Finance', application_type='web')
+    db.session.add(application)
+    db.session.commit()
+    version = suggestions_cache.version()
+
+    application.health_status = 'down'
+    application.app_metadata = {'tier': 1}
+    db.session.commit()
+    assert suggestions_cache.version() == version
+
+    application.team_name = 'Payments'
+    db.session.commit()
+    assert suggestions_cache.version() == version + 1
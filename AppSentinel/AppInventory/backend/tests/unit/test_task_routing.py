@@ -0,0 +1,24 @@
+from app.celery_app import BULK_QUEUE, INTERACTIVE_QUEUE, PRIORITY_HIGH, celery_app
+from app.tasks.batching import chunked
+
+def _route(name):
+    route = celery_app.amqp.router.route({}, name)
+    return route['queue'].name, route.get('priority')
+
+def test_single_application_tasks_are_interactive():
+    assert _route('tasks.check_application_health') == (INTERACTIVE_QUEUE, PRIORITY_HIGH)
+    assert _route('tasks.update_application_metadata') == (INTERACTIVE_QUEUE, PRIORITY_HIGH)
+
+def test_sweeps_run_on_bulk_queue():
+    for name in ('tasks.check_applications_health', 'tasks.update_applications_metadata',
+                 'tasks.schedule_health_checks', 'tasks.schedule_metadata_updates'):
+        assert _route(name)[0] == BULK_QUEUE
+
+def test_beat_schedule_only_names_routed_tasks():
+    routes = celery_app.conf.task_routes
+    for entry in celery_app.conf.beat_schedule.values():
+        assert entry['task'] in routes
+
+def test_chunked():
+    assert chunked(range(5), 2) == [[0, 1], [2, 3], [4]]
+    assert chunked([], 2) == []
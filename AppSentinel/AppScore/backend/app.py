@@ -10,6 +10,10 @@ Authors:
 Copyright (c) 2024. All rights reserved.
 """
 
+# Installed first so it also times the imports below (STARTUP_PROFILE=1)
+from utils.startup_profile import startup_profiler
+startup_profiler.install_if_enabled()
+
 from datetime import datetime
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
@@ -25,7 +29,6 @@ from models.score_history import ScoreHistory
 from models.finding import Finding
 from models.risk_params import RiskParameters
 from services.auth_service import AuthService
-from services.report_service import ReportService
 import logging
 import os
 import traceback
@@ -36,7 +39,9 @@ from config import get_config
 from utils.logger import debug_log, log_info, log_debug, log_error
 from utils.base_classes import BaseAPIEndpoint, BaseDataService
 from utils.constants import MESSAGES, SCORE_RANGES
+from utils.db_pool import engine_options, pool_metrics
 import io
+import click
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -44,27 +49,31 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app with configuration
 app = Flask(__name__)
-config = get_config()
-app.config.from_object(config)
+with startup_profiler.step('config'):
+    config = get_config()
+    app.config.from_object(config)
 
 # Set SQLAlchemy database URI
 app.config['SQLALCHEMY_DATABASE_URI'] = config.DATABASE_URL
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool sizing per DB_POOL_PROFILE; see utils/db_pool.py
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(config.DATABASE_URL)
 
 # Initialize extensions
-db.init_app(app)
-CORS(app,
-     resources={
-         r"/api/*": {
-             "origins": ["http://localhost:3000", "http://localhost:3001"],
-             "allow_headers": ["Content-Type", "Authorization"],
-             "expose_headers": ["Content-Range", "X-Total-Count"],
-             "supports_credentials": True,
-             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
-         }
-     })
-jwt = JWTManager(app)
-migrate = Migrate(app, db)
+with startup_profiler.step('extensions'):
+    db.init_app(app)
+    CORS(app,
+         resources={
+             r"/api/*": {
+                 "origins": ["http://localhost:3000", "http://localhost:3001"],
+                 "allow_headers": ["Content-Type", "Authorization"],
+                 "expose_headers": ["Content-Range", "X-Total-Count"],
+                 "supports_credentials": True,
+                 "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+             }
+         })
+    jwt = JWTManager(app)
+    migrate = Migrate(app, db)
 
 # Initialize JWT
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key')  # Change this in production
@@ -140,15 +149,20 @@ def require_auth(f):
 load_dotenv()
 
 # Initialize services
-auth_service = AuthService(db.session, app.config['SECRET_KEY'])
+with startup_profiler.step('services'):
+    auth_service = AuthService(db.session, app.config['SECRET_KEY'])
+app_catalog = None
 
-# Create tables if they don't exist
-with app.app_context():
-    try:
-        db.create_all()
-        logger.info("Database tables checked/created successfully")
-    except Exception as e:
-        logger.error(f"Error checking/creating database tables: {str(e)}")
+def get_app_catalog():
+    """AppCatalogService on the app's engine, so it shares the connection pool"""
+    global app_catalog
+    if app_catalog is None:
+        from services.app_catalog import AppCatalogService
+        app_catalog = AppCatalogService(engine=db.engine)
+    return app_catalog
+
+# Tables are created by `flask init-db`, which the entrypoints run before
+# migrations, rather than on every import of this module
 
 @app.before_first_request
 def init_app():
@@ -293,7 +307,7 @@ def get_team_applications(team_id):
 async def search_catalog_applications():
     """Search applications in the app catalog."""
     query = request.args.get('q', '')
-    apps = await app_catalog.search_applications(query)
+    apps = await get_app_catalog().search_applications(query)
     log_info(f"Retrieved {len(apps)} applications from catalog")
     return jsonify(apps)
 
@@ -303,7 +317,7 @@ async def sync_applications_with_catalog():
     """Sync local applications with the app catalog."""
     try:
         # Get all applications from catalog
-        catalog_apps = await app_catalog.search_applications()
+        catalog_apps = await get_app_catalog().search_applications()
         
         for cat_app in catalog_apps:
             # Check if application exists locally
@@ -1469,6 +1483,40 @@ def create_admin():
         log_error(f"Error creating admin user: {str(e)}")
         db.session.rollback()
 
+@app.cli.command("train-model")
+@click.option('--incremental', is_flag=True, help='Add trees for new score history to the active model')
+def train_model(incremental):
+    """Train a scoring model and activate it if it beats the active one"""
+    from scoring.training import TrainingPipeline
+    result = TrainingPipeline(db.session).run(incremental=incremental)
+    if result['status'] == 'error':
+        log_error(f"Model training failed: {result['message']}")
+    else:
+        log_info(f"Model training finished: {result}")
+
+def _report_service():
+    """ReportService, imported on first use so startup does not load the PDF renderer"""
+    from services.report_service import ReportService
+    return ReportService(db.session)
+
+@app.cli.command("report-bundle")
+@click.option('--team', 'teams', multiple=True, help='Team name; repeat for several. Defaults to all teams')
+@click.option('--application', 'applications', multiple=True, type=int, help='Application id; repeat for several')
+@click.option('--format', 'report_format', type=click.Choice(['pdf', 'json']), default='pdf')
+@click.option('--output', default='reports.zip', help='Path of the ZIP file to write')
+def report_bundle(teams, applications, report_format, output):
+    """Write reports for many teams and applications into one ZIP file"""
+    with open(output, 'wb') as f:
+        manifest = _report_service().build_report_bundle(
+            f,
+            team_names=list(teams) or None,
+            app_ids=list(applications) or None,
+            report_format=report_format
+        )
+    log_info(f"Wrote {len(manifest['files'])} reports to {output}")
+    if manifest['not_found']:
+        log_error(f"Not found: {manifest['not_found']}")
+
 @app.cli.command("seed-data")
 def seed_data():
     """Seed the database with sample data."""
@@ -1569,14 +1617,13 @@ def generate_team_report(team_name):
     """Generate a detailed report for a team."""
     try:
         report_format = request.args.get('format', 'json')
-        report_service = ReportService(db.session)
+        report_service = _report_service()
         
-        report_data = report_service.generate_team_report(team_name)
+        report_data = report_service.get_team_report(team_name, report_format)
         
         if report_format == 'pdf':
-            pdf_data = report_service.convert_to_pdf(report_data, "Team")
             return send_file(
-                io.BytesIO(pdf_data),
+                io.BytesIO(report_data),
                 mimetype='application/pdf',
                 as_attachment=True,
                 download_name=f'team_report_{team_name}.pdf'
@@ -1592,14 +1639,13 @@ def generate_application_report(app_id):
     """Generate a detailed report for an application."""
     try:
         report_format = request.args.get('format', 'json')
-        report_service = ReportService(db.session)
+        report_service = _report_service()
         
-        report_data = report_service.generate_application_report(app_id)
+        report_data = report_service.get_application_report(app_id, report_format)
         
         if report_format == 'pdf':
-            pdf_data = report_service.convert_to_pdf(report_data, "Application")
             return send_file(
-                io.BytesIO(pdf_data),
+                io.BytesIO(report_data),
                 mimetype='application/pdf',
                 as_attachment=True,
                 download_name=f'application_report_{app_id}.pdf'
@@ -1609,13 +1655,72 @@ def generate_application_report(app_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route('/api/reports/bundle', methods=['POST'])
+@debug_log
+def generate_report_bundle():
+    """Start building reports for many teams and applications as one ZIP file.
+
+    Body: {"teams": [...], "applications": [...], "format": "pdf" | "json"}.
+    Without teams or applications, every team is included. Returns a job id;
+    poll /api/reports/bundle/<job_id> and fetch the ZIP from its /download.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        report_format = data.get('format', 'pdf')
+        if report_format not in ('pdf', 'json'):
+            return jsonify({"error": "format must be 'pdf' or 'json'"}), 400
+        try:
+            app_ids = [int(app_id) for app_id in data['applications']] if data.get('applications') else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "applications must be a list of application ids"}), 400
+
+        from sqlalchemy.orm import sessionmaker
+        from services.report_service import submit_report_bundle
+        job_id = submit_report_bundle(
+            sessionmaker(bind=db.engine),
+            team_names=data.get('teams'),
+            app_ids=app_ids,
+            report_format=report_format
+        )
+        return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/reports/bundle/<job_id>', methods=['GET'])
+@debug_log
+def get_report_bundle_status(job_id):
+    """Return the status of a report bundle job"""
+    from services.report_service import get_report_bundle_job
+    job = get_report_bundle_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Report bundle job not found'}), 404
+    job.pop('path', None)
+    return jsonify(job), 200
+
+@app.route('/api/reports/bundle/<job_id>/download', methods=['GET'])
+@debug_log
+def download_report_bundle(job_id):
+    """Download the ZIP of a finished report bundle job"""
+    from services.report_service import get_report_bundle_job
+    job = get_report_bundle_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Report bundle job not found'}), 404
+    if job['status'] != 'success':
+        return jsonify({'error': f"Report bundle is {job['status']}", 'status': job['status']}), 409
+    return send_file(
+        job['path'],
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=f'reports_{datetime.utcnow().strftime("%Y%m%d")}.zip'
+    )
+
 @app.route('/api/reports/vulnerabilities/<int:app_id>', methods=['GET'])
 @debug_log
 def generate_vulnerability_report(app_id):
     """Generate a vulnerability report for an application."""
     try:
         report_format = request.args.get('format', 'json')
-        report_service = ReportService(db.session)
+        report_service = _report_service()
         
         report_data = report_service.generate_vulnerability_report(app_id)
         
@@ -1710,6 +1815,16 @@ def calculate_application_risk(app_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to calculate risk score'}), 500
 
+@app.cli.command("init-db")
+def init_db_tables():
+    """Create database tables that do not exist yet."""
+    try:
+        db.create_all()
+        log_info("Database tables checked/created successfully")
+    except Exception as e:
+        log_error(f"Error checking/creating database tables: {str(e)}")
+        raise
+
 @app.cli.command("db-init")
 def db_init():
     """Initialize the database with migrations and seed data."""
@@ -1752,10 +1867,48 @@ def seed_database():
         app.logger.error(f"Error seeding database: {str(e)}")
         return jsonify({'error': f'Failed to seed database: {str(e)}'}), 500
 
+@app.route('/api/admin/ml/train', methods=['POST'])
+@jwt_required()
+def train_ml_model():
+    """Start a background ML training run.
+    Requires admin privileges.
+    Returns:
+        JSON response with the training job id
+    """
+    try:
+        current_user = get_jwt_identity()
+        if not current_user.get('is_admin'):
+            return jsonify({'error': 'Admin privileges required'}), 403
+
+        from sqlalchemy.orm import sessionmaker
+        from scoring.training import submit_training
+        incremental = bool((request.get_json(silent=True) or {}).get('incremental', False))
+        job_id = submit_training(sessionmaker(bind=db.engine), incremental=incremental)
+        return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+    except Exception as e:
+        app.logger.error(f"Error starting model training: {str(e)}")
+        return jsonify({'error': f'Failed to start training: {str(e)}'}), 500
+
+@app.route('/api/admin/ml/train/<job_id>', methods=['GET'])
+@jwt_required()
+def get_ml_training_job(job_id):
+    """Return the status and metrics of a training job"""
+    current_user = get_jwt_identity()
+    if not current_user.get('is_admin'):
+        return jsonify({'error': 'Admin privileges required'}), 403
+
+    from scoring.training import get_training_job
+    job = get_training_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Training job not found'}), 404
+    return jsonify(job), 200
+
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy"}), 200
+    return jsonify({"status": "healthy", "database_pool": pool_metrics.snapshot(db.engine)}), 200
+
+startup_profiler.report()
 
 if __name__ == '__main__':
     log_info(f"Starting application in {config.APP_ENV.value} mode")
@@ -6,7 +6,6 @@ from enum import Enum
 import os
 from typing import Dict
 from dotenv import load_dotenv
-from services.secrets_manager import get_secrets_manager
 
 # Load environment variables from .env file
 load_dotenv()
@@ -89,6 +88,8 @@ class ProductionConfig(Config):
     def _load_secrets(self):
         """Load secrets from AWS Secrets Manager"""
         try:
+            # Imported here: only production needs it, and it pulls in boto3
+            from services.secrets_manager import get_secrets_manager
             secrets_manager = get_secrets_manager()
             secrets = secrets_manager.get_secrets(list(self.SECRET_NAMES.values()))
             
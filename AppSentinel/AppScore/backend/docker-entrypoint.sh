@@ -19,7 +19,9 @@ if [ ! -f /app/migrations/alembic.ini ]; then
     flask db init
 fi
 
-# Run database migrations
+# Create missing tables, then run database migrations
+echo "Creating database tables..."
+flask init-db
 echo "Running database migrations..."
 if ! flask db upgrade; then
     echo "Migration failed, but continuing since tables may already exist..."
@@ -38,7 +38,9 @@ if [ ! -d "migrations" ]; then
     flask db migrate -m "create_initial_tables"
 fi
 
-# Apply any pending migrations
+# Create missing tables, then apply any pending migrations
+echo "Creating database tables..."
+flask init-db
 echo "Running database migrations..."
 flask db upgrade
 
@@ -1,9 +1,13 @@
+from extensions import db
 from services.app_catalog import AppCatalogService
 
 def main():
     # Initialize app catalog service
     app_catalog = AppCatalogService()
-    
+
+    # Create tables on the catalog's engine
+    db.Model.metadata.create_all(app_catalog.engine)
+
     # Add test data
     app_catalog.add_test_data()
     
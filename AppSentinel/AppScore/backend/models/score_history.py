@@ -1,10 +1,14 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, DateTime, JSON, ForeignKey, String, Boolean
+from sqlalchemy import Column, Integer, Float, DateTime, JSON, ForeignKey, String, Boolean, Index
 from sqlalchemy.orm import relationship
 from extensions import db
 
 class ScoreHistory(db.Model):
     __tablename__ = 'score_history'
+    __table_args__ = (
+        # Latest score per application, used to skip rewriting unchanged scores
+        Index('ix_score_history_application_id_id', 'application_id', 'id'),
+    )
 
     id = Column(Integer, primary_key=True)
     application_id = Column(Integer, ForeignKey('applications.id'), nullable=False)
@@ -33,4 +37,8 @@ class MLModelVersion(db.Model):
     id = Column(Integer, primary_key=True)
     version = Column(String(50), nullable=False)
     description = Column(String(500))
+    model_type = Column(String(100))
+    parameters = Column(JSON)
+    metrics = Column(JSON)
+    active = Column(Boolean, default=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,78 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+import multiprocessing
+import os
+import threading
+import joblib
+from .model_registry import model_paths
+
+# 0 disables the process pool; CPU work then runs on the DB thread pool
+CPU_WORKERS = int(os.getenv('SCORING_CPU_WORKERS', os.cpu_count() or 1))
+DB_WORKERS = int(os.getenv('SCORING_DB_WORKERS', 8))
+
+_lock = threading.Lock()
+_cpu_executor = None
+_db_executor = None
+
+
+def get_cpu_executor():
+    """Process pool for rules and model evaluation, or None if disabled"""
+    global _cpu_executor
+    if CPU_WORKERS <= 0:
+        return None
+    with _lock:
+        if _cpu_executor is None:
+            # spawn, not fork: the parent runs DB and executor threads
+            _cpu_executor = ProcessPoolExecutor(
+                max_workers=CPU_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _cpu_executor
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Thread pool for blocking SQLAlchemy work"""
+    global _db_executor
+    with _lock:
+        if _db_executor is None:
+            _db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix='scoring-db')
+        return _db_executor
+
+
+def shutdown_executors(wait: bool = True):
+    global _cpu_executor, _db_executor
+    with _lock:
+        if _cpu_executor is not None:
+            _cpu_executor.shutdown(wait=wait)
+        if _db_executor is not None:
+            _db_executor.shutdown(wait=wait)
+        _cpu_executor = _db_executor = None
+
+
+# Per worker process state, filled on first use
+_worker_models: Dict[str, Any] = {}
+_worker_engines: Dict[str, Any] = {}
+
+
+def score_rows(version: str, rows: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], float]]:
+    """Compute (rules_result, ml_score) for rows in a worker process.
+
+    Workers load each model version from disk once and keep it until another
+    version is requested. Every worker holds its own copy of the forest.
+    """
+    from .ml_engine import SecurityScorePredictor
+    from .rules_engine import RulesEngine
+
+    if version not in _worker_models:
+        paths = model_paths(version)
+        _worker_models.clear()
+        _worker_models[version] = (joblib.load(paths['model']), joblib.load(paths['scaler']))
+    if 'rules' not in _worker_engines:
+        _worker_engines['rules'] = RulesEngine()
+        _worker_engines['predictor'] = SecurityScorePredictor(session=None)
+
+    model, scaler = _worker_models[version]
+    features = _worker_engines['predictor'].prepare_feature_matrix(rows, scaler)
+    ml_scores = [max(0, min(100, float(score))) for score in model.predict(features)]
+    rules = _worker_engines['rules']
+    return [(rules.compute_score(data), ml_score) for data, ml_score in zip(rows, ml_scores)]
@@ -1,72 +1,88 @@
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.base import clone
 from sklearn.preprocessing import StandardScaler
 from typing import Dict, List, Any, Tuple
 import joblib
 import os
+import uuid
 from datetime import datetime
 from sqlalchemy.orm import Session
 from models.score_history import MLModelVersion
+from .model_registry import LoadedModel, MODEL_DIR, model_paths, model_registry
+
+# Worker threads used by the forest when predicting a batch. Batches are
+# already predicted concurrently on SCORING_DB_WORKERS threads, so more than
+# one thread per batch only helps when few batches run at once.
+PREDICT_N_JOBS = int(os.getenv('ML_PREDICT_N_JOBS', 1))
+
+FEATURE_COLUMNS = [
+    'critical_vulns', 'high_vulns', 'medium_vulns', 'low_vulns',
+    'outdated_deps_percentage', 'compliance_violations',
+    'security_hotspots', 'code_coverage', 'duplicate_lines'
+]
 
 class SecurityScorePredictor:
     def __init__(self, session: Session):
-        self.model = None
-        self.scaler = None
-        self.feature_columns = [
-            'critical_vulns', 'high_vulns', 'medium_vulns', 'low_vulns',
-            'outdated_deps_percentage', 'compliance_violations',
-            'security_hotspots', 'code_coverage', 'duplicate_lines'
-        ]
+        self.feature_columns = list(FEATURE_COLUMNS)
         self.session = session
-        self._load_latest_model()
 
-    def _load_latest_model(self):
-        """Load the latest active model version"""
-        try:
-            latest_model = (
-                self.session.query(MLModelVersion)
-                .filter_by(active=True)
-                .order_by(MLModelVersion.created_at.desc())
-                .first()
-            )
-
-            if latest_model:
-                model_path = os.path.join('models', f'model_{latest_model.version}.joblib')
-                scaler_path = os.path.join('models', f'scaler_{latest_model.version}.joblib')
-                
-                self.model = joblib.load(model_path)
-                self.scaler = joblib.load(scaler_path)
-            else:
-                # Initialize new model if none exists
-                self.model = RandomForestRegressor(
-                    n_estimators=100,
-                    max_depth=10,
-                    random_state=42
-                )
-                self.scaler = StandardScaler()
-        except Exception as e:
-            print(f"Error loading model: {str(e)}")
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
-            self.scaler = StandardScaler()
-
-    def prepare_features(self, data: Dict[str, Any]) -> np.ndarray:
+    def _current(self) -> LoadedModel:
+        """Return the active (version, model, scaler) from the shared registry"""
+        return model_registry.get_active(self.session)
+
+    @property
+    def model(self):
+        return self._current().model
+
+    @property
+    def scaler(self):
+        return self._current().scaler
+
+    @property
+    def version(self):
+        return self._current().version
+
+    def prepare_features(self, data: Dict[str, Any], scaler=None) -> np.ndarray:
         """Prepare features for prediction"""
+        scaler = scaler if scaler is not None else self.scaler
         features = np.array([[
             data.get(col, 0) for col in self.feature_columns
         ]])
-        
-        if self.scaler.n_features_in_:
-            return self.scaler.transform(features)
+
+        if getattr(scaler, 'n_features_in_', None):
+            return scaler.transform(features)
+        return features
+
+    def prepare_feature_matrix(self, rows: List[Dict[str, Any]], scaler=None) -> np.ndarray:
+        """Prepare one feature matrix for many rows"""
+        scaler = scaler if scaler is not None else self.scaler
+        features = np.array(
+            [[data.get(col, 0) for col in self.feature_columns] for data in rows],
+            dtype=float
+        ).reshape(len(rows), len(self.feature_columns))
+
+        if getattr(scaler, 'n_features_in_', None):
+            return scaler.transform(features)
         return features
 
+    def predict_batch(self, rows: List[Dict[str, Any]], current: LoadedModel = None) -> List[float]:
+        """Predict security scores for many rows with a single model call"""
+        if not rows:
+            return []
+        current = current or self._current()
+        features = self.prepare_feature_matrix(rows, current.scaler)
+        # Trees are evaluated in parallel threads; the active model is shared,
+        # so the worker count is set for this call instead of on the model
+        with joblib.parallel_backend('threading', n_jobs=PREDICT_N_JOBS):
+            predictions = current.model.predict(features)
+        return np.clip(predictions, 0, 100).tolist()
+
     def predict(self, data: Dict[str, Any]) -> float:
         """Predict security score"""
-        features = self.prepare_features(data)
-        prediction = self.model.predict(features)[0]
+        # Use one snapshot so a concurrent hot-swap cannot mix model and scaler
+        current = self._current()
+        features = self.prepare_features(data, current.scaler)
+        prediction = current.model.predict(features)[0]
         return max(0, min(100, prediction))
 
     def train(self, training_data: List[Dict[str, Any]], actual_scores: List[float]):
@@ -78,41 +94,22 @@ class SecurityScorePredictor:
             ] for data in training_data])
             y = np.array(actual_scores)
 
-            # Fit scaler and transform features
-            X_scaled = self.scaler.fit_transform(X)
-
-            # Train model
-            self.model.fit(X_scaled, y)
-
-            # Save new model version
-            version = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            model_path = os.path.join('models', f'model_{version}.joblib')
-            scaler_path = os.path.join('models', f'scaler_{version}.joblib')
-
-            os.makedirs('models', exist_ok=True)
-            joblib.dump(self.model, model_path)
-            joblib.dump(self.scaler, scaler_path)
-
-            # Create model version record
-            model_version = MLModelVersion(
-                version=version,
-                model_type='RandomForestRegressor',
-                parameters=self.model.get_params(),
-                metrics={
-                    'feature_importance': self.model.feature_importances_.tolist(),
-                    'n_estimators': self.model.n_estimators,
-                    'max_depth': self.model.max_depth
-                },
-                active=True
-            )
+            # Fit a fresh scaler and model; the active ones are shared with
+            # other requests and must not change under them
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(X)
 
-            # Deactivate other models
-            self.session.query(MLModelVersion).filter_by(active=True).update({'active': False})
-            self.session.add(model_version)
-            self.session.commit()
+            model = clone(self.model)
+            model.fit(X_scaled, y)
+
+            model_version = self.save_version(model, scaler, {
+                'feature_importance': model.feature_importances_.tolist(),
+                'n_estimators': model.n_estimators,
+                'max_depth': model.max_depth
+            })
 
             return {
-                'version': version,
+                'version': model_version.version,
                 'metrics': model_version.metrics
             }
 
@@ -120,3 +117,31 @@ class SecurityScorePredictor:
             print(f"Error training model: {str(e)}")
             self.session.rollback()
             raise
+
+    def save_version(self, model, scaler, metrics: Dict[str, Any], activate: bool = True) -> MLModelVersion:
+        """Persist a fitted model and scaler as a new MLModelVersion"""
+        # Microseconds and a random suffix keep versions trained concurrently apart
+        version = f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}"
+        paths = model_paths(version)
+
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        joblib.dump(model, paths['model'])
+        joblib.dump(scaler, paths['scaler'])
+
+        model_version = MLModelVersion(
+            version=version,
+            model_type=type(model).__name__,
+            parameters=model.get_params(),
+            metrics=metrics,
+            active=activate
+        )
+
+        if activate:
+            # Deactivate other models
+            self.session.query(MLModelVersion).filter_by(active=True).update({'active': False})
+        self.session.add(model_version)
+        self.session.commit()
+
+        if activate:
+            model_registry.activate(version, model, scaler)
+        return model_version
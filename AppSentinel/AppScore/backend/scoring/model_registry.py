@@ -0,0 +1,126 @@
+from typing import Any, Dict, NamedTuple, Optional
+import os
+import threading
+import time
+import joblib
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy.orm import Session
+from models.score_history import MLModelVersion
+
+MODEL_DIR = os.getenv('ML_MODEL_DIR', 'models')
+
+
+class LoadedModel(NamedTuple):
+    version: Optional[str]
+    model: Any
+    scaler: Any
+
+
+def default_model() -> LoadedModel:
+    """Untrained model used until a version has been trained and activated"""
+    return LoadedModel(
+        version=None,
+        model=RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42),
+        scaler=StandardScaler()
+    )
+
+
+def model_paths(version: str) -> Dict[str, str]:
+    return {
+        'model': os.path.join(MODEL_DIR, f'model_{version}.joblib'),
+        'scaler': os.path.join(MODEL_DIR, f'scaler_{version}.joblib')
+    }
+
+
+class ModelRegistry:
+    """Process-wide cache of the active scoring model.
+
+    Each version is loaded from disk once and shared by every predictor in
+    the process. The active version is looked up in the database at most
+    once every refresh_interval seconds. When it changes, the thread that
+    noticed loads the new version while the others keep predicting with the
+    old one, then swaps it in as a single reference, so a prediction always
+    sees a matching (model, scaler) pair.
+    """
+
+    def __init__(self, refresh_interval: float = 60.0):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._active: Optional[LoadedModel] = None
+        self._checked_at = 0.0
+
+    def get_active(self, session: Session) -> LoadedModel:
+        """Return the active model, loading or swapping it if needed"""
+        active = self._active
+        if active is not None and time.monotonic() - self._checked_at < self.refresh_interval:
+            return active
+
+        # One thread checks and loads; the others keep using the current model
+        if not self._load_lock.acquire(blocking=active is None):
+            return active
+        try:
+            if self._active is not None and time.monotonic() - self._checked_at < self.refresh_interval:
+                return self._active
+            self._refresh(session)
+            return self._active
+        finally:
+            self._load_lock.release()
+
+    def activate(self, version: str, model: Any, scaler: Any) -> LoadedModel:
+        """Make an already fitted model the active one in this process"""
+        loaded = LoadedModel(version, model, scaler)
+        with self._lock:
+            self._active = loaded
+            self._checked_at = time.monotonic()
+        return loaded
+
+    def invalidate(self):
+        """Force the next get_active call to recheck the database"""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._active = None
+            self._checked_at = 0.0
+
+    def _refresh(self, session: Session):
+        current = self._active
+        try:
+            row = (
+                session.query(MLModelVersion.version)
+                .filter_by(active=True)
+                .order_by(MLModelVersion.created_at.desc())
+                .first()
+            )
+            version = row[0] if row else None
+
+            if current is not None and current.version == version:
+                loaded = current
+            elif version is None:
+                loaded = default_model()
+            else:
+                loaded = self._load(version)
+        except Exception as e:
+            print(f"Error loading model: {str(e)}")
+            loaded = current or default_model()
+
+        with self._lock:
+            self._active = loaded
+            self._checked_at = time.monotonic()
+
+    def _load(self, version: str) -> LoadedModel:
+        paths = model_paths(version)
+        # Not memory-mapped: unpickling a tree copies its node arrays into
+        # sklearn's own buffers, so mmap_mode would share nothing
+        model = joblib.load(paths['model'])
+        scaler = joblib.load(paths['scaler'])
+        print(f"Loaded model version {version}")
+        return LoadedModel(version, model, scaler)
+
+
+model_registry = ModelRegistry(
+    refresh_interval=float(os.getenv('ML_MODEL_REFRESH_SECONDS', 60))
+)
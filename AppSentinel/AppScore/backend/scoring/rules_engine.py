@@ -1,4 +1,5 @@
 from typing import Dict, List, Any
+import hashlib
 import json
 import os
 
@@ -8,10 +9,18 @@ class Rule:
         self.condition = condition
         self.impact = impact
         self.description = description
+        # Compile once; rules are evaluated for every application on each rescore
+        try:
+            self._code = compile(condition, f'<rule {name}>', 'eval')
+        except SyntaxError as e:
+            print(f"Error compiling rule {name}: {str(e)}")
+            self._code = None
 
     def evaluate(self, data: Dict[str, Any]) -> bool:
+        if self._code is None:
+            return False
         try:
-            return eval(self.condition, {"__builtins__": {}}, data)
+            return eval(self._code, {"__builtins__": {}}, data)
         except Exception as e:
             print(f"Error evaluating rule {self.name}: {str(e)}")
             return False
@@ -20,6 +29,15 @@ class RulesEngine:
     def __init__(self):
         self.rules = self._load_rules()
         self.base_score = 100.0
+        self.version = self._compute_version()
+
+    def _compute_version(self) -> str:
+        """Hash of the loaded rules, used to tell when cached scores are stale"""
+        payload = json.dumps(
+            [[rule.name, rule.condition, rule.impact] for rule in self.rules] + [self.base_score],
+            separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
 
     def _load_rules(self) -> List[Rule]:
         """Load rules from configuration file"""
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+
+
+def score_fingerprint(data: Dict[str, Any], rules_version: str, model_version: Optional[str]) -> str:
+    """Stable hash of everything a computed score depends on"""
+    payload = json.dumps(
+        {'features': data, 'rules': rules_version, 'model': model_version},
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ScoreMemo:
+    """LRU cache of (rules_result, ml_score) keyed by score fingerprint.
+
+    Scores depend only on the features and the rules and model versions, so
+    a fingerprint seen before, for any application, can skip both the rules
+    evaluation and the model. Counters cover cache hits and misses as well
+    as score history writes done and skipped because nothing changed.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[Dict[str, Any], float]]' = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'writes_skipped': 0}
+
+    def get(self, fingerprint: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self._stats['hits'] += 1
+            return entry
+
+    def put(self, fingerprint: str, rules_result: Dict[str, Any], ml_score: float):
+        with self._lock:
+            self._entries[fingerprint] = (rules_result, ml_score)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_writes(self, written: int, skipped: int):
+        with self._lock:
+            self._stats['writes'] += written
+            self._stats['writes_skipped'] += skipped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        scored = stats['writes'] + stats['writes_skipped']
+        stats['unchanged_rate'] = stats['writes_skipped'] / scored if scored else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+score_memo = ScoreMemo(max_entries=int(os.getenv('SCORE_MEMO_MAX_ENTRIES', 10000)))
@@ -1,81 +1,239 @@
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
+import asyncio
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
 from models.score_history import ScoreHistory
 from .rules_engine import RulesEngine
 from .ml_engine import SecurityScorePredictor
+from .model_registry import LoadedModel, model_registry
+from .executors import get_cpu_executor, get_db_executor, score_rows
+from .score_memo import score_fingerprint, score_memo
+from .training import TrainingPipeline, submit_training
 
 class SecurityScoreService:
-    def __init__(self, session: Session):
+    """Rules plus ML security scoring.
+
+    The async methods never block the event loop: database work runs on a
+    thread pool, each call with its own session from session_factory, and
+    rules and model evaluation run on a process pool. Many scores can
+    therefore be computed concurrently from one asyncio runner.
+    """
+
+    def __init__(self, session: Session, session_factory: Optional[Callable[[], Session]] = None):
         self.session = session
+        self.session_factory = session_factory or sessionmaker(bind=session.get_bind())
         self.rules_engine = RulesEngine()
         self.ml_predictor = SecurityScorePredictor(session)
         self.rules_weight = 0.7  # 70% weight to rules-based score
         self.ml_weight = 0.3     # 30% weight to ML-based score
 
+    def _history_row(self, application_id: int, data: Dict[str, Any],
+                     rules_result: Dict[str, Any], ml_score: float) -> Dict[str, Any]:
+        """Build the score_history columns for one computed score"""
+        rules_score = rules_result['score']
+        final_score = (rules_score * self.rules_weight) + (ml_score * self.ml_weight)
+        return {
+            'application_id': application_id,
+            'score': round(final_score),
+            'rules_score': round(rules_score),
+            'ml_score': round(ml_score),
+            'details': {
+                'final_score': final_score,
+                'features': data,
+                'triggered_rules': rules_result['triggered_rules'],
+                'ml_features': self.ml_predictor.feature_columns
+            }
+        }
+
+    @staticmethod
+    def _result(row: Dict[str, Any], rules_score: float, ml_score: float) -> Dict[str, Any]:
+        return {
+            'application_id': row['application_id'],
+            'final_score': row['details']['final_score'],
+            'rules_score': rules_score,
+            'ml_score': ml_score,
+            'rules_details': row['details']['triggered_rules'],
+            'timestamp': datetime.utcnow().isoformat()
+        }
+
+    def _fingerprint(self, data: Dict[str, Any], model_version: Optional[str]) -> str:
+        return score_fingerprint(data, self.rules_engine.version, model_version)
+
+    async def _run_db(self, fn: Callable, *args):
+        """Run fn(session, *args) on the DB thread pool with a fresh session"""
+        def _call():
+            session = self.session_factory()
+            try:
+                return fn(session, *args)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+        return await asyncio.get_running_loop().run_in_executor(get_db_executor(), _call)
+
+    async def _score(self, active: LoadedModel, rows: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], float]]:
+        """Compute (rules_result, ml_score) for rows off the event loop"""
+        loop = asyncio.get_running_loop()
+        cpu_executor = get_cpu_executor()
+        # Worker processes load models from disk, so an unsaved model stays local
+        if active.version is not None and cpu_executor is not None:
+            return await loop.run_in_executor(cpu_executor, score_rows, active.version, rows)
+        return await loop.run_in_executor(get_db_executor(), self._score_local, active, rows)
+
+    def _score_local(self, active: LoadedModel, rows: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], float]]:
+        ml_scores = self.ml_predictor.predict_batch(rows, active)
+        return [(self.rules_engine.compute_score(data), ml_score) for data, ml_score in zip(rows, ml_scores)]
+
+    @staticmethod
+    def _latest_fingerprints(session: Session, application_ids: List[int]) -> Dict[int, Tuple[int, str]]:
+        """Return {application_id: (score_id, fingerprint)} of each latest score"""
+        latest_ids = (
+            session.query(func.max(ScoreHistory.id))
+            .filter(ScoreHistory.application_id.in_(set(application_ids)))
+            .group_by(ScoreHistory.application_id)
+        )
+        rows = (
+            session.query(ScoreHistory.id, ScoreHistory.application_id, ScoreHistory.details)
+            .filter(ScoreHistory.id.in_(latest_ids))
+            .all()
+        )
+        return {
+            row.application_id: (row.id, (row.details or {}).get('fingerprint'))
+            for row in rows
+        }
+
+    @staticmethod
+    def _insert_history(session: Session, row: Dict[str, Any]) -> int:
+        score_history = ScoreHistory(**row)
+        session.add(score_history)
+        session.commit()
+        return score_history.id
+
+    @staticmethod
+    def _bulk_insert_history(session: Session, rows: List[Dict[str, Any]]):
+        session.bulk_insert_mappings(ScoreHistory, rows)
+        session.commit()
+
     async def compute_score(self, application_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Compute security score using both rules and ML"""
+        """Compute security score using both rules and ML.
+
+        Results are memoized by fingerprint, and no score history row is
+        written when the application's latest score has the same fingerprint.
+        """
         try:
-            # Get rules-based score
-            rules_result = self.rules_engine.compute_score(data)
-            rules_score = rules_result['score']
+            active = await self._run_db(model_registry.get_active)
+            fingerprint = self._fingerprint(data, active.version)
+            cached = score_memo.get(fingerprint)
+            if cached:
+                rules_result, ml_score = cached
+            else:
+                [(rules_result, ml_score)] = await self._score(active, [data])
+                score_memo.put(fingerprint, rules_result, ml_score)
 
-            # Get ML-based score
-            ml_score = self.ml_predictor.predict(data)
+            row = self._history_row(application_id, data, rules_result, ml_score)
+            row['details']['fingerprint'] = fingerprint
+            result = self._result(row, rules_result['score'], ml_score)
 
-            # Compute weighted final score
-            final_score = (rules_score * self.rules_weight) + (ml_score * self.ml_weight)
+            latest = await self._run_db(self._latest_fingerprints, [application_id])
+            latest_id, latest_fingerprint = latest.get(application_id, (None, None))
+            if latest_fingerprint == fingerprint:
+                score_memo.record_writes(0, 1)
+                result['score_id'] = latest_id
+                result['unchanged'] = True
+                return result
 
             # Store score history
-            score_history = ScoreHistory(
-                application_id=application_id,
-                rules_score=rules_score,
-                ml_score=ml_score,
-                final_score=final_score,
-                features=data,
-                metadata={
-                    'triggered_rules': rules_result['triggered_rules'],
-                    'ml_features': self.ml_predictor.feature_columns
-                }
+            result['score_id'] = await self._run_db(self._insert_history, row)
+            score_memo.record_writes(1, 0)
+            result['unchanged'] = False
+            return result
+
+        except Exception as e:
+            print(f"Error computing score: {str(e)}")
+            raise
+
+    async def compute_scores_batch(self, items: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Compute security scores for many (application_id, data) pairs at once.
+
+        Memoized fingerprints are reused and the rest are scored with a single
+        model call. Score history rows are bulk inserted only for applications
+        whose latest score has a different fingerprint. Results are in input
+        order; new rows carry no score_id, since bulk inserts do not fetch
+        generated keys.
+        """
+        if not items:
+            return []
+        try:
+            active = await self._run_db(model_registry.get_active)
+            fingerprints = [self._fingerprint(data, active.version) for _, data in items]
+            scored = {}
+            pending = {}
+            for fingerprint, (_, data) in zip(fingerprints, items):
+                if fingerprint in scored or fingerprint in pending:
+                    continue
+                cached = score_memo.get(fingerprint)
+                if cached:
+                    scored[fingerprint] = cached
+                else:
+                    pending[fingerprint] = data
+
+            # Scoring and the latest-score lookup are independent
+            computed, latest = await asyncio.gather(
+                self._score(active, list(pending.values())) if pending else asyncio.sleep(0, []),
+                self._run_db(self._latest_fingerprints, [application_id for application_id, _ in items])
             )
-            self.session.add(score_history)
-            self.session.commit()
+            for fingerprint, (rules_result, ml_score) in zip(pending, computed):
+                scored[fingerprint] = (rules_result, ml_score)
+                score_memo.put(fingerprint, rules_result, ml_score)
 
-            return {
-                'final_score': final_score,
-                'rules_score': rules_score,
-                'ml_score': ml_score,
-                'rules_details': rules_result['triggered_rules'],
-                'score_id': score_history.id,
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            rows, results = [], []
+            for (application_id, data), fingerprint in zip(items, fingerprints):
+                rules_result, ml_score = scored[fingerprint]
+                row = self._history_row(application_id, data, rules_result, ml_score)
+                row['details']['fingerprint'] = fingerprint
+                result = self._result(row, rules_result['score'], ml_score)
+
+                latest_id, latest_fingerprint = latest.get(application_id, (None, None))
+                result['unchanged'] = latest_fingerprint == fingerprint
+                if result['unchanged']:
+                    result['score_id'] = latest_id
+                else:
+                    rows.append(row)
+                    latest[application_id] = (None, fingerprint)
+                results.append(result)
+
+            if rows:
+                await self._run_db(self._bulk_insert_history, rows)
+            score_memo.record_writes(len(rows), len(items) - len(rows))
+
+            stats = score_memo.stats()
+            print(f"Scored {len(items)} applications: {len(rows)} written, "
+                  f"{len(items) - len(rows)} unchanged, memo hit rate {stats['hit_rate']:.1%}")
+            return results
 
         except Exception as e:
-            self.session.rollback()
-            print(f"Error computing score: {str(e)}")
+            print(f"Error computing batch scores: {str(e)}")
             raise
 
-    async def train_ml_model(self):
-        """Train ML model using historical data"""
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Score memoization hit rate and skipped write counts"""
+        return score_memo.stats()
+
+    async def train_ml_model(self, incremental: bool = False, background: bool = False):
+        """Train ML model using historical data.
+
+        With background=True the training pipeline runs on the training
+        worker thread and this returns a job id at once.
+        """
         try:
-            # Get historical data
-            history = self.session.query(ScoreHistory).all()
-            
-            if not history:
-                return {"status": "error", "message": "No historical data available for training"}
-
-            # Prepare training data
-            training_data = [h.features for h in history]
-            actual_scores = [h.final_score for h in history]
-
-            # Train model
-            training_result = self.ml_predictor.train(training_data, actual_scores)
-
-            return {
-                "status": "success",
-                "model_version": training_result['version'],
-                "metrics": training_result['metrics']
-            }
+            if background:
+                job_id = submit_training(self.session_factory, incremental)
+                return {"status": "queued", "job_id": job_id}
+
+            return await self._run_db(lambda session: TrainingPipeline(session).run(incremental=incremental))
 
         except Exception as e:
             print(f"Error training model: {str(e)}")
@@ -83,17 +241,19 @@ class SecurityScoreService:
 
     async def get_score_history(self, application_id: int, limit: int = 10) -> List[Dict]:
         """Get score history for an application"""
-        try:
+        def _query(session):
             history = (
-                self.session.query(ScoreHistory)
+                session.query(ScoreHistory)
                 .filter_by(application_id=application_id)
                 .order_by(ScoreHistory.created_at.desc())
                 .limit(limit)
                 .all()
             )
-            
             return [h.to_dict() for h in history]
 
+        try:
+            return await self._run_db(_query)
+
         except Exception as e:
             print(f"Error fetching score history: {str(e)}")
             return []
@@ -0,0 +1,229 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import copy
+import os
+import threading
+import time
+import uuid
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy.orm import Session
+from models.score_history import MLModelVersion, ScoreHistory
+from .ml_engine import FEATURE_COLUMNS, SecurityScorePredictor
+from .model_registry import default_model, model_registry
+
+CHUNK_SIZE = int(os.getenv('ML_TRAINING_CHUNK_SIZE', 5000))
+TREES_PER_CHUNK = int(os.getenv('ML_TRAINING_TREES_PER_CHUNK', 20))
+# Rows whose id is a multiple of HOLDOUT_MODULUS are never trained on, so
+# every candidate and the active model are compared on the same rows
+HOLDOUT_MODULUS = 5
+MAX_HOLDOUT_ROWS = 50000
+LATENCY_SAMPLE_ROWS = 50
+
+
+def iter_training_chunks(session: Session, chunk_size: int = CHUNK_SIZE,
+                         after_id: int = 0) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Yield (ids, X, y) arrays for score history rows, chunk_size at a time.
+
+    Rows are read with keyset pagination on id, so memory stays bounded by
+    one chunk however long the history is.
+    """
+    last_id = after_id
+    while True:
+        rows = (
+            session.query(ScoreHistory.id, ScoreHistory.score, ScoreHistory.details)
+            .filter(ScoreHistory.id > last_id)
+            .order_by(ScoreHistory.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return
+
+        ids = np.array([row.id for row in rows])
+        X = np.array(
+            [[((row.details or {}).get('features') or {}).get(col, 0) for col in FEATURE_COLUMNS]
+             for row in rows],
+            dtype=float
+        )
+        y = np.array([row.score for row in rows], dtype=float)
+        last_id = int(ids[-1])
+        yield ids, X, y
+
+
+def evaluate(model, scaler, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    """Holdout MAE, R² and single-row prediction latency"""
+    X_scaled = scaler.transform(X)
+    predictions = np.clip(model.predict(X_scaled), 0, 100)
+
+    timings = []
+    for row in X_scaled[:LATENCY_SAMPLE_ROWS]:
+        start = time.perf_counter()
+        model.predict(row.reshape(1, -1))
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'mae': float(mean_absolute_error(y, predictions)),
+        'r2': float(r2_score(y, predictions)) if len(y) > 1 else None,
+        'latency_ms': float(np.median(timings) * 1000),
+        'holdout_rows': int(len(y))
+    }
+
+
+class TrainingPipeline:
+    """Trains a candidate model from score history without loading it all.
+
+    A full run makes two streaming passes: one to fit the scaler, one to grow
+    the forest TREES_PER_CHUNK trees per chunk with warm_start. An incremental
+    run starts from the active model and its scaler and only adds trees for
+    rows newer than the ones it was trained on. The candidate is saved, and
+    activated only if its holdout MAE beats the active model's.
+    """
+
+    def __init__(self, session: Session, chunk_size: int = CHUNK_SIZE):
+        self.session = session
+        self.chunk_size = chunk_size
+        self.predictor = SecurityScorePredictor(session)
+
+    def run(self, incremental: bool = False) -> Dict[str, Any]:
+        try:
+            active = model_registry.get_active(self.session)
+            active_version = self._active_version_row()
+            after_id = 0
+
+            if incremental and active_version is not None and getattr(active.scaler, 'n_features_in_', None):
+                after_id = (active_version.metrics or {}).get('trained_through_id', 0)
+                scaler = active.scaler
+                model = copy.deepcopy(active.model)
+                model.set_params(warm_start=True)
+            else:
+                incremental = False
+                scaler = self._fit_scaler()
+                if scaler is None:
+                    return {"status": "error", "message": "No historical data available for training"}
+                model = clone(default_model().model).set_params(n_estimators=0, warm_start=True)
+
+            holdout_X, holdout_y = [], []
+            trained_rows = 0
+            trained_through_id = after_id
+            for ids, X, y in iter_training_chunks(self.session, self.chunk_size, after_id):
+                holdout = ids % HOLDOUT_MODULUS == 0
+                if sum(len(chunk) for chunk in holdout_y) < MAX_HOLDOUT_ROWS:
+                    holdout_X.append(X[holdout])
+                    holdout_y.append(y[holdout])
+                if (~holdout).sum() > 1:
+                    model.set_params(n_estimators=model.n_estimators + TREES_PER_CHUNK)
+                    model.fit(scaler.transform(X[~holdout]), y[~holdout])
+                    trained_rows += int((~holdout).sum())
+                trained_through_id = int(ids[-1])
+
+            if not trained_rows:
+                return {"status": "skipped", "message": "No new training data"}
+
+            if incremental:
+                # Older holdout rows were read before after_id; refresh the set
+                holdout_X, holdout_y = self._holdout()
+            X_holdout = np.concatenate(holdout_X) if holdout_X else np.empty((0, len(FEATURE_COLUMNS)))
+            y_holdout = np.concatenate(holdout_y) if holdout_y else np.empty(0)
+
+            model.set_params(warm_start=False)
+            metrics = {
+                'n_estimators': model.n_estimators,
+                'max_depth': model.max_depth,
+                'feature_importance': model.feature_importances_.tolist(),
+                'trained_rows': trained_rows,
+                'trained_through_id': trained_through_id,
+                'incremental': incremental
+            }
+            current_metrics = None
+            if len(y_holdout):
+                metrics.update(evaluate(model, scaler, X_holdout, y_holdout))
+                if getattr(active.scaler, 'n_features_in_', None):
+                    current_metrics = evaluate(active.model, active.scaler, X_holdout, y_holdout)
+
+            activate = current_metrics is None or metrics.get('mae', float('inf')) < current_metrics['mae']
+            model_version = self.predictor.save_version(model, scaler, metrics, activate=activate)
+
+            print(f"Trained model version {model_version.version} "
+                  f"(mae={metrics.get('mae')}, active mae={current_metrics and current_metrics['mae']}, "
+                  f"activated={activate})")
+            return {
+                "status": "success",
+                "model_version": model_version.version,
+                "activated": activate,
+                "metrics": metrics,
+                "active_metrics": current_metrics
+            }
+
+        except Exception as e:
+            print(f"Error training model: {str(e)}")
+            self.session.rollback()
+            return {"status": "error", "message": str(e)}
+
+    def _active_version_row(self) -> Optional[MLModelVersion]:
+        return (
+            self.session.query(MLModelVersion)
+            .filter_by(active=True)
+            .order_by(MLModelVersion.created_at.desc())
+            .first()
+        )
+
+    def _fit_scaler(self) -> Optional[StandardScaler]:
+        scaler = StandardScaler()
+        seen = False
+        for ids, X, _ in iter_training_chunks(self.session, self.chunk_size):
+            train = ids % HOLDOUT_MODULUS != 0
+            if train.any():
+                scaler.partial_fit(X[train])
+                seen = True
+        return scaler if seen else None
+
+    def _holdout(self):
+        holdout_X, holdout_y, rows = [], [], 0
+        for ids, X, y in iter_training_chunks(self.session, self.chunk_size):
+            holdout = ids % HOLDOUT_MODULUS == 0
+            holdout_X.append(X[holdout])
+            holdout_y.append(y[holdout])
+            rows += int(holdout.sum())
+            if rows >= MAX_HOLDOUT_ROWS:
+                break
+        return holdout_X, holdout_y
+
+
+# A single worker keeps training runs from overlapping within a process
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ml-training')
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+
+
+def submit_training(session_factory: Callable[[], Session], incremental: bool = False) -> str:
+    """Run a training pipeline in the background and return its job id.
+
+    session_factory must return a new session; the caller's session cannot
+    be shared with the training thread.
+    """
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _jobs[job_id] = {'status': 'queued', 'incremental': incremental}
+
+    def _run():
+        with _jobs_lock:
+            _jobs[job_id]['status'] = 'running'
+        session = session_factory()
+        try:
+            result = TrainingPipeline(session).run(incremental=incremental)
+        finally:
+            session.close()
+        with _jobs_lock:
+            _jobs[job_id].update(result)
+
+    _executor.submit(_run)
+    return job_id
+
+
+def get_training_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
@@ -3,19 +3,19 @@ import aiohttp
 from datetime import datetime, timedelta
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from models.application import Application, Base
+from models.application import Application
+from utils.db_pool import get_engine
 
 class AppCatalogService:
-    def __init__(self):
+    def __init__(self, engine=None):
         self.api_url = os.getenv('APP_CATALOG_API_URL')
         self.api_key = os.getenv('APP_CATALOG_API_KEY')
         self.cache_ttl = timedelta(hours=1)  # Cache TTL of 1 hour
         
-        # Initialize database
-        self.engine = create_engine(os.getenv('DATABASE_URL', 'sqlite:///app.db'))
-        Base.metadata.create_all(self.engine)
+        # Share the process-wide engine and its pool; tables are created by
+        # `flask init-db`, not each time the service is instantiated
+        self.engine = engine or get_engine()
         self.Session = sessionmaker(bind=self.engine)
 
     async def get_application(self, catalog_id: str) -> Optional[Application]:
@@ -0,0 +1,138 @@
+"""
+Security Score Card - PDF Report Renderer
+
+Renders report dictionaries as table-based PDFs. Rows are handed to fpdf2's
+table layout in bulk instead of positioning one cell per line, and many
+reports can be rendered in parallel on a process pool.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+from fpdf import FPDF
+
+# Core fonts are built into every PDF viewer, so documents embed no font
+# data and nothing has to be parsed or subset per report
+FONT = 'helvetica'
+RENDER_WORKERS = int(os.getenv('REPORT_RENDER_WORKERS', os.cpu_count() or 1))
+# Below this many reports, starting worker processes costs more than it saves
+PARALLEL_MIN_REPORTS = int(os.getenv('REPORT_PARALLEL_MIN_REPORTS', 50))
+
+
+def _text(value) -> str:
+    """Core fonts only cover Latin-1; replace anything else"""
+    if value is None:
+        return '-'
+    return str(value).encode('latin-1', 'replace').decode('latin-1')
+
+
+class PDFReportRenderer:
+    """Turns Team, Application and Vulnerability report data into PDF bytes"""
+
+    def render(self, report_data: Dict, report_type: str, output: Optional[BinaryIO] = None) -> Optional[bytes]:
+        """Render a report; write it to output if given, otherwise return the bytes"""
+        pdf = self._document(f"{report_type} Report", report_data.get('report_date'))
+
+        if report_type == "Team":
+            self._team(pdf, report_data)
+        elif report_type == "Application":
+            self._application(pdf, report_data)
+        elif report_type == "Vulnerability":
+            self._vulnerability(pdf, report_data)
+
+        document = pdf.output()
+        if output is not None:
+            output.write(document)
+            return None
+        return bytes(document)
+
+    def _document(self, title: str, report_date: Optional[str]) -> FPDF:
+        pdf = FPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
+        pdf.set_font(FONT, "B", 16)
+        pdf.cell(0, 10, txt=_text(title), new_x="LMARGIN", new_y="NEXT", align="C")
+        pdf.set_font(FONT, size=10)
+        pdf.cell(0, 8, txt=_text(f"Generated on: {report_date}"), new_x="LMARGIN", new_y="NEXT")
+        return pdf
+
+    def _heading(self, pdf: FPDF, text: str, size: int = 14):
+        pdf.set_font(FONT, "B", size)
+        pdf.cell(0, 10, txt=_text(text), new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font(FONT, size=10)
+
+    def _fields(self, pdf: FPDF, fields: Iterable[Tuple[str, object]]):
+        for label, value in fields:
+            pdf.cell(0, 6, txt=f"{label}: {_text(value)}", new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(2)
+
+    def _table(self, pdf: FPDF, headings: Sequence[str], rows: List[Sequence[object]],
+               col_widths: Sequence[int]):
+        pdf.set_font(FONT, size=9)
+        # The whole row set is laid out when the table context closes
+        with pdf.table(
+            rows=[list(headings)] + [[_text(value) for value in row] for row in rows],
+            col_widths=col_widths,
+            text_align="LEFT",
+            line_height=pdf.font_size * 1.8
+        ):
+            pass
+        pdf.set_font(FONT, size=10)
+        pdf.ln(4)
+
+    def _team(self, pdf: FPDF, data: Dict):
+        self._heading(pdf, f"Team: {data['team_name']}")
+        rows = [
+            (
+                app['name'],
+                app['security_score'],
+                app['last_scored'],
+                ', '.join(_text(entry['score']) for entry in app.get('score_history', []))
+            )
+            for app in data['applications']
+        ]
+        self._table(pdf, ("Application", "Security Score", "Last Scored", "Recent Scores"), rows, (60, 25, 50, 55))
+
+    def _application(self, pdf: FPDF, data: Dict):
+        self._heading(pdf, f"Application: {data['application_name']}")
+        self._fields(pdf, (
+            ("Team", data['team']),
+            ("Current Score", data['current_score']),
+            ("Last Scored", data['last_scored'])
+        ))
+        self._heading(pdf, "Score History", size=12)
+        rows = [(entry['date'], entry['score']) for entry in data['score_history']]
+        self._table(pdf, ("Date", "Score"), rows, (120, 70))
+
+    def _vulnerability(self, pdf: FPDF, data: Dict):
+        self._heading(pdf, f"Application: {data['application_name']}")
+        self._fields(pdf, (("Team", data['team']),))
+        self._heading(pdf, "Vulnerabilities", size=12)
+        rows = [
+            (vuln['severity'], vuln['description'], vuln['discovered_date'], vuln['status'])
+            for vuln in data['vulnerabilities']
+        ]
+        self._table(pdf, ("Severity", "Description", "Discovered", "Status"), rows, (25, 105, 30, 30))
+
+
+pdf_renderer = PDFReportRenderer()
+
+
+def render_pdf(report_data: Dict, report_type: str) -> bytes:
+    return pdf_renderer.render(report_data, report_type)
+
+
+def render_pdfs(reports: List[Tuple[Dict, str]], max_workers: int = RENDER_WORKERS) -> List[bytes]:
+    """Render many (report_data, report_type) pairs, in parallel processes when worthwhile"""
+    if len(reports) < PARALLEL_MIN_REPORTS or max_workers <= 1:
+        return [render_pdf(report_data, report_type) for report_data, report_type in reports]
+
+    workers = min(max_workers, len(reports))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(
+            render_pdf,
+            [report_data for report_data, _ in reports],
+            [report_type for _, report_type in reports],
+            chunksize=max(1, len(reports) // (workers * 4))
+        ))
@@ -0,0 +1,52 @@
+"""
+Report Snapshot Cache
+
+Keeps generated reports in memory keyed by (kind, id, data version, format).
+The data version is derived from the rows a report is built from, so a
+snapshot is reused until scores or applications change and never needs to
+be expired explicitly.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class ReportCache:
+    """Thread-safe LRU of report snapshots"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the snapshot for key, calling build() on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = build()
+
+        with self._lock:
+            # Snapshots of older versions of the same report are unreachable
+            stale = [k for k in self._entries if k[:2] == key[:2] and k[2] != key[2]]
+            for k in stale:
+                del self._entries[k]
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+report_cache = ReportCache(max_entries=int(os.getenv('REPORT_CACHE_MAX_ENTRIES', 512)))
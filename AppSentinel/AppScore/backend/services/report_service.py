@@ -11,74 +11,286 @@ Authors:
 Copyright (c) 2024. All rights reserved.
 """
 
-from typing import Dict, List
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, List, Optional
 from datetime import datetime
-from fpdf import FPDF
 import csv
 import io
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
 from models.application import Application
 from models.team import Team
 from models.score_history import ScoreHistory
+from services.pdf_renderer import pdf_renderer, render_pdfs
+from services.report_cache import report_cache
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, distinct, func
+from werkzeug.utils import secure_filename
+
+# Score history entries per application in team reports
+TEAM_REPORT_HISTORY = 5
+
+# Finished bundles are kept on disk for download this many seconds
+BUNDLE_DIR = os.getenv('REPORT_BUNDLE_DIR', os.path.join(tempfile.gettempdir(), 'appscore-report-bundles'))
+BUNDLE_RETENTION = int(os.getenv('REPORT_BUNDLE_RETENTION', 3600))
+
+def _filename(name: str) -> str:
+    return secure_filename(name) or 'unnamed'
+
+def _unique(name: str, used: set) -> str:
+    """name, or name_2, name_3, ... if another entry already took it"""
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{name}_{n}"
+    used.add(candidate)
+    return candidate
 
 class ReportService:
     def __init__(self, session: Session):
         self.session = session
 
+    def get_team_report(self, team_name: str, report_format: str = 'json'):
+        """Return a cached team report snapshot, as a dict or PDF bytes."""
+        team = self.session.query(Team.id).filter(Team.name == team_name).first()
+        if not team:
+            raise ValueError(f"Team {team_name} not found")
+
+        version = self._team_data_version(team.id)
+        report_data = report_cache.get_or_create(
+            ('team', team.id, version, 'json'),
+            lambda: self.generate_team_report(team_name)
+        )
+        if report_format == 'pdf':
+            return report_cache.get_or_create(
+                ('team', team.id, version, 'pdf'),
+                lambda: self.convert_to_pdf(report_data, "Team")
+            )
+        return report_data
+
+    def get_application_report(self, app_id: int, report_format: str = 'json'):
+        """Return a cached application report snapshot, as a dict or PDF bytes."""
+        version = self._application_data_version(app_id)
+        report_data = report_cache.get_or_create(
+            ('application', app_id, version, 'json'),
+            lambda: self.generate_application_report(app_id)
+        )
+        if report_format == 'pdf':
+            return report_cache.get_or_create(
+                ('application', app_id, version, 'pdf'),
+                lambda: self.convert_to_pdf(report_data, "Application")
+            )
+        return report_data
+
+    def _team_data_version(self, team_id: int) -> tuple:
+        """Fingerprint of the rows a team report is built from."""
+        row = (
+            self.session.query(
+                func.max(Team.name),
+                func.count(distinct(Application.id)),
+                func.max(Application.updated_at),
+                func.count(ScoreHistory.id),
+                func.max(ScoreHistory.id)
+            )
+            .select_from(Team)
+            .outerjoin(Application, Application.team_id == Team.id)
+            .outerjoin(ScoreHistory, ScoreHistory.application_id == Application.id)
+            .filter(Team.id == team_id)
+            .one()
+        )
+        return tuple(str(value) for value in row)
+
+    def _application_data_version(self, app_id: int) -> tuple:
+        """Fingerprint of the rows an application report is built from."""
+        row = (
+            self.session.query(
+                func.max(Application.updated_at),
+                func.max(Team.name),
+                func.count(ScoreHistory.id),
+                func.max(ScoreHistory.id)
+            )
+            .select_from(Application)
+            .outerjoin(Team, Team.id == Application.team_id)
+            .outerjoin(ScoreHistory, ScoreHistory.application_id == Application.id)
+            .filter(Application.id == app_id)
+            .one()
+        )
+        return tuple(str(value) for value in row)
+
     def generate_team_report(self, team_name: str) -> Dict:
         """Generate a detailed report for all applications in a team."""
-        team = self.session.query(Team).filter(Team.name == team_name).first()
-        if not team:
+        reports = self.generate_team_reports([team_name])
+        if team_name not in reports:
             raise ValueError(f"Team {team_name} not found")
+        return reports[team_name]
 
-        applications = team.applications.all()
-        report_data = {
-            "team_name": team.name,
-            "report_date": datetime.utcnow().isoformat(),
-            "applications": []
+    def generate_team_reports(self, team_names: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Generate team reports for team_names (all teams if None) with three queries."""
+        teams_query = self.session.query(Team.id, Team.name).order_by(Team.name)
+        if team_names is not None:
+            teams_query = teams_query.filter(Team.name.in_(team_names))
+        teams = teams_query.all()
+        team_ids = [team.id for team in teams]
+        if not team_ids:
+            return {}
+
+        applications = (
+            self.session.query(Application.id, Application.team_id, Application.name,
+                               Application.description, Application.last_scored)
+            .filter(Application.team_id.in_(team_ids))
+            .order_by(Application.id)
+            .all()
+        )
+
+        # Latest TEAM_REPORT_HISTORY scores of every application in one query
+        ranked = (
+            self.session.query(
+                ScoreHistory.application_id,
+                ScoreHistory.score,
+                ScoreHistory.created_at,
+                func.row_number().over(
+                    partition_by=ScoreHistory.application_id,
+                    order_by=(desc(ScoreHistory.created_at), desc(ScoreHistory.id))
+                ).label('position')
+            )
+            .join(Application, Application.id == ScoreHistory.application_id)
+            .filter(Application.team_id.in_(team_ids))
+            .subquery()
+        )
+        history = self._history_by_application(
+            self.session.query(ranked.c.application_id, ranked.c.score, ranked.c.created_at)
+            .filter(ranked.c.position <= TEAM_REPORT_HISTORY)
+            .order_by(ranked.c.application_id, ranked.c.position)
+        )
+
+        report_date = datetime.utcnow().isoformat()
+        reports = {
+            team.name: {
+                "team_name": team.name,
+                "report_date": report_date,
+                "applications": []
+            }
+            for team in teams
         }
+        team_names_by_id = {team.id: team.name for team in teams}
 
         for app in applications:
+            app_history = history.get(app.id, [])
             app_data = {
                 "name": app.name,
                 "description": app.description,
-                "security_score": app.security_score,
+                "security_score": app_history[0]["score"] if app_history else None,
                 "last_scored": app.last_scored.isoformat() if app.last_scored else None,
-                "score_history": [
-                    {
-                        "score": sh.score,
-                        "date": sh.created_at.isoformat()
-                    } for sh in app.score_history.order_by(desc(ScoreHistory.created_at)).limit(5)
-                ]
+                "score_history": app_history
             }
-            report_data["applications"].append(app_data)
+            reports[team_names_by_id[app.team_id]]["applications"].append(app_data)
 
-        return report_data
+        return reports
 
     def generate_application_report(self, app_id: int) -> Dict:
         """Generate a detailed report for a specific application."""
-        app = self.session.query(Application).filter(Application.id == app_id).first()
-        if not app:
+        reports = self.generate_application_reports([app_id])
+        if app_id not in reports:
             raise ValueError(f"Application with ID {app_id} not found")
+        return reports[app_id]
 
-        report_data = {
-            "application_name": app.name,
-            "description": app.description,
-            "team": app.team.name,
-            "current_score": app.security_score,
-            "last_scored": app.last_scored.isoformat() if app.last_scored else None,
-            "score_history": [
-                {
-                    "score": sh.score,
-                    "date": sh.created_at.isoformat()
-                } for sh in app.score_history.order_by(desc(ScoreHistory.created_at)).all()
-            ],
-            "report_date": datetime.utcnow().isoformat()
+    def generate_application_reports(self, app_ids: List[int]) -> Dict[int, Dict]:
+        """Generate application reports for app_ids with two queries."""
+        applications = (
+            self.session.query(Application.id, Application.name, Application.description,
+                               Application.last_scored, Team.name.label('team_name'))
+            .outerjoin(Team, Team.id == Application.team_id)
+            .filter(Application.id.in_(app_ids))
+            .all()
+        )
+        if not applications:
+            return {}
+
+        history = self._history_by_application(
+            self.session.query(ScoreHistory.application_id, ScoreHistory.score, ScoreHistory.created_at)
+            .filter(ScoreHistory.application_id.in_([app.id for app in applications]))
+            .order_by(ScoreHistory.application_id, desc(ScoreHistory.created_at), desc(ScoreHistory.id))
+        )
+
+        report_date = datetime.utcnow().isoformat()
+        reports = {}
+        for app in applications:
+            app_history = history.get(app.id, [])
+            reports[app.id] = {
+                "application_name": app.name,
+                "description": app.description,
+                "team": app.team_name,
+                "current_score": app_history[0]["score"] if app_history else None,
+                "last_scored": app.last_scored.isoformat() if app.last_scored else None,
+                "score_history": app_history,
+                "report_date": report_date
+            }
+
+        return reports
+
+    @staticmethod
+    def _history_by_application(rows) -> Dict[int, List[Dict]]:
+        history = {}
+        for row in rows:
+            history.setdefault(row.application_id, []).append({
+                "score": row.score,
+                "date": row.created_at.isoformat() if row.created_at else None
+            })
+        return history
+
+    def build_report_bundle(self, output: BinaryIO, team_names: Optional[List[str]] = None,
+                            app_ids: Optional[List[int]] = None, report_format: str = 'pdf') -> Dict:
+        """Write a ZIP of team and application reports to output.
+
+        With neither team_names nor app_ids, every team is included. All
+        report data is fetched up front with a handful of set-based queries,
+        PDFs are rendered in parallel, and a manifest.json lists the files.
+        Returns the manifest.
+        """
+        if app_ids is not None:
+            # Ids arrive as JSON numbers or strings; compare them as ints
+            app_ids = list(dict.fromkeys(int(app_id) for app_id in app_ids))
+        if team_names is None and app_ids is None:
+            team_reports = self.generate_team_reports()
+        else:
+            team_reports = self.generate_team_reports(team_names) if team_names else {}
+        app_reports = self.generate_application_reports(app_ids) if app_ids else {}
+
+        missing = sorted(set(team_names or []) - set(team_reports)) + sorted(set(app_ids or []) - set(app_reports))
+        # Distinct names can map to one file name ("Team A", "Team_A")
+        used = set()
+        entries = (
+            [(_unique(f"teams/{_filename(name)}", used), report, "Team")
+             for name, report in team_reports.items()] +
+            [(_unique(f"applications/{app_id}_{_filename(report['application_name'])}", used), report,
+              "Application")
+             for app_id, report in app_reports.items()]
+        )
+
+        if report_format == 'pdf':
+            documents = render_pdfs([(report, report_type) for _, report, report_type in entries])
+        else:
+            documents = [json.dumps(report, indent=2).encode('utf-8') for _, report, _ in entries]
+
+        manifest = {
+            "generated_at": datetime.utcnow().isoformat(),
+            "format": report_format,
+            "files": [],
+            "not_found": missing
         }
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+            for (name, _, report_type), document in zip(entries, documents):
+                filename = f"{name}.{report_format}"
+                bundle.writestr(filename, document)
+                manifest["files"].append({"file": filename, "type": report_type, "bytes": len(document)})
+            bundle.writestr("manifest.json", json.dumps(manifest, indent=2))
 
-        return report_data
+        return manifest
 
     def generate_vulnerability_report(self, app_id: int) -> Dict:
         """Generate a vulnerability report for a specific application."""
@@ -106,28 +318,7 @@ class ReportService:
 
     def convert_to_pdf(self, report_data: Dict, report_type: str) -> bytes:
         """Convert report data to PDF format."""
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-
-        # Add title
-        pdf.set_font("Arial", "B", 16)
-        title = f"{report_type} Report"
-        pdf.cell(200, 10, txt=title, ln=1, align="C")
-        
-        # Add report date
-        pdf.set_font("Arial", size=10)
-        pdf.cell(200, 10, txt=f"Generated on: {report_data['report_date']}", ln=1, align="L")
-
-        # Add content based on report type
-        if report_type == "Team":
-            self._add_team_report_content(pdf, report_data)
-        elif report_type == "Application":
-            self._add_application_report_content(pdf, report_data)
-        elif report_type == "Vulnerability":
-            self._add_vulnerability_report_content(pdf, report_data)
-
-        return pdf.output(dest='S').encode('latin-1')
+        return pdf_renderer.render(report_data, report_type)
 
     def convert_to_csv(self, report_data: Dict, report_type: str) -> bytes:
         """Convert report data to CSV format."""
@@ -150,55 +341,66 @@ class ReportService:
 
         return output.getvalue().encode('utf-8')
 
-    def _add_team_report_content(self, pdf: FPDF, data: Dict):
-        """Add team report specific content to PDF."""
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, txt=f"Team: {data['team_name']}", ln=1, align="L")
 
-        for app in data["applications"]:
-            pdf.set_font("Arial", "B", 12)
-            pdf.cell(200, 10, txt=f"Application: {app['name']}", ln=1, align="L")
-            
-            pdf.set_font("Arial", size=10)
-            pdf.cell(200, 10, txt=f"Security Score: {app['security_score']}", ln=1, align="L")
-            pdf.cell(200, 10, txt=f"Last Scored: {app['last_scored']}", ln=1, align="L")
-            pdf.cell(200, 10, txt="", ln=1, align="L")  # Add spacing
-
-    def _add_application_report_content(self, pdf: FPDF, data: Dict):
-        """Add application report specific content to PDF."""
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, txt=f"Application: {data['application_name']}", ln=1, align="L")
-        
-        pdf.set_font("Arial", size=10)
-        pdf.cell(200, 10, txt=f"Team: {data['team']}", ln=1, align="L")
-        pdf.cell(200, 10, txt=f"Current Score: {data['current_score']}", ln=1, align="L")
-        pdf.cell(200, 10, txt=f"Last Scored: {data['last_scored']}", ln=1, align="L")
-
-        # Add score history
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(200, 10, txt="Score History", ln=1, align="L")
-        
-        for history in data['score_history']:
-            pdf.set_font("Arial", size=10)
-            pdf.cell(200, 10, txt=f"Date: {history['date']}, Score: {history['score']}", ln=1, align="L")
-
-    def _add_vulnerability_report_content(self, pdf: FPDF, data: Dict):
-        """Add vulnerability report specific content to PDF."""
-        pdf.set_font("Arial", "B", 14)
-        pdf.cell(200, 10, txt=f"Application: {data['application_name']}", ln=1, align="L")
-        
-        pdf.set_font("Arial", size=10)
-        pdf.cell(200, 10, txt=f"Team: {data['team']}", ln=1, align="L")
-
-        # Add vulnerabilities
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(200, 10, txt="Vulnerabilities", ln=1, align="L")
-        
-        for vuln in data['vulnerabilities']:
-            pdf.set_font("Arial", "B", 10)
-            pdf.cell(200, 10, txt=f"Severity: {vuln['severity']}", ln=1, align="L")
-            pdf.set_font("Arial", size=10)
-            pdf.cell(200, 10, txt=f"Description: {vuln['description']}", ln=1, align="L")
-            pdf.cell(200, 10, txt=f"Discovered: {vuln['discovered_date']}", ln=1, align="L")
-            pdf.cell(200, 10, txt=f"Status: {vuln['status']}", ln=1, align="L")
-            pdf.cell(200, 10, txt="", ln=1, align="L")  # Add spacing
+# A single worker keeps bundle rendering from competing with requests for CPU
+_bundle_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-bundle')
+_bundle_jobs: Dict[str, Dict] = {}
+_bundle_jobs_lock = threading.Lock()
+
+
+def submit_report_bundle(session_factory: Callable[[], Session], team_names: Optional[List[str]] = None,
+                         app_ids: Optional[List[int]] = None, report_format: str = 'pdf') -> str:
+    """Build a report bundle in the background and return its job id.
+
+    session_factory must return a new session; the caller's session cannot
+    be shared with the bundle thread. The ZIP is written under BUNDLE_DIR and
+    kept for BUNDLE_RETENTION seconds after the job finishes.
+    """
+    _expire_bundle_jobs()
+    job_id = uuid.uuid4().hex
+    with _bundle_jobs_lock:
+        _bundle_jobs[job_id] = {'status': 'queued', 'format': report_format}
+
+    def _run():
+        with _bundle_jobs_lock:
+            _bundle_jobs[job_id]['status'] = 'running'
+        os.makedirs(BUNDLE_DIR, exist_ok=True)
+        path = os.path.join(BUNDLE_DIR, f"{job_id}.zip")
+        session = session_factory()
+        try:
+            with open(path, 'wb') as f:
+                manifest = ReportService(session).build_report_bundle(
+                    f, team_names=team_names, app_ids=app_ids, report_format=report_format
+                )
+            result = {'status': 'success', 'files': len(manifest['files']), 'not_found': manifest['not_found'],
+                      'path': path}
+        except Exception as e:
+            print(f"Error building report bundle: {str(e)}")
+            session.rollback()
+            if os.path.exists(path):
+                os.remove(path)
+            result = {'status': 'error', 'message': str(e)}
+        finally:
+            session.close()
+        with _bundle_jobs_lock:
+            _bundle_jobs[job_id].update(result, finished_at=time.time())
+
+    _bundle_executor.submit(_run)
+    return job_id
+
+
+def get_report_bundle_job(job_id: str) -> Optional[Dict]:
+    """Status of a bundle job; 'path' is set once the ZIP is ready"""
+    with _bundle_jobs_lock:
+        job = _bundle_jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def _expire_bundle_jobs():
+    cutoff = time.time() - BUNDLE_RETENTION
+    with _bundle_jobs_lock:
+        expired = [job_id for job_id, job in _bundle_jobs.items() if job.get('finished_at', cutoff + 1) < cutoff]
+        jobs = [_bundle_jobs.pop(job_id) for job_id in expired]
+    for job in jobs:
+        if job.get('path') and os.path.exists(job['path']):
+            os.remove(job['path'])
@@ -3,96 +3,222 @@ Secrets Manager Service
 
 Handles fetching secrets from AWS Secrets Manager.
 Can be extended to support other secret management services.
+
+Secret values are cached per version stage for a configurable TTL, so
+lookups after the first do not call AWS. Expired entries are refetched
+and rotations (a new version under the stage) are picked up then, or
+straight away with refresh().
 """
 
 import json
 import logging
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+CURRENT_STAGE = 'AWSCURRENT'
+PENDING_STAGE = 'AWSPENDING'
+# BatchGetSecretValue accepts at most 20 secret ids per call
+BATCH_SIZE = 20
+
+def parse_secret_string(secret: str) -> str:
+    """Unwrap single key JSON secrets; other values are returned as is"""
+    try:
+        secret_dict = json.loads(secret)
+    except json.JSONDecodeError:
+        return secret
+    # If it's a simple key-value pair, return the value
+    if isinstance(secret_dict, dict) and len(secret_dict) == 1:
+        return next(iter(secret_dict.values()))
+    # Otherwise return the whole JSON string
+    return secret
+
 class SecretsManagerBase(ABC):
     """Abstract base class for secrets management"""
-    
+
     @abstractmethod
-    def get_secret(self, secret_name: str) -> Optional[str]:
+    def get_secret(self, secret_name: str, version_stage: str = CURRENT_STAGE) -> Optional[str]:
         """Retrieve a secret by name"""
         pass
-    
+
     @abstractmethod
     def get_secrets(self, secret_names: list) -> Dict[str, str]:
         """Retrieve multiple secrets by name"""
         pass
 
+    def refresh(self, secret_name: str = None):
+        """Drop cached values of one secret, or of all, so the next lookup refetches them"""
+        pass
+
+class SecretCache:
+    """Thread-safe cache of secret values keyed by (name, version stage)"""
+
+    def __init__(self, ttl: float = 300, ttls: Dict[str, float] = None):
+        """
+        Args:
+            ttl: Seconds a value is served before it is refetched
+            ttls: Per-secret TTL overrides
+        """
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, secret_name: str, version_stage: str, allow_expired: bool = False):
+        """Cached (value, version id), or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get((secret_name, version_stage))
+        if entry is None or (entry[0] <= time.monotonic() and not allow_expired):
+            return None
+        return entry[1], entry[2]
+
+    def set(self, secret_name: str, version_stage: str, value: Optional[str], version_id: str = None):
+        ttl = self.ttls.get(secret_name, self.ttl)
+        with self._lock:
+            previous = self._entries.get((secret_name, version_stage))
+            self._entries[(secret_name, version_stage)] = (time.monotonic() + ttl, value, version_id)
+        if previous is not None and version_id and previous[2] not in (None, version_id):
+            logger.info(f"Secret {secret_name} rotated: {version_stage} is now version {version_id}")
+
+    def invalidate(self, secret_name: str = None):
+        with self._lock:
+            if secret_name is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == secret_name]:
+                    del self._entries[key]
+
 class AWSSecretsManager(SecretsManagerBase):
-    """AWS Secrets Manager implementation"""
-    
-    def __init__(self):
-        """Initialize AWS Secrets Manager client"""
+    """AWS Secrets Manager implementation with a TTL cache"""
+
+    def __init__(self, ttl: float = None, ttls: Dict[str, float] = None, max_workers: int = 4, client=None):
+        """
+        Initialize AWS Secrets Manager client
+
+        Args:
+            ttl: Seconds to cache secret values (SECRETS_CACHE_TTL, default 300)
+            ttls: Per-secret TTL overrides, e.g. shorter for secrets rotated often
+            max_workers: Concurrent AWS calls when fetching many secrets
+            client: boto3 secretsmanager client to use instead of creating one
+        """
         self.region_name = os.getenv('AWS_REGION', 'us-east-1')
-        self.session = boto3.session.Session()
-        self.client = self.session.client(
-            service_name='secretsmanager',
-            region_name=self.region_name
-        )
-        
-    def get_secret(self, secret_name: str) -> Optional[str]:
+        if ttl is None:
+            ttl = float(os.getenv('SECRETS_CACHE_TTL', 300))
+        self.cache = SecretCache(ttl, ttls)
+        self.max_workers = max_workers
+        self._client = client
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Created on first use: importing boto3 and building a client take a while
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    self.session = boto3.session.Session()
+                    self._client = self.session.client(
+                        service_name='secretsmanager',
+                        region_name=self.region_name
+                    )
+        return self._client
+
+    def get_secret(self, secret_name: str, version_stage: str = CURRENT_STAGE) -> Optional[str]:
         """
         Retrieve a secret value from AWS Secrets Manager
-        
+
         Args:
             secret_name: Name or ARN of the secret
-            
+            version_stage: Version stage to read, AWSCURRENT unless a caller
+                needs e.g. the AWSPENDING value during a rotation
+
         Returns:
             Secret value if found, None otherwise
-            
+
         Raises:
             ClientError: If there's an error accessing AWS Secrets Manager
+                and no previously fetched value is cached
         """
+        cached = self.cache.get(secret_name, version_stage)
+        if cached is not None:
+            return cached[0]
+
         try:
-            response = self.client.get_secret_value(SecretId=secret_name)
-            if 'SecretString' in response:
-                secret = response['SecretString']
-                # Handle JSON string secrets
-                try:
-                    secret_dict = json.loads(secret)
-                    # If it's a simple key-value pair, return the value
-                    if len(secret_dict) == 1:
-                        return next(iter(secret_dict.values()))
-                    # Otherwise return the whole JSON string
-                    return secret
-                except json.JSONDecodeError:
-                    # If it's not JSON, return as is
-                    return secret
-            else:
-                logger.warning(f"Secret {secret_name} found but contains no string value")
-                return None
-                
+            response = self.client.get_secret_value(SecretId=secret_name, VersionStage=version_stage)
         except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                logger.error(f"Secret {secret_name} not found")
-            elif e.response['Error']['Code'] == 'InvalidRequestException':
-                logger.error(f"Invalid request for secret {secret_name}")
-            elif e.response['Error']['Code'] == 'InvalidParameterException':
-                logger.error(f"Invalid parameter in request for secret {secret_name}")
-            else:
-                logger.error(f"Error accessing secret {secret_name}: {str(e)}")
+            self._log_error(secret_name, e)
+            stale = self.cache.get(secret_name, version_stage, allow_expired=True)
+            if stale is not None and e.response['Error']['Code'] not in ('ResourceNotFoundException',
+                                                                        'InvalidRequestException'):
+                # Keep serving the last value through a transient AWS failure
+                logger.warning(f"Serving expired cached value of secret {secret_name}")
+                return stale[0]
             raise
-            
+        return self._store(secret_name, version_stage, response)
+
     def get_secrets(self, secret_names: list) -> Dict[str, str]:
         """
         Retrieve multiple secrets from AWS Secrets Manager
-        
+
+        Cached values are served as is; the rest are fetched with
+        BatchGetSecretValue, up to 20 per call, with the calls made
+        concurrently.
+
         Args:
             secret_names: List of secret names or ARNs
-            
+
         Returns:
             Dictionary mapping secret names to their values
         """
+        secrets, missing = {}, []
+        for name in dict.fromkeys(secret_names):
+            cached = self.cache.get(name, CURRENT_STAGE)
+            if cached is None:
+                missing.append(name)
+            elif cached[0] is not None:
+                secrets[name] = cached[0]
+
+        chunks = [missing[i:i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+                results = list(pool.map(self._fetch_batch, chunks))
+        else:
+            results = [self._fetch_batch(chunk) for chunk in chunks]
+        for fetched in results:
+            secrets.update(fetched)
+        return secrets
+
+    def refresh(self, secret_name: str = None):
+        """Drop cached values, e.g. after credentials were rejected mid-rotation"""
+        self.cache.invalidate(secret_name)
+
+    def _fetch_batch(self, secret_names: list) -> Dict[str, str]:
+        secrets = {}
+        try:
+            response = self.client.batch_get_secret_value(SecretIdList=secret_names)
+        except ClientError as e:
+            logger.error(f"Failed to batch retrieve secrets: {str(e)}")
+            # Fall back to one call per secret so one bad secret does not fail the rest
+            return self._fetch_each(secret_names)
+
+        for item in response.get('SecretValues', []):
+            # Match what was asked for: the response carries both Name and ARN
+            name = item['Name'] if item['Name'] in secret_names else item['ARN']
+            value = self._store(name, CURRENT_STAGE, item)
+            if value is not None:
+                secrets[name] = value
+        for error in response.get('Errors', []):
+            logger.error(f"Failed to retrieve secret {error.get('SecretId')}: "
+                         f"{error.get('ErrorCode')} {error.get('Message')}")
+        return secrets
+
+    def _fetch_each(self, secret_names: list) -> Dict[str, str]:
         secrets = {}
         for name in secret_names:
             try:
@@ -105,40 +231,91 @@ class AWSSecretsManager(SecretsManagerBase):
                 continue
         return secrets
 
+    def _store(self, secret_name: str, version_stage: str, response: dict) -> Optional[str]:
+        if 'SecretString' in response:
+            value = parse_secret_string(response['SecretString'])
+        else:
+            logger.warning(f"Secret {secret_name} found but contains no string value")
+            value = None
+        self.cache.set(secret_name, version_stage, value, response.get('VersionId'))
+        return value
+
+    def _log_error(self, secret_name: str, e: ClientError):
+        if e.response['Error']['Code'] == 'ResourceNotFoundException':
+            logger.error(f"Secret {secret_name} not found")
+        elif e.response['Error']['Code'] == 'InvalidRequestException':
+            logger.error(f"Invalid request for secret {secret_name}")
+        elif e.response['Error']['Code'] == 'InvalidParameterException':
+            logger.error(f"Invalid parameter in request for secret {secret_name}")
+        else:
+            logger.error(f"Error accessing secret {secret_name}: {str(e)}")
+
 class LocalSecretsManager(SecretsManagerBase):
-    """Local secrets manager for development/testing"""
-    
+    """Local secrets manager for development/testing
+
+    The JSON file maps secret names either to a value or to values per
+    version stage ({"AWSCURRENT": ..., "AWSPENDING": ...}). It is reread
+    when it changes, so tests can simulate a rotation by rewriting it.
+    """
+
     def __init__(self, secrets_file: str = None):
         """
         Initialize local secrets manager
-        
+
         Args:
             secrets_file: Path to JSON file containing secrets (optional)
         """
+        self.secrets_file = secrets_file
         self.secrets = {}
-        if secrets_file and os.path.exists(secrets_file):
-            with open(secrets_file, 'r') as f:
+        self._mtime = None
+        self._reload()
+
+    def _reload(self):
+        if not self.secrets_file or not os.path.exists(self.secrets_file):
+            return
+        mtime = os.stat(self.secrets_file).st_mtime_ns
+        if mtime != self._mtime:
+            with open(self.secrets_file, 'r') as f:
                 self.secrets = json.load(f)
-                
-    def get_secret(self, secret_name: str) -> Optional[str]:
+            self._mtime = mtime
+
+    def get_secret(self, secret_name: str, version_stage: str = CURRENT_STAGE) -> Optional[str]:
         """Get secret from local storage"""
-        return self.secrets.get(secret_name)
-        
+        self._reload()
+        value = self.secrets.get(secret_name)
+        if isinstance(value, dict) and CURRENT_STAGE in value:
+            return value.get(version_stage)
+        return value if version_stage == CURRENT_STAGE else None
+
     def get_secrets(self, secret_names: list) -> Dict[str, str]:
         """Get multiple secrets from local storage"""
-        return {name: self.secrets.get(name) for name in secret_names if name in self.secrets}
+        values = {name: self.get_secret(name) for name in secret_names}
+        return {name: value for name, value in values.items() if value is not None}
+
+    def refresh(self, secret_name: str = None):
+        self._mtime = None
+        self._reload()
+
+_secrets_manager = None
+_secrets_manager_lock = threading.Lock()
 
 def get_secrets_manager() -> SecretsManagerBase:
     """
     Factory function to get appropriate secrets manager based on environment
-    
+
+    The instance is shared by the process, so its cache is too.
+
     Returns:
         SecretsManager instance
     """
-    env = os.getenv('FLASK_ENV', 'development')
-    if env == 'production':
-        return AWSSecretsManager()
-    else:
-        # For development and staging, use local secrets
-        secrets_file = os.getenv('LOCAL_SECRETS_FILE', '.secrets.json')
-        return LocalSecretsManager(secrets_file)
+    global _secrets_manager
+    with _secrets_manager_lock:
+        if _secrets_manager is None:
+            env = os.getenv('FLASK_ENV', 'development')
+            if env == 'production':
+                _secrets_manager = AWSSecretsManager()
+            else:
+                # For development and staging, use local secrets
+                secrets_file = os.getenv('LOCAL_SECRETS_FILE', '.secrets.json')
+                _secrets_manager = LocalSecretsManager(secrets_file)
+        return _secrets_manager
@@ -39,9 +39,20 @@ CREATE TABLE IF NOT EXISTS ml_model_versions (
     id SERIAL PRIMARY KEY,
     version VARCHAR(50) NOT NULL,
     model_path VARCHAR(255) NOT NULL,
+    model_type VARCHAR(100),
+    parameters JSON,
+    metrics JSON,
+    active BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Columns added to ml_model_versions for the model registry, for databases created before them
+ALTER TABLE ml_model_versions ADD COLUMN IF NOT EXISTS model_type VARCHAR(100);
+ALTER TABLE ml_model_versions ADD COLUMN IF NOT EXISTS parameters JSON;
+ALTER TABLE ml_model_versions ADD COLUMN IF NOT EXISTS metrics JSON;
+ALTER TABLE ml_model_versions ADD COLUMN IF NOT EXISTS active BOOLEAN DEFAULT FALSE;
+CREATE INDEX IF NOT EXISTS ix_ml_model_versions_active ON ml_model_versions (active);
+
 -- Findings table
 CREATE TABLE IF NOT EXISTS findings (
     id SERIAL PRIMARY KEY,
@@ -4,8 +4,22 @@ from unittest.mock import Mock, patch
 from models.score_history import ScoreHistory
 from scoring.rules_engine import RulesEngine
 from scoring.ml_engine import SecurityScorePredictor
+from scoring.model_registry import LoadedModel
 from scoring.score_service import SecurityScoreService
 
+@pytest.fixture(autouse=True)
+def scoring_state(monkeypatch):
+    """Isolate tests from the process-wide model registry and executors"""
+    from scoring import executors
+    from scoring.model_registry import model_registry
+    model_registry.clear()
+    executors.shutdown_executors()
+    # Score in-process, where mocked predictors are used
+    monkeypatch.setattr(executors, 'CPU_WORKERS', 0)
+    yield
+    model_registry.clear()
+    executors.shutdown_executors()
+
 @pytest.fixture
 def mock_session():
     return Mock()
@@ -22,7 +36,7 @@ def mock_ml_predictor(mock_session):
 
 @pytest.fixture
 def score_service(mock_session):
-    return SecurityScoreService(mock_session)
+    return SecurityScoreService(mock_session, session_factory=lambda: mock_session)
 
 def test_rules_engine_scoring():
     """Test rules-based scoring"""
@@ -183,3 +197,164 @@ def test_rules_engine_edge_cases():
     
     result = engine.compute_score(data)
     assert result['score'] == 100  # Should ignore negative values
+
+def _fitted_model():
+    import numpy as np
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+    X = np.array([[0] * 9, [1] * 9, [2] * 9])
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=5, random_state=42).fit(scaler.transform(X), [90, 70, 50])
+    return model, scaler
+
+def _session_with_active_version(version):
+    session = Mock()
+    session.query.return_value.filter_by.return_value.order_by.return_value.first.return_value = (version,)
+    return session
+
+def test_model_registry_loads_each_version_once(tmp_path):
+    """Test the active model is loaded from disk once and shared"""
+    import joblib
+    from scoring import model_registry as registry_module
+    from scoring.model_registry import ModelRegistry
+
+    model, scaler = _fitted_model()
+    joblib.dump(model, tmp_path / 'model_v1.joblib')
+    joblib.dump(scaler, tmp_path / 'scaler_v1.joblib')
+    session = _session_with_active_version('v1')
+    registry = ModelRegistry(refresh_interval=0)
+
+    with patch.object(registry_module, 'MODEL_DIR', str(tmp_path)), \
+            patch('scoring.model_registry.joblib.load', wraps=joblib.load) as load:
+        first = registry.get_active(session)
+        second = registry.get_active(session)
+
+    assert first.version == 'v1'
+    assert second is first
+    assert load.call_count == 2  # model and scaler, once
+
+def test_model_registry_activate_swaps_model():
+    """Test activating a new version replaces the shared model"""
+    from scoring.model_registry import ModelRegistry
+
+    registry = ModelRegistry(refresh_interval=60)
+    model, scaler = _fitted_model()
+    registry.activate('v2', model, scaler)
+    session = Mock()
+
+    active = registry.get_active(session)
+    assert active.version == 'v2'
+    assert active.model is model
+    session.query.assert_not_called()
+
+def test_predict_batch_matches_single_predictions():
+    """Test batch prediction returns the same scores as row by row"""
+    predictor = SecurityScorePredictor(Mock())
+    model, scaler = _fitted_model()
+    rows = [{'critical_vulns': i, 'high_vulns': i + 1} for i in range(3)]
+
+    with patch('scoring.ml_engine.model_registry') as registry:
+        registry.get_active.return_value = LoadedModel('v1', model, scaler)
+        batch = predictor.predict_batch(rows)
+        single = [predictor.predict(row) for row in rows]
+
+    assert batch == pytest.approx(single)
+    assert predictor.predict_batch([]) == []
+
+def test_score_rows_loads_saved_model_version(tmp_path):
+    """Test worker scoring loads a saved model version and matches the predictor"""
+    import joblib
+    from scoring import executors
+    from scoring import model_registry as registry_module
+
+    model, scaler = _fitted_model()
+    joblib.dump(model, tmp_path / 'model_v1.joblib')
+    joblib.dump(scaler, tmp_path / 'scaler_v1.joblib')
+    rows = [{'critical_vulns': 0}, {'critical_vulns': 3, 'high_vulns': 2}]
+
+    with patch.object(registry_module, 'MODEL_DIR', str(tmp_path)):
+        executors._worker_models.clear()
+        results = executors.score_rows('v1', rows)
+    executors._worker_models.clear()
+
+    expected = SecurityScorePredictor(Mock()).predict_batch(rows, LoadedModel('v1', model, scaler))
+    assert [ml_score for _, ml_score in results] == pytest.approx(expected)
+    assert [rules['score'] for rules, _ in results] == [RulesEngine().compute_score(row)['score'] for row in rows]
+
+@pytest.mark.asyncio
+async def test_compute_scores_batch_bulk_inserts_history(mock_session):
+    """Test batch scoring writes all score history rows in one insert"""
+    from scoring.score_memo import score_memo
+    score_memo.clear()
+    service = SecurityScoreService(mock_session, session_factory=lambda: mock_session)
+    service.ml_predictor.predict_batch = Mock(return_value=[80.0, 60.0])
+    service._latest_fingerprints = Mock(return_value={})
+    items = [(1, {'critical_vulns': 0}), (2, {'critical_vulns': 3})]
+
+    results = await service.compute_scores_batch(items)
+
+    assert [r['application_id'] for r in results] == [1, 2]
+    assert [r['ml_score'] for r in results] == [80.0, 60.0]
+    service.ml_predictor.predict_batch.assert_called_once()
+    mock_session.bulk_insert_mappings.assert_called_once()
+    rows = mock_session.bulk_insert_mappings.call_args[0][1]
+    assert [row['application_id'] for row in rows] == [1, 2]
+    mock_session.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_compute_scores_batch_skips_unchanged_scores(mock_session):
+    """Test memoized scores are reused and unchanged scores are not rewritten"""
+    from scoring.score_memo import score_memo
+    score_memo.clear()
+    service = SecurityScoreService(mock_session, session_factory=lambda: mock_session)
+    service.ml_predictor.predict_batch = Mock(return_value=[80.0])
+    data = {'critical_vulns': 0}
+    fingerprint = service._fingerprint(data, None)
+    service._latest_fingerprints = Mock(return_value={1: (41, fingerprint)})
+
+    results = await service.compute_scores_batch([(1, data), (2, dict(data))])
+
+    # Both applications share one fingerprint, so the model runs once
+    service.ml_predictor.predict_batch.assert_called_once()
+    assert service.ml_predictor.predict_batch.call_args[0][0] == [data]
+    assert results[0]['unchanged'] and results[0]['score_id'] == 41
+    assert not results[1]['unchanged']
+    rows = mock_session.bulk_insert_mappings.call_args[0][1]
+    assert [row['application_id'] for row in rows] == [2]
+
+    await service.compute_scores_batch([(1, data)])
+    stats = score_memo.stats()
+    assert stats['hits'] == 1
+    assert stats['writes_skipped'] == 2
+
+def test_save_version_ids_are_unique(tmp_path):
+    """Test versions saved within the same second get distinct files"""
+    from scoring import ml_engine
+    from scoring import model_registry as registry_module
+
+    model, scaler = _fitted_model()
+    predictor = SecurityScorePredictor(Mock())
+    with patch.object(registry_module, 'MODEL_DIR', str(tmp_path)), \
+            patch.object(ml_engine, 'MODEL_DIR', str(tmp_path)), \
+            patch.object(ml_engine, 'MLModelVersion', side_effect=lambda **columns: Mock(**columns)), \
+            patch('scoring.ml_engine.datetime') as clock:
+        clock.utcnow.return_value = datetime(2025, 1, 1, 12, 0, 0)
+        first = predictor.save_version(model, scaler, {}, activate=False)
+        second = predictor.save_version(model, scaler, {}, activate=False)
+
+    assert first.version != second.version
+    assert len(list(tmp_path.glob('model_*.joblib'))) == 2
+
+def test_training_evaluate_reports_holdout_metrics():
+    """Test holdout evaluation returns error, fit and latency metrics"""
+    import numpy as np
+    from scoring.training import evaluate
+
+    model, scaler = _fitted_model()
+    X = np.array([[0] * 9, [1] * 9, [2] * 9], dtype=float)
+    metrics = evaluate(model, scaler, X, np.array([90.0, 70.0, 50.0]))
+
+    assert metrics['holdout_rows'] == 3
+    assert metrics['mae'] >= 0
+    assert metrics['r2'] is not None
+    assert metrics['latency_ms'] > 0
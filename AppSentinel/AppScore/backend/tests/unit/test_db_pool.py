@@ -0,0 +1,66 @@
+import os
+import pytest
+from sqlalchemy import create_engine, exc
+from utils.db_pool import InstrumentedNullPool, InstrumentedQueuePool, PoolMetrics, engine_options, pool_metrics
+from utils import db_pool
+
+POSTGRES_URL = 'postgresql://user:pass@db:5432/appscore'
+SIBLING_DB_POOL = ('..', '..', '..', '..', 'AppInventory', 'backend', 'app', 'utils', 'db_pool.py')
+
+def test_engine_options_follow_profile_and_overrides(monkeypatch):
+    monkeypatch.delenv('DB_POOL_SIZE', raising=False)
+    options = engine_options(POSTGRES_URL, {'DB_POOL_PROFILE': 'worker', 'DB_POOL_TIMEOUT': '5'})
+
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_timeout']) == (2, 8, 5.0)
+    assert options['pool_pre_ping'] and options['pool_use_lifo']
+
+    monkeypatch.setenv('DB_POOL_SIZE', '12')
+    assert engine_options(POSTGRES_URL)['pool_size'] == 12
+
+def test_engine_options_for_pgbouncer_and_sqlite():
+    options = engine_options(POSTGRES_URL, {'DB_PGBOUNCER': 'true'})
+    assert options['poolclass'] is InstrumentedNullPool
+    assert 'pool_size' not in options
+
+    assert engine_options('sqlite:///app.db') == {}
+    with pytest.raises(ValueError):
+        engine_options(POSTGRES_URL, {'DB_POOL_PROFILE': 'huge'})
+
+def test_pool_metrics_count_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    before = pool_metrics.snapshot()
+
+    connection = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    state = pool_metrics.snapshot(engine)
+    connection.close()
+
+    assert state['checkouts'] == before['checkouts'] + 1
+    assert state['timeouts'] == before['timeouts'] + 1
+    assert state['checked_out'] == 1 and state['pool_size'] == 1
+    assert state['wait_ms']['max'] >= 50
+
+def test_pool_metrics_percentiles():
+    metrics = PoolMetrics()
+    for ms in range(1, 101):
+        metrics.record(ms / 1000)
+
+    waits = metrics.snapshot()['wait_ms']
+    assert (waits['p50'], waits['p95'], waits['max']) == (51.0, 96.0, 100.0)
+
+def _shared_part(path):
+    with open(path) as f:
+        source = f.read()
+    start = source.index('# Service-specific values.')
+    end = source.index('# End of service-specific values')
+    return source[:start] + source[end:]
+
+def test_copies_of_db_pool_match():
+    """The other service's copy of db_pool.py differs only in its service-specific values"""
+    sibling = os.path.join(os.path.dirname(os.path.abspath(__file__)), *SIBLING_DB_POOL)
+    if not os.path.exists(sibling):
+        pytest.skip('other service not checked out alongside this one')
+    assert _shared_part(db_pool.__file__) == _shared_part(sibling)
@@ -0,0 +1,41 @@
+import io
+from services.pdf_renderer import PDFReportRenderer, render_pdfs
+
+TEAM_REPORT = {
+    "team_name": "Platform",
+    "report_date": "2024-01-01T00:00:00",
+    "applications": [
+        {
+            "name": f"app-{i} ✓",
+            "description": None,
+            "security_score": 80 + i,
+            "last_scored": None,
+            "score_history": [{"score": 80 + i, "date": "2024-01-01T00:00:00"}]
+        }
+        for i in range(40)
+    ]
+}
+
+def test_render_team_report_returns_pdf_bytes():
+    pdf = PDFReportRenderer().render(TEAM_REPORT, "Team")
+    assert isinstance(pdf, bytes)
+    assert pdf.startswith(b"%PDF")
+
+def test_render_writes_to_output():
+    output = io.BytesIO()
+    assert PDFReportRenderer().render(TEAM_REPORT, "Team", output) is None
+    assert output.getvalue().startswith(b"%PDF")
+
+def test_render_pdfs_keeps_input_order():
+    application_report = {
+        "application_name": "billing",
+        "description": None,
+        "team": "Platform",
+        "current_score": 90,
+        "last_scored": None,
+        "score_history": [],
+        "report_date": "2024-01-01T00:00:00"
+    }
+    pdfs = render_pdfs([(TEAM_REPORT, "Team"), (application_report, "Application")], max_workers=1)
+    assert len(pdfs) == 2
+    assert len(pdfs[0]) > len(pdfs[1])
@@ -0,0 +1,68 @@
+import io
+import json
+import zipfile
+from unittest.mock import Mock
+from services.report_service import ReportService
+
+TEAM_REPORT = {"team_name": "Red Team", "report_date": "2024-01-01T00:00:00", "applications": []}
+
+def test_report_bundle_zips_reports_and_manifest():
+    service = ReportService(Mock())
+    service.generate_team_reports = Mock(return_value={"Red Team": TEAM_REPORT})
+    service.generate_application_reports = Mock(return_value={})
+    output = io.BytesIO()
+
+    manifest = service.build_report_bundle(output, team_names=["Red Team", "Missing"], report_format='json')
+
+    bundle = zipfile.ZipFile(output)
+    assert sorted(bundle.namelist()) == ["manifest.json", "teams/Red_Team.json"]
+    assert json.loads(bundle.read("teams/Red_Team.json"))["team_name"] == "Red Team"
+    assert manifest["not_found"] == ["Missing"]
+    service.generate_team_reports.assert_called_once_with(["Red Team", "Missing"])
+    service.generate_application_reports.assert_not_called()
+
+def test_report_bundle_defaults_to_all_teams():
+    service = ReportService(Mock())
+    service.generate_team_reports = Mock(return_value={"Red Team": TEAM_REPORT})
+    output = io.BytesIO()
+
+    manifest = service.build_report_bundle(output)
+
+    service.generate_team_reports.assert_called_once_with()
+    assert manifest["files"][0]["file"] == "teams/Red_Team.pdf"
+    assert zipfile.ZipFile(output).read("teams/Red_Team.pdf").startswith(b"%PDF")
+
+def test_report_bundle_dedupes_file_names_and_coerces_ids():
+    service = ReportService(Mock())
+    service.generate_team_reports = Mock(return_value={"Team A": TEAM_REPORT, "Team_A": TEAM_REPORT})
+    service.generate_application_reports = Mock(return_value={5: {"application_name": "api"}})
+    output = io.BytesIO()
+
+    manifest = service.build_report_bundle(output, team_names=["Team A", "Team_A"], app_ids=["5"],
+                                           report_format='json')
+
+    assert [entry["file"] for entry in manifest["files"]] == [
+        "teams/Team_A.json", "teams/Team_A_2.json", "applications/5_api.json"
+    ]
+    assert manifest["not_found"] == []
+    service.generate_application_reports.assert_called_once_with([5])
+
+def test_report_bundle_job_writes_zip_for_download(tmp_path, monkeypatch):
+    import time
+    from services import report_service
+
+    monkeypatch.setattr(report_service, 'BUNDLE_DIR', str(tmp_path))
+    monkeypatch.setattr(ReportService, 'generate_team_reports', lambda self, names=None: {"Red Team": TEAM_REPORT})
+    session = Mock()
+
+    job_id = report_service.submit_report_bundle(lambda: session, team_names=["Red Team"], report_format='json')
+    for _ in range(100):
+        job = report_service.get_report_bundle_job(job_id)
+        if job['status'] not in ('queued', 'running'):
+            break
+        time.sleep(0.01)
+
+    assert job['status'] == 'success' and job['files'] == 1
+    assert zipfile.ZipFile(job['path']).namelist() == ["teams/Red_Team.json", "manifest.json"]
+    session.close.assert_called_once()
+    assert report_service.get_report_bundle_job('unknown') is None
@@ -0,0 +1,30 @@
+from unittest.mock import Mock
+from services.report_cache import ReportCache
+
+def test_report_cache_reuses_snapshot_for_same_version():
+    cache = ReportCache()
+    build = Mock(return_value={'team_name': 'Red'})
+
+    first = cache.get_or_create(('team', 1, ('v1',), 'json'), build)
+    second = cache.get_or_create(('team', 1, ('v1',), 'json'), build)
+
+    assert first is second
+    build.assert_called_once()
+    assert cache.hits == 1 and cache.misses == 1
+
+def test_report_cache_drops_older_versions():
+    cache = ReportCache()
+    cache.get_or_create(('team', 1, ('v1',), 'json'), lambda: 'old')
+    cache.get_or_create(('team', 2, ('v1',), 'json'), lambda: 'other team')
+
+    assert cache.get_or_create(('team', 1, ('v2',), 'json'), lambda: 'new') == 'new'
+    assert ('team', 1, ('v1',), 'json') not in cache._entries
+    assert ('team', 2, ('v1',), 'json') in cache._entries
+
+def test_report_cache_evicts_least_recently_used():
+    cache = ReportCache(max_entries=2)
+    for team_id in range(3):
+        cache.get_or_create(('team', team_id, ('v1',), 'json'), lambda: team_id)
+
+    assert len(cache._entries) == 2
+    assert ('team', 0, ('v1',), 'json') not in cache._entries
@@ -0,0 +1,72 @@
+import json
+from unittest.mock import Mock
+import pytest
+from botocore.exceptions import ClientError
+from services.secrets_manager import AWSSecretsManager, LocalSecretsManager
+
+def _secret(value, version_id='v1'):
+    return {'SecretString': json.dumps(value), 'VersionId': version_id}
+
+def _client_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'GetSecretValue')
+
+def test_get_secret_is_cached_until_ttl_expires():
+    client = Mock()
+    client.get_secret_value.return_value = _secret({'password': 'old'})
+    manager = AWSSecretsManager(ttl=60, client=client)
+
+    assert manager.get_secret('db') == 'old'
+    assert manager.get_secret('db') == 'old'
+    client.get_secret_value.assert_called_once_with(SecretId='db', VersionStage='AWSCURRENT')
+
+    manager.cache.ttls['db'] = 0
+    client.get_secret_value.return_value = _secret({'password': 'new'}, 'v2')
+    manager.refresh('db')
+    assert manager.get_secret('db') == 'new'
+    assert manager.cache.get('db', 'AWSCURRENT', allow_expired=True) == ('new', 'v2')
+
+def test_get_secrets_fetches_misses_in_one_batch_call():
+    client = Mock()
+    client.get_secret_value.return_value = _secret({'token': 'cached'})
+    client.batch_get_secret_value.return_value = {
+        'SecretValues': [
+            {'Name': 'a', 'ARN': 'arn:a', 'SecretString': 'plain', 'VersionId': 'v1'},
+            {'Name': 'b', 'ARN': 'arn:b', 'SecretString': json.dumps({'user': 'u', 'password': 'p'})},
+        ],
+        'Errors': [{'SecretId': 'missing', 'ErrorCode': 'ResourceNotFoundException', 'Message': 'gone'}]
+    }
+    manager = AWSSecretsManager(ttl=60, client=client)
+    manager.get_secret('c')
+
+    secrets = manager.get_secrets(['a', 'b', 'c', 'missing'])
+
+    assert secrets == {'a': 'plain', 'b': json.dumps({'user': 'u', 'password': 'p'}), 'c': 'cached'}
+    client.batch_get_secret_value.assert_called_once_with(SecretIdList=['a', 'b', 'missing'])
+    assert manager.get_secrets(['a', 'b']) == {'a': 'plain', 'b': secrets['b']}
+    client.batch_get_secret_value.assert_called_once()
+
+def test_expired_value_is_served_through_transient_errors():
+    client = Mock()
+    client.get_secret_value.return_value = _secret({'token': 'value'})
+    manager = AWSSecretsManager(ttl=0, client=client)
+    manager.get_secret('db')
+
+    client.get_secret_value.side_effect = _client_error('ThrottlingException')
+    assert manager.get_secret('db') == 'value'
+
+    client.get_secret_value.side_effect = _client_error('ResourceNotFoundException')
+    with pytest.raises(ClientError):
+        manager.get_secret('db')
+
+def test_local_secrets_follow_file_rewrites_and_stages(tmp_path):
+    secrets_file = tmp_path / 'secrets.json'
+    secrets_file.write_text(json.dumps({'key': 'one', 'db': {'AWSCURRENT': 'current', 'AWSPENDING': 'pending'}}))
+    manager = LocalSecretsManager(str(secrets_file))
+
+    assert manager.get_secret('db') == 'current'
+    assert manager.get_secret('db', 'AWSPENDING') == 'pending'
+    assert manager.get_secret('key', 'AWSPENDING') is None
+
+    secrets_file.write_text(json.dumps({'key': 'two'}))
+    manager.refresh()
+    assert manager.get_secrets(['key', 'db']) == {'key': 'two'}
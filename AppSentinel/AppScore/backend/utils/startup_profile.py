@@ -0,0 +1,130 @@
+"""
+Startup profiling.
+
+With STARTUP_PROFILE=1 the application times every module import and
+each named initialization step, and logs the slowest of them once it is
+ready to serve. This is meant for finding what delays pod readiness; it
+adds a little overhead to imports, so it is off by default.
+"""
+
+import importlib.abc
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module's loader to time its execution"""
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.profiler._enter()
+        started = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler._leave(module.__name__, time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self.profiler)
+                return spec
+        return None
+
+class StartupProfiler:
+    """Import times per module (total and excluding nested imports) and init step times"""
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.steps = []
+        self._nested = []
+        self._finder = None
+
+    def install(self):
+        """Start timing imports made from now on"""
+        if self._finder is None:
+            self.enabled = True
+            self.started = time.perf_counter()
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def install_if_enabled(self):
+        if os.getenv('STARTUP_PROFILE', 'false').lower() in ('true', '1', 't'):
+            self.install()
+
+    def uninstall(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def _enter(self):
+        self._nested.append(0.0)
+
+    def _leave(self, name, elapsed):
+        nested = self._nested.pop()
+        if self._nested:
+            self._nested[-1] += elapsed
+        self.imports[name] = (elapsed, elapsed - nested)
+
+    @contextmanager
+    def step(self, name):
+        """Time an initialization step"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - started))
+
+    def summary(self, top=20):
+        """Startup time, init steps and the slowest imports, in milliseconds"""
+        by_self_time = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'modules_imported': len(self.imports),
+            'steps': [{'step': name, 'ms': round(elapsed * 1000, 1)} for name, elapsed in self.steps],
+            'imports': [
+                {'module': name, 'ms': round(total * 1000, 1), 'self_ms': round(own * 1000, 1)}
+                for name, (total, own) in by_self_time[:top]
+            ]
+        }
+
+    def report(self, top=20):
+        """Log the summary and stop timing imports"""
+        if not self.enabled:
+            return None
+        self.uninstall()
+        summary = self.summary(top)
+        logger.info(f"Startup took {summary['total_ms']} ms, {summary['modules_imported']} modules imported")
+        for step in summary['steps']:
+            logger.info(f"  step {step['step']}: {step['ms']} ms")
+        for module in summary['imports']:
+            logger.info(f"  import {module['module']}: {module['self_ms']} ms ({module['ms']} ms with imports)")
+        return summary
+
+startup_profiler = StartupProfiler()
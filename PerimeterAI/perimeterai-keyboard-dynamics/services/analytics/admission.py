@@ -0,0 +1,76 @@
+"""
+Admission control for the scoring endpoints.
+
+Scoring runs in a fixed number of slots per worker. Requests that find
+every slot busy wait in a short bounded queue; when the queue is full or
+the wait runs out they are shed, and the caller gets a fallback decision
+straight away instead of piling up behind a saturated worker.
+"""
+
+import functools
+import threading
+
+
+class AdmissionControl:
+    """At most max_in_flight requests scoring and max_queued waiting for a slot"""
+
+    def __init__(self, max_in_flight=32, max_queued=64, queue_timeout=0.05):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.queued = 0
+        self.shed = 0
+
+    def acquire(self):
+        """True once the request holds a slot, False if it should be shed"""
+        acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            with self._lock:
+                if self.queued >= self.max_queued:
+                    self.shed += 1
+                    return False
+                self.queued += 1
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                with self._lock:
+                    self.queued -= 1
+        with self._lock:
+            if acquired:
+                self.in_flight += 1
+            else:
+                self.shed += 1
+        return acquired
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'queued': self.queued,
+                'shed': self.shed,
+                'max_in_flight': self.max_in_flight,
+                'max_queued': self.max_queued
+            }
+
+
+def shed_load(admission, fallback):
+    """Run the view in an admission slot, or return fallback() if it is shed"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not admission.acquire():
+                return fallback()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                admission.release()
+        return wrapper
+    return decorator
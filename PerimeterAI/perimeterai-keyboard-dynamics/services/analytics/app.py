@@ -1,7 +1,16 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, make_response
 from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+import numpy as np
 import redis
 import os
+import time
+
+from admission import AdmissionControl, shed_load
+from keystroke_engine import FEATURE_NAMES, InsufficientKeystrokesError, extract_features, features_from_arrays, score
+from payloads import load_body, respond, sample_arrays, typing_events
+from profile_store import ProfileStore, start_flusher
+from session_store import SessionStore
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
@@ -10,18 +19,256 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 redis_client = redis.from_url(os.getenv('REDIS_URL'))
 
+RISK_MIDPOINT = float(os.getenv('RISK_MIDPOINT', 1.5))
+MIN_ENROLLMENT_SAMPLES = int(os.getenv('MIN_ENROLLMENT_SAMPLES', 3))
+PROFILE_FLUSH_INTERVAL = float(os.getenv('PROFILE_FLUSH_INTERVAL', 5))
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 1000))
+# Risk score returned when a request is shed under overload
+FALLBACK_RISK_SCORE = float(os.getenv('FALLBACK_RISK_SCORE', 0.5))
+WARM_PROFILES = int(os.getenv('WARM_PROFILES', 1000))
+
+
+class TypingProfile(db.Model):
+    """Durable copy of a user's typing profile, packed like the Redis value"""
+    __tablename__ = 'typing_profiles'
+
+    user_id = db.Column(db.String(255), primary_key=True)
+    sample_count = db.Column(db.Integer, nullable=False)
+    profile = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+profile_store = ProfileStore(
+    redis_client,
+    db.session,
+    TypingProfile,
+    max_local=int(os.getenv('PROFILE_LRU_SIZE', 10000)),
+    local_ttl=float(os.getenv('PROFILE_LOCAL_TTL', 30)),
+    redis_ttl=int(os.getenv('PROFILE_REDIS_TTL', 7 * 24 * 3600)),
+    max_samples=int(os.getenv('PROFILE_MAX_SAMPLES', 200)),
+    missing_ttl=int(os.getenv('PROFILE_MISSING_TTL', 300))
+)
+if PROFILE_FLUSH_INTERVAL > 0:
+    start_flusher(profile_store, app, PROFILE_FLUSH_INTERVAL)
+
+session_store = SessionStore(
+    redis_client,
+    window=int(os.getenv('STREAM_WINDOW', 200)),
+    ttl=int(os.getenv('STREAM_SESSION_TTL', 600))
+)
+admission = AdmissionControl(
+    max_in_flight=int(os.getenv('MAX_IN_FLIGHT', 32)),
+    max_queued=int(os.getenv('MAX_QUEUED', 64)),
+    queue_timeout=float(os.getenv('QUEUE_TIMEOUT', 0.05))
+)
+warmed_up = False
+
+
+def warm_up():
+    """Prepare a worker before it takes traffic: preload profiles and run the scoring path once"""
+    global warmed_up
+    started = time.perf_counter()
+    with app.app_context():
+        try:
+            profiles = profile_store.warm(WARM_PROFILES) if WARM_PROFILES > 0 else 0
+        except Exception as e:
+            app.logger.error(f"Error preloading typing profiles: {str(e)}")
+            profiles = 0
+    # The first NumPy percentile/stack calls pay one-off setup costs
+    events = [{'key': key, 'timestamp': i * 100.0 + offset, 'keydown': offset == 0}
+              for i, key in enumerate('warmup') for offset in (0, 60)]
+    features = extract_features(events)
+    score(np.vstack([features, features]), features, np.ones_like(features), RISK_MIDPOINT)
+    warmed_up = True
+    app.logger.info(f"Warmed up with {profiles} profiles in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def _shed():
+    """Fallback decision for requests shed under overload"""
+    response = make_response(respond(request, {
+        'status': 'degraded',
+        'risk_score': FALLBACK_RISK_SCORE,
+        'shed': True
+    }))
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def _score_many(user_ids, vectors):
+    """Results for feature vectors of many users, scored in one array operation"""
+    profiles = profile_store.get_many(user_ids)
+    results = [{'userId': user_id, 'risk_score': 0.5, 'enrolled': False} for user_id in user_ids]
+    enrolled = [i for i, user_id in enumerate(user_ids) if profiles[user_id] is not None]
+    if enrolled:
+        risk, distance = score(
+            np.stack([vectors[i] for i in enrolled]),
+            np.stack([profiles[user_ids[i]].mean for i in enrolled]),
+            np.stack([profiles[user_ids[i]].scale for i in enrolled]),
+            RISK_MIDPOINT
+        )
+        for i, risk_score, sample_distance in zip(enrolled, risk, distance):
+            results[i].update(risk_score=round(float(risk_score), 4), distance=round(float(sample_distance), 4),
+                              enrolled=True)
+    return results
+
+
 @app.route('/analyze', methods=['POST'])
+@shed_load(admission, _shed)
 def analyze_typing_pattern():
     try:
+        started = time.perf_counter()
         data = request.get_json()
-        # Add your keyboard dynamics analysis logic here
-        return jsonify({'status': 'success', 'risk_score': 0.5})
+        if data.get('userId') is None:
+            return jsonify({'error': 'userId is required'}), 400
+        user_id = str(data['userId'])
+        features = extract_features(typing_events(data))
+
+        profile = profile_store.get(user_id)
+        if profile is None:
+            # Nothing to compare against yet: neutral score
+            return jsonify({'status': 'success', 'risk_score': 0.5, 'enrolled': False})
+
+        risk_score, distance = score(features, profile.mean, profile.scale, RISK_MIDPOINT)
+        return jsonify({
+            'status': 'success',
+            'risk_score': round(float(risk_score), 4),
+            'distance': round(float(distance), 4),
+            'enrolled': True,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        })
+    except InsufficientKeystrokesError as e:
+        return jsonify({'error': str(e)}), 422
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/analyze/batch', methods=['POST'])
+@shed_load(admission, _shed)
+def analyze_batch():
+    """Score many samples: {"samples": [{"userId", "typingData" | "keys", "down", "timestamps"}, ...]}
+
+    Results come back in sample order; a sample that cannot be scored gets
+    an error entry instead of failing the batch.
+    """
+    try:
+        started = time.perf_counter()
+        samples = load_body(request).get('samples', [])
+        if len(samples) > MAX_BATCH_SIZE:
+            return respond(request, {'error': f'At most {MAX_BATCH_SIZE} samples per batch'}, 413)
+
+        results = [None] * len(samples)
+        scored, user_ids, vectors = [], [], []
+        for i, sample in enumerate(samples):
+            try:
+                user_id = str(sample['userId'])
+                vectors.append(features_from_arrays(*sample_arrays(sample)))
+                user_ids.append(user_id)
+                scored.append(i)
+            except (KeyError, TypeError, ValueError) as e:
+                results[i] = {'userId': sample.get('userId') if isinstance(sample, dict) else None, 'error': str(e)}
+
+        for i, result in zip(scored, _score_many(user_ids, vectors)):
+            results[i] = result
+        return respond(request, {
+            'status': 'success',
+            'results': results,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        })
+    except Exception as e:
+        return respond(request, {'error': str(e)}, 400)
+
+@app.route('/analyze/stream', methods=['POST'])
+@shed_load(admission, _shed)
+def analyze_stream():
+    """Score typing sessions incrementally as their events arrive.
+
+    Takes chunks for any number of sessions, {"chunks": [{"sessionId", "userId",
+    "typingData" | "keys", "down", "timestamps", "final"}, ...]}, and returns
+    each session's score over its most recent STREAM_WINDOW events. Sessions
+    still short of enough keystrokes get a null risk_score; "final" ends one.
+    """
+    try:
+        started = time.perf_counter()
+        chunks = load_body(request).get('chunks', [])
+        if len(chunks) > MAX_BATCH_SIZE:
+            return respond(request, {'error': f'At most {MAX_BATCH_SIZE} chunks per request'}, 413)
+
+        appended, users, finished, errors = [], {}, [], []
+        for chunk in chunks:
+            try:
+                session_id = str(chunk['sessionId'])
+                appended.append((session_id, sample_arrays(chunk, stable_ids=True)))
+                users[session_id] = str(chunk['userId'])
+                if chunk.get('final'):
+                    finished.append(session_id)
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append({'sessionId': chunk.get('sessionId') if isinstance(chunk, dict) else None,
+                               'error': str(e)})
+
+        windows = session_store.append(appended)
+        results, session_ids, vectors = [], [], []
+        for session_id, arrays in windows.items():
+            try:
+                vectors.append(features_from_arrays(*arrays))
+                session_ids.append(session_id)
+            except InsufficientKeystrokesError:
+                results.append({'sessionId': session_id, 'userId': users[session_id], 'risk_score': None,
+                                'events': int(arrays[0].size)})
+
+        for session_id, result in zip(session_ids, _score_many([users[s] for s in session_ids], vectors)):
+            results.append(dict(result, sessionId=session_id, events=int(windows[session_id][0].size)))
+        session_store.end(finished)
+        return respond(request, {
+            'status': 'success',
+            'results': results,
+            'errors': errors,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        })
+    except Exception as e:
+        return respond(request, {'error': str(e)}, 400)
+
+@app.route('/profiles/<user_id>/enroll', methods=['POST'])
+def enroll_profile(user_id):
+    """Build a user's profile from several typing samples: {"samples": [[events...], ...]}"""
+    try:
+        samples = request.get_json().get('samples', [])
+        if len(samples) < MIN_ENROLLMENT_SAMPLES:
+            return jsonify({'error': f'At least {MIN_ENROLLMENT_SAMPLES} samples are required'}), 400
+
+        profile = profile_store.enroll(user_id, [extract_features(events) for events in samples])
+        return jsonify({'status': 'success', 'userId': user_id, 'samples': profile.count, 'features': list(FEATURE_NAMES)})
+    except InsufficientKeystrokesError as e:
+        return jsonify({'error': str(e)}), 422
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/profiles/<user_id>/samples', methods=['POST'])
+def add_profile_sample(user_id):
+    """Fold the typing sample of a successful authentication into the user's profile"""
+    try:
+        profile = profile_store.update(user_id, extract_features(typing_events(request.get_json())))
+        if profile is None:
+            return jsonify({'error': f'User {user_id} is not enrolled'}), 404
+        return jsonify({'status': 'success', 'userId': user_id, 'samples': profile.count})
+    except InsufficientKeystrokesError as e:
+        return jsonify({'error': str(e)}), 422
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy'})
+    return jsonify({'status': 'healthy', 'warmed_up': warmed_up, 'admission': admission.stats()})
+
+@app.cli.command('init-db')
+def init_db():
+    """Create the typing profile table"""
+    db.create_all()
+
+@app.cli.command('flush-profiles')
+def flush_profiles():
+    """Persist pending profile updates from Redis to Postgres"""
+    print(f"Flushed {profile_store.flush()} profiles")
 
 if __name__ == '__main__':
+    # Development only; production runs under gunicorn (gunicorn.conf.py)
+    warm_up()
     app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,242 @@
+"""
+Benchmarks for the analytics service.
+
+    python benchmark.py --users 200 --samples 10 --requests 2000 --output bench.json
+
+Generates a synthetic keystroke dataset, measures feature extraction and
+scoring latency and memory in process, then load tests the /analyze and
+/analyze/batch endpoints on a local server. Redis and Postgres are
+replaced by fakeredis and SQLite unless --redis-url / --database-url are
+given. Results are written as JSON for comparison between runs.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import keystroke_engine
+
+KEYS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def generate_dataset(users, samples, keystrokes, seed=0):
+    """{user_id: [samples]} of event dicts, each user with their own typing rhythm"""
+    rng = np.random.default_rng(seed)
+    dataset = {}
+    for user in range(users):
+        dwell, flight = rng.uniform(60, 140), rng.uniform(100, 260)
+        jitter = rng.uniform(8, 30)
+        text = rng.choice(list(KEYS), size=keystrokes)
+        user_samples = []
+        for _ in range(samples):
+            press = 1000.0 + np.cumsum(np.maximum(rng.normal(flight, jitter, keystrokes), 20))
+            release = press + np.maximum(rng.normal(dwell, jitter, keystrokes), 10)
+            events = [{'key': key, 'timestamp': float(t), 'keydown': True} for key, t in zip(text, press)]
+            events += [{'key': key, 'timestamp': float(t), 'keydown': False} for key, t in zip(text, release)]
+            events.sort(key=lambda event: event['timestamp'])
+            user_samples.append(events)
+        dataset[f'user-{user}'] = user_samples
+    return dataset
+
+
+def latency_summary(seconds):
+    """Latency percentiles in milliseconds"""
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    if ms.size == 0:
+        return {'count': 0}
+    p50, p90, p99 = np.percentile(ms, (50, 90, 99))
+    return {
+        'count': int(ms.size),
+        'mean_ms': round(float(ms.mean()), 4),
+        'p50_ms': round(float(p50), 4),
+        'p90_ms': round(float(p90), 4),
+        'p99_ms': round(float(p99), 4),
+        'max_ms': round(float(ms.max()), 4)
+    }
+
+
+def _timed(function, items):
+    durations, results = [], []
+    for item in items:
+        started = time.perf_counter()
+        results.append(function(item))
+        durations.append(time.perf_counter() - started)
+    return durations, results
+
+
+def bench_engine(dataset, batch_size):
+    """Feature extraction and scoring latency and memory, in process"""
+    samples = [sample for user_samples in dataset.values() for sample in user_samples]
+    profiles = {user_id: keystroke_engine.build_profile([keystroke_engine.extract_features(sample)
+                                                         for sample in user_samples])
+                for user_id, user_samples in dataset.items()}
+    pairs = [(profiles[user_id], sample) for user_id, user_samples in dataset.items() for sample in user_samples]
+
+    extraction, features = _timed(keystroke_engine.extract_features, samples)
+    scoring, _ = _timed(lambda i: keystroke_engine.score(features[i], pairs[i][0].mean, pairs[i][0].scale),
+                        range(len(pairs)))
+
+    batch, batch_times = np.vstack(features), []
+    means = np.vstack([profile.mean for profile, _ in pairs])
+    scales = np.vstack([profile.scale for profile, _ in pairs])
+    for start in range(0, len(batch), batch_size):
+        rows = slice(start, start + batch_size)
+        started = time.perf_counter()
+        keystroke_engine.score(batch[rows], means[rows], scales[rows])
+        batch_times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    for sample in samples:
+        keystroke_engine.extract_features(sample)
+    _, extraction_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'samples': len(samples),
+        'events_per_sample': round(float(np.mean([len(sample) for sample in samples])), 1),
+        'extract_features': latency_summary(extraction),
+        'score': latency_summary(scoring),
+        'score_batch': dict(latency_summary(batch_times), batch_size=batch_size,
+                            samples_per_second=round(len(batch) / max(sum(batch_times), 1e-9))),
+        'extract_features_peak_kb': round(extraction_peak / 1024, 1),
+        'dataset_kb': round(sys.getsizeof(samples) / 1024 + sum(_events_size(sample) for sample in samples) / 1024, 1)
+    }
+
+
+def _events_size(events):
+    return sys.getsizeof(events) + sum(sys.getsizeof(event) for event in events)
+
+
+def _load_app(args):
+    """Import app.py against the benchmark's Redis and database"""
+    database = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+    os.environ.update(DATABASE_URL=database, REDIS_URL=args.redis_url or 'redis://localhost:6379/0',
+                      PROFILE_FLUSH_INTERVAL='0')
+    if not args.redis_url:
+        try:
+            import fakeredis
+        except ImportError:
+            sys.exit('fakeredis is required without --redis-url: pip install -r requirements-bench.txt')
+        import redis
+        server = fakeredis.FakeServer()
+        redis.from_url = lambda url, **kwargs: fakeredis.FakeStrictRedis(server=server)
+
+    import app as analytics
+    with analytics.app.app_context():
+        analytics.db.create_all()
+    return analytics
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+        return response.status
+
+
+def _run_load(url, payloads, concurrency):
+    durations, errors = [], 0
+
+    def _one(payload):
+        started = time.perf_counter()
+        try:
+            _post(url, payload)
+            return time.perf_counter() - started, False
+        except Exception:
+            return time.perf_counter() - started, True
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for duration, failed in pool.map(_one, payloads):
+            durations.append(duration)
+            errors += failed
+    elapsed = time.perf_counter() - started
+    return dict(latency_summary(durations), errors=errors, concurrency=concurrency,
+                requests_per_second=round(len(payloads) / elapsed, 1))
+
+
+def bench_load(dataset, args):
+    """Load test /analyze and /analyze/batch on a local threaded server"""
+    from werkzeug.serving import make_server
+
+    analytics = _load_app(args)
+    server = make_server('127.0.0.1', 0, analytics.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    try:
+        for user_id, user_samples in dataset.items():
+            _post(f'{base}/profiles/{user_id}/enroll', {'samples': user_samples})
+
+        rng = np.random.default_rng(args.seed + 1)
+        user_ids = list(dataset)
+        picks = [(user_ids[i], int(j)) for i, j in zip(rng.integers(len(user_ids), size=args.requests),
+                                                      rng.integers(args.samples, size=args.requests))]
+        samples = [{'userId': user_id, 'typingData': dataset[user_id][j]} for user_id, j in picks]
+
+        batches = [{'samples': samples[start:start + args.batch_size]}
+                   for start in range(0, len(samples), args.batch_size)]
+        analyze = _run_load(f'{base}/analyze', samples, args.concurrency)
+        batch = _run_load(f'{base}/analyze/batch', batches, args.concurrency)
+        batch['batch_size'] = args.batch_size
+        batch['samples_per_second'] = round(batch['requests_per_second'] * len(samples) / len(batches), 1)
+        return {'analyze': analyze, 'analyze_batch': batch,
+                'backend': {'redis': args.redis_url or 'fakeredis', 'database': 'sqlite' if not args.database_url
+                            else args.database_url.split(':', 1)[0]}}
+    finally:
+        server.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark keystroke feature extraction, scoring and the HTTP API')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--samples', type=int, default=10, help='samples per user')
+    parser.add_argument('--keystrokes', type=int, default=20, help='keystrokes per sample')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=2000, help='samples sent in the load test')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--redis-url', help='benchmark against this Redis instead of fakeredis')
+    parser.add_argument('--database-url', help='benchmark against this database instead of SQLite')
+    parser.add_argument('--skip-load', action='store_true', help='only run the in-process benchmarks')
+    parser.add_argument('--output', help='write results to this file as well as stdout')
+    args = parser.parse_args(argv)
+
+    dataset = generate_dataset(args.users, args.samples, args.keystrokes, args.seed)
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'database_url')},
+        'engine': bench_engine(dataset, args.batch_size)
+    }
+    if not args.skip_load:
+        results['load'] = bench_load(dataset, args)
+    # ru_maxrss is in kilobytes on Linux
+    results['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
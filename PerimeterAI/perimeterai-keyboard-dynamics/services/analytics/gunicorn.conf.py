@@ -0,0 +1,37 @@
+"""
+Production serving: gunicorn with gevent workers.
+
+Each worker multiplexes up to worker_connections requests on greenlets,
+so requests waiting on Redis or Postgres do not hold a process. Scoring
+itself is bounded per worker by the admission control in app.py, and
+connections beyond worker_connections wait in the listen backlog.
+
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+worker_class = 'gevent'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', 256))
+backlog = int(os.getenv('BACKLOG', 512))
+timeout = int(os.getenv('WORKER_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', 20))
+keepalive = int(os.getenv('KEEPALIVE', 5))
+# Import the app in each worker after gevent has patched the standard library
+preload_app = False
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    # Let psycopg2 yield to other greenlets while it waits on Postgres
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+
+def post_worker_init(worker):
+    # Runs before the worker accepts connections
+    from app import warm_up
+    warm_up()
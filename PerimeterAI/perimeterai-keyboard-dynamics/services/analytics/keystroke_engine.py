@@ -0,0 +1,177 @@
+"""
+Keystroke dynamics engine.
+
+Turns raw keydown/keyup event streams into timing features and scores them
+against a user's enrolled profile with the scaled Manhattan distance.
+Everything per sample is vectorized with NumPy, so scoring one login takes
+well under a millisecond and batches are scored in a single array operation.
+"""
+
+import zlib
+from typing import NamedTuple
+import numpy as np
+
+# Per-sample timing statistics, all in milliseconds except the rate
+TIMINGS = ('dwell', 'flight_dd', 'flight_ud')
+STATISTICS = ('mean', 'std', 'median', 'p10', 'p90')
+FEATURE_NAMES = tuple(f'{timing}_{stat}' for timing in TIMINGS for stat in STATISTICS) + ('keys_per_second',)
+FEATURE_COUNT = len(FEATURE_NAMES)
+
+MIN_KEYSTROKES = 4
+# Lower bound on a feature's spread, so near-constant features in a small
+# enrollment set cannot dominate the distance
+MIN_SCALE = np.array([5.0] * (len(TIMINGS) * len(STATISTICS)) + [0.25])
+# Distance, in average scaled deviations, at which the risk score is 0.5
+RISK_MIDPOINT = 1.5
+
+
+class InsufficientKeystrokesError(ValueError):
+    pass
+
+
+def event_columns(events):
+    """Split event dicts into parallel (keys, keydown flags, timestamps) columns.
+
+    Accepts the collector format ({key, timestamp, keydown}) and the API
+    format ({key, timestamp, eventType: keydown|keyup}).
+    """
+    count = len(events)
+    keys = [None] * count
+    down = np.empty(count, dtype=bool)
+    timestamps = np.empty(count, dtype=np.float64)
+    for i, event in enumerate(events):
+        keys[i] = event['key']
+        timestamps[i] = event['timestamp']
+        if 'keydown' in event:
+            down[i] = bool(event['keydown'])
+        else:
+            down[i] = event.get('eventType') == 'keydown'
+    return keys, down, timestamps
+
+
+def parse_columns(keys, down, timestamps, stable_ids=False):
+    """Convert parallel key, keydown flag and timestamp columns into arrays.
+
+    Integer keys are used as key ids as they are. Other keys are numbered
+    within the sample, or hashed with CRC-32 if stable_ids is set, so ids
+    agree between chunks of one typing session.
+    """
+    if not len(keys) == len(down) == len(timestamps):
+        raise ValueError('keys, down and timestamps must have the same length')
+    key_ids = np.asarray(keys)
+    if key_ids.dtype.kind not in 'iu':
+        if stable_ids:
+            key_ids = np.fromiter((zlib.crc32(str(key).encode()) for key in keys), dtype=np.int64, count=len(keys))
+        elif key_ids.size:
+            _, key_ids = np.unique(key_ids.astype(str), return_inverse=True)
+        else:
+            key_ids = np.empty(0, dtype=np.int64)
+    return key_ids, np.asarray(down, dtype=bool), np.asarray(timestamps, dtype=np.float64)
+
+
+def parse_events(events):
+    """(key ids, keydown flags, timestamps) arrays of event dicts"""
+    return parse_columns(*event_columns(events))
+
+
+def pair_keystrokes(key_ids, down, timestamps):
+    """Match each keyup with the keydown just before it on the same key.
+
+    Returns (press, release) time arrays ordered by press time. Auto-repeat
+    keydowns and unmatched events are dropped.
+    """
+    order = np.lexsort((~down, timestamps, key_ids))
+    key_ids, down, timestamps = key_ids[order], down[order], timestamps[order]
+    pairs = np.flatnonzero(down[:-1] & ~down[1:] & (key_ids[:-1] == key_ids[1:]))
+    press, release = timestamps[pairs], timestamps[pairs + 1]
+    by_press = np.argsort(press, kind='stable')
+    return press[by_press], release[by_press]
+
+
+def _statistics(values):
+    if values.size == 0:
+        return [np.nan] * len(STATISTICS)
+    p10, median, p90 = np.percentile(values, (10, 50, 90))
+    return [values.mean(), values.std(), median, p10, p90]
+
+
+def extract_features(events):
+    """Feature vector (FEATURE_NAMES order) of one typing sample"""
+    return features_from_arrays(*parse_events(events))
+
+
+def features_from_arrays(key_ids, down, timestamps):
+    """Feature vector of one typing sample given as parse_events arrays"""
+    press, release = pair_keystrokes(key_ids, down, timestamps)
+    if press.size < MIN_KEYSTROKES:
+        raise InsufficientKeystrokesError(
+            f"At least {MIN_KEYSTROKES} complete keystrokes are required, got {press.size}"
+        )
+
+    dwell = release - press
+    flight_dd = np.diff(press)
+    flight_ud = press[1:] - release[:-1]
+    duration = release.max() - press[0]
+
+    features = _statistics(dwell) + _statistics(flight_dd) + _statistics(flight_ud)
+    features.append(press.size / (duration / 1000.0) if duration > 0 else np.nan)
+    return np.asarray(features, dtype=np.float64)
+
+
+class Profile(NamedTuple):
+    """A user's typing profile: per-feature mean and sum of squared deviations (Welford)"""
+    count: int
+    mean: np.ndarray
+    m2: np.ndarray
+
+    @property
+    def scale(self):
+        return np.sqrt(self.m2 / max(self.count, 1))
+
+
+def build_profile(feature_matrix):
+    """Profile of enrollment samples (rows)"""
+    feature_matrix = np.atleast_2d(np.asarray(feature_matrix, dtype=np.float64))
+    mean = np.nanmean(feature_matrix, axis=0)
+    m2 = np.nansum((feature_matrix - mean) ** 2, axis=0)
+    return Profile(feature_matrix.shape[0], mean, m2)
+
+
+def update_profile(profile, features, max_samples=None):
+    """Fold one more sample into profile with Welford's online update.
+
+    Once max_samples is reached older samples are decayed, so the profile
+    follows gradual changes in the user's typing. Missing (NaN) features
+    leave that feature's moments unchanged.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    count, m2 = profile.count + 1, profile.m2
+    if max_samples and count > max_samples:
+        count = max_samples
+        m2 = m2 * (max_samples - 1) / max_samples
+    delta = np.where(np.isnan(features), 0.0, features - profile.mean)
+    mean = profile.mean + delta / count
+    m2 = m2 + delta * np.where(np.isnan(features), 0.0, features - mean)
+    return Profile(count, mean, m2)
+
+
+def scaled_manhattan(features, mean, scale):
+    """Average absolute deviation from the profile in units of each feature's spread.
+
+    features may be one vector or a (samples, features) matrix; features
+    missing from a sample (NaN) are left out of its average.
+    """
+    deviations = np.abs(np.asarray(features, dtype=np.float64) - mean) / np.maximum(scale, MIN_SCALE)
+    return np.nanmean(deviations, axis=-1)
+
+
+def risk_from_distance(distance, midpoint=RISK_MIDPOINT):
+    """Map a distance onto a 0..1 risk score; midpoint maps to 0.5"""
+    distance = np.asarray(distance, dtype=np.float64)
+    return distance / (distance + midpoint)
+
+
+def score(features, mean, scale, midpoint=RISK_MIDPOINT):
+    """(risk score, distance) of one sample or arrays of them for a batch"""
+    distance = scaled_manhattan(features, mean, scale)
+    return risk_from_distance(distance, midpoint), distance
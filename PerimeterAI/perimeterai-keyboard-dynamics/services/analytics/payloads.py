@@ -0,0 +1,44 @@
+"""
+Request and response encodings.
+
+Bodies are JSON, or msgpack when sent as application/msgpack. A typing
+sample carries its events either as event dicts (typingData) or in the
+columnar encoding: parallel keys, down and timestamps arrays, which is
+much smaller and faster to decode than one dict per event.
+"""
+
+import msgpack
+from flask import Response, jsonify
+
+from keystroke_engine import event_columns, parse_columns
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+
+def load_body(request):
+    """The decoded JSON or msgpack request body"""
+    if request.mimetype in MSGPACK_MIMETYPES:
+        return msgpack.unpackb(request.get_data(), raw=False)
+    return request.get_json()
+
+
+def respond(request, payload, status=200):
+    """payload encoded as msgpack if the client accepts it, JSON otherwise"""
+    if request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES) in MSGPACK_MIMETYPES:
+        return Response(msgpack.packb(payload, use_bin_type=True), status=status, mimetype=MSGPACK_MIMETYPE)
+    return jsonify(payload), status
+
+
+def typing_events(data):
+    events = data.get('typingData', data.get('keystrokes'))
+    if not isinstance(events, list):
+        raise ValueError('typingData must be a list of keystroke events')
+    return events
+
+
+def sample_arrays(sample, stable_ids=False):
+    """(key ids, keydown flags, timestamps) arrays of a sample in either encoding"""
+    if 'timestamps' in sample:
+        return parse_columns(sample['keys'], sample['down'], sample['timestamps'], stable_ids)
+    return parse_columns(*event_columns(typing_events(sample)), stable_ids=stable_ids)
@@ -0,0 +1,252 @@
+"""
+Typing profile storage.
+
+Profiles live in three tiers: an in-process LRU, Redis (shared by all
+workers) and Postgres (durable). Verification reads the LRU and Redis
+only; Postgres is read when a profile is missing from Redis and written
+in the background, so the login path never waits on it.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from keystroke_engine import FEATURE_COUNT, Profile, build_profile, update_profile
+
+KEY_PREFIX = 'kd:profile:'
+DIRTY_KEY = 'kd:profiles:dirty'
+# Stored in place of a profile for users Postgres has no profile for
+MISSING = b''
+# A profile packs count, mean and m2 as little-endian float64
+PACKED_DTYPE = np.dtype('<f8')
+PACKED_LENGTH = 1 + 2 * FEATURE_COUNT
+
+
+def pack_profile(profile):
+    return np.concatenate(([profile.count], profile.mean, profile.m2)).astype(PACKED_DTYPE).tobytes()
+
+
+def unpack_profile(data):
+    """Profile from pack_profile bytes, or None if they belong to another feature set"""
+    values = np.frombuffer(data, dtype=PACKED_DTYPE)
+    if values.size != PACKED_LENGTH:
+        return None
+    return Profile(int(values[0]), values[1:1 + FEATURE_COUNT].copy(), values[1 + FEATURE_COUNT:].copy())
+
+
+class ProfileStore:
+    """Reads, enrolls and updates typing profiles across the LRU, Redis and Postgres.
+
+    LRU entries expire after local_ttl seconds so workers pick up updates
+    made elsewhere. Misses are cached too, in the LRU and as a MISSING
+    marker in Redis for missing_ttl seconds, so unenrolled users do not
+    reach Postgres on every attempt. Updates are applied to Redis
+    atomically and queued for flush() to persist.
+    """
+
+    def __init__(self, redis_client, session, model, max_local=10000, local_ttl=30.0,
+                 redis_ttl=7 * 24 * 3600, max_samples=200, missing_ttl=300):
+        self.redis = redis_client
+        self.session = session
+        self.model = model
+        self.max_local = max_local
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.max_samples = max_samples
+        self.missing_ttl = missing_ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, user_id):
+        return f'{KEY_PREFIX}{user_id}'
+
+    def _remember(self, user_id, profile):
+        with self._lock:
+            self._local[user_id] = (time.monotonic() + self.local_ttl, profile)
+            self._local.move_to_end(user_id)
+            while len(self._local) > self.max_local:
+                self._local.popitem(last=False)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._local.pop(user_id, None)
+
+    def get(self, user_id):
+        """The user's profile, or None if not enrolled"""
+        with self._lock:
+            entry = self._local.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._local.move_to_end(user_id)
+                return entry[1]
+
+        data = self.redis.get(self._key(user_id))
+        if data is None:
+            profile = self._restore([user_id])[user_id]
+        else:
+            profile = unpack_profile(data) if data != MISSING else None
+        self._remember(user_id, profile)
+        return profile
+
+    def get_many(self, user_ids):
+        """{user_id: profile or None} for many users with at most one Redis round trip
+
+        Users missing from Redis are restored from Postgres with one query.
+        """
+        profiles, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for user_id in set(user_ids):
+                entry = self._local.get(user_id)
+                if entry is not None and entry[0] > now:
+                    self._local.move_to_end(user_id)
+                    profiles[user_id] = entry[1]
+                else:
+                    missing.append(user_id)
+
+        if missing:
+            values = self.redis.mget([self._key(user_id) for user_id in missing])
+            unknown = [user_id for user_id, data in zip(missing, values) if data is None]
+            restored = self._restore(unknown) if unknown else {}
+            for user_id, data in zip(missing, values):
+                if data is None:
+                    profile = restored[user_id]
+                else:
+                    profile = unpack_profile(data) if data != MISSING else None
+                self._remember(user_id, profile)
+                profiles[user_id] = profile
+        return profiles
+
+    def warm(self, limit):
+        """Preload the LRU with the most recently updated profiles; returns how many"""
+        try:
+            rows = (self.session.query(self.model.user_id)
+                    .order_by(self.model.updated_at.desc())
+                    .limit(min(limit, self.max_local))
+                    .all())
+        finally:
+            self.session.rollback()
+        # Read through Redis, which may hold updates not flushed to Postgres yet
+        profiles = self.get_many([user_id for user_id, in rows])
+        return sum(profile is not None for profile in profiles.values())
+
+    def enroll(self, user_id, feature_matrix):
+        """Replace the user's profile with one built from enrollment samples"""
+        profile = build_profile(feature_matrix)
+        self.redis.set(self._key(user_id), pack_profile(profile), ex=self.redis_ttl)
+        self._save([(user_id, profile)])
+        self._remember(user_id, profile)
+        return profile
+
+    def update(self, user_id, features):
+        """Fold a successfully authenticated sample into the user's profile.
+
+        Returns the updated profile, or None if the user is not enrolled.
+        """
+        key = self._key(user_id)
+
+        def _apply(pipe):
+            data = pipe.get(key)
+            current = unpack_profile(data) if data is not None else None
+            if current is None:
+                return None
+            profile = update_profile(current, features, self.max_samples)
+            pipe.multi()
+            pipe.set(key, pack_profile(profile), ex=self.redis_ttl)
+            pipe.sadd(DIRTY_KEY, user_id)
+            return profile
+
+        for _ in range(2):
+            # get() also copies a profile missing from Redis back from Postgres
+            if self.get(user_id) is None:
+                return None
+            # Optimistic transaction: retried if another worker updates the profile meanwhile
+            profile = self.redis.transaction(_apply, key, value_from_callable=True)
+            if profile is not None:
+                self._remember(user_id, profile)
+                return profile
+            # Expired from Redis since it was cached locally
+            self.forget(user_id)
+        return None
+
+    def flush(self, batch_size=500):
+        """Persist profiles updated since the last flush to Postgres; returns how many"""
+        flushed = 0
+        while True:
+            user_ids = [user_id.decode() if isinstance(user_id, bytes) else user_id
+                        for user_id in self.redis.spop(DIRTY_KEY, batch_size) or []]
+            if not user_ids:
+                return flushed
+            values = self.redis.mget([self._key(user_id) for user_id in user_ids])
+            unpacked = [(user_id, unpack_profile(data)) for user_id, data in zip(user_ids, values) if data is not None]
+            profiles = [(user_id, profile) for user_id, profile in unpacked if profile is not None]
+            try:
+                self._save(profiles)
+            except Exception:
+                # Leave them for the next flush
+                self.redis.sadd(DIRTY_KEY, *user_ids)
+                raise
+            flushed += len(profiles)
+
+    def _restore(self, user_ids):
+        """Copy profiles missing from Redis back from Postgres; {user_id: profile or None}
+
+        Users without a profile get a MISSING marker, so their next lookups
+        are answered by Redis until it expires or they enroll.
+        """
+        loaded = self._load(user_ids)
+        profiles = {user_id: loaded.get(str(user_id)) for user_id in user_ids}
+        pipe = self.redis.pipeline(transaction=False)
+        for user_id, profile in profiles.items():
+            # nx: keep a profile enrolled or updated in Redis meanwhile
+            if profile is not None:
+                pipe.set(self._key(user_id), pack_profile(profile), ex=self.redis_ttl, nx=True)
+            else:
+                pipe.set(self._key(user_id), MISSING, ex=self.missing_ttl, nx=True)
+        pipe.execute()
+        return profiles
+
+    def _load(self, user_ids):
+        try:
+            rows = (self.session.query(self.model.user_id, self.model.profile)
+                    .filter(self.model.user_id.in_([str(user_id) for user_id in user_ids]))
+                    .all())
+        finally:
+            # Do not keep a transaction open between requests
+            self.session.rollback()
+        profiles = {user_id: unpack_profile(data) for user_id, data in rows if data is not None}
+        return {user_id: profile for user_id, profile in profiles.items() if profile is not None}
+
+    def _save(self, profiles):
+        if not profiles:
+            return
+        try:
+            for user_id, profile in profiles:
+                self.session.merge(self.model(
+                    user_id=user_id,
+                    sample_count=profile.count,
+                    profile=pack_profile(profile),
+                    updated_at=datetime.utcnow()
+                ))
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+
+def start_flusher(store, app, interval):
+    """Flush profile updates to Postgres every interval seconds on a daemon thread"""
+    def _run():
+        while True:
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    store.flush()
+            except Exception as e:
+                app.logger.error(f"Error flushing typing profiles: {str(e)}")
+
+    thread = threading.Thread(target=_run, name='profile-flusher', daemon=True)
+    thread.start()
+    return thread
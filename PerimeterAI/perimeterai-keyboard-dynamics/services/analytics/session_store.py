@@ -0,0 +1,63 @@
+"""
+Typing session buffers for streaming scoring.
+
+Each session keeps its most recent events in a Redis list of packed
+(key id, keydown, timestamp) records, so any worker can score the next
+chunk of a session. Lists are trimmed to the scoring window and expire
+when the session goes quiet.
+"""
+
+import numpy as np
+
+KEY_PREFIX = 'kd:session:'
+RECORD_DTYPE = np.dtype('<f8')
+RECORD_FIELDS = 3
+
+
+def pack_events(key_ids, down, timestamps):
+    """One packed record per event"""
+    records = np.column_stack((key_ids, down, timestamps)).astype(RECORD_DTYPE)
+    return [record.tobytes() for record in records]
+
+
+def unpack_events(records):
+    """(key ids, keydown flags, timestamps) arrays of packed records"""
+    values = np.frombuffer(b''.join(records), dtype=RECORD_DTYPE).reshape(-1, RECORD_FIELDS)
+    return values[:, 0].astype(np.int64), values[:, 1].astype(bool), values[:, 2].copy()
+
+
+class SessionStore:
+    """Appends event chunks to typing sessions and returns their scoring windows"""
+
+    def __init__(self, redis_client, window=200, ttl=600):
+        self.redis = redis_client
+        self.window = window
+        self.ttl = ttl
+
+    def _key(self, session_id):
+        return f'{KEY_PREFIX}{session_id}'
+
+    def append(self, chunks):
+        """Append [(session_id, (key ids, down, timestamps))] in one round trip.
+
+        Returns {session_id: arrays of its last window events}.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        sessions = []
+        for session_id, arrays in chunks:
+            key = self._key(session_id)
+            if arrays[0].size:
+                pipe.rpush(key, *pack_events(*arrays))
+            if session_id not in sessions:
+                sessions.append(session_id)
+        for session_id in sessions:
+            key = self._key(session_id)
+            pipe.ltrim(key, -self.window, -1)
+            pipe.expire(key, self.ttl)
+            pipe.lrange(key, 0, -1)
+        replies = pipe.execute()[-3 * len(sessions):]
+        return {session_id: unpack_events(records) for session_id, records in zip(sessions, replies[2::3])}
+
+    def end(self, session_ids):
+        if session_ids:
+            self.redis.delete(*[self._key(session_id) for session_id in session_ids])
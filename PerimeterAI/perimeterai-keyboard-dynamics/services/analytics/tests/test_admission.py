@@ -0,0 +1,44 @@
+import threading
+from admission import AdmissionControl, shed_load
+
+def test_requests_are_shed_when_slots_and_queue_are_full():
+    admission = AdmissionControl(max_in_flight=1, max_queued=0, queue_timeout=0.01)
+
+    assert admission.acquire()
+    assert not admission.acquire()
+    assert admission.stats() == {'in_flight': 1, 'queued': 0, 'shed': 1, 'max_in_flight': 1, 'max_queued': 0}
+
+    admission.release()
+    assert admission.acquire()
+    admission.release()
+    assert admission.stats()['in_flight'] == 0
+
+def test_queued_request_is_shed_after_timeout():
+    admission = AdmissionControl(max_in_flight=1, max_queued=1, queue_timeout=0.01)
+    admission.acquire()
+
+    assert not admission.acquire()
+    assert admission.stats()['shed'] == 1 and admission.stats()['queued'] == 0
+
+def test_queued_request_gets_released_slot():
+    admission = AdmissionControl(max_in_flight=1, max_queued=1, queue_timeout=5)
+    admission.acquire()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(admission.acquire()))
+    waiter.start()
+    while admission.stats()['queued'] == 0:
+        pass
+
+    admission.release()
+    waiter.join()
+    assert result == [True]
+    assert admission.stats()['in_flight'] == 1 and admission.stats()['shed'] == 0
+
+def test_shed_load_returns_fallback():
+    admission = AdmissionControl(max_in_flight=1, max_queued=0)
+    view = shed_load(admission, lambda: 'fallback')(lambda: 'scored')
+
+    assert view() == 'scored'
+    admission.acquire()
+    assert view() == 'fallback'
+    assert admission.stats()['shed'] == 1
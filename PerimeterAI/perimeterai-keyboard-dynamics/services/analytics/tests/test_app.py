@@ -0,0 +1,139 @@
+import sys
+import msgpack
+import numpy as np
+import pytest
+
+def _events(rng, text='the quick brown fox'):
+    press = np.cumsum(rng.normal(160.0, 15.0, len(text)))
+    release = press + rng.normal(90.0, 8.0, len(text))
+    events = [{'key': key, 'timestamp': float(t), 'keydown': True} for key, t in zip(text, press)]
+    events += [{'key': key, 'timestamp': float(t), 'keydown': False} for key, t in zip(text, release)]
+    return sorted(events, key=lambda event: event['timestamp'])
+
+def _columns(events):
+    return {
+        'keys': [event['key'] for event in events],
+        'down': [event['keydown'] for event in events],
+        'timestamps': [event['timestamp'] for event in events]
+    }
+
+@pytest.fixture(scope='module')
+def analytics(tmp_path_factory):
+    """app.py on fakeredis and SQLite, as benchmark.py runs it"""
+    import fakeredis
+    import redis
+
+    mp = pytest.MonkeyPatch()
+    mp.setenv('DATABASE_URL', f"sqlite:///{tmp_path_factory.mktemp('analytics') / 'analytics.db'}")
+    mp.setenv('REDIS_URL', 'redis://localhost:6379/0')
+    mp.setenv('PROFILE_FLUSH_INTERVAL', '0')
+    server = fakeredis.FakeServer()
+    mp.setattr(redis, 'from_url', lambda url, **kwargs: fakeredis.FakeStrictRedis(server=server))
+    sys.modules.pop('app', None)
+    import app as analytics
+    mp.undo()
+    with analytics.app.app_context():
+        analytics.db.create_all()
+    yield analytics
+    sys.modules.pop('app', None)
+
+@pytest.fixture
+def client(analytics):
+    analytics.redis_client.flushall()
+    analytics.profile_store._local.clear()
+    with analytics.app.app_context():
+        analytics.TypingProfile.query.delete()
+        analytics.db.session.commit()
+    return analytics.app.test_client()
+
+@pytest.fixture
+def enrolled(client):
+    rng = np.random.default_rng(1)
+    response = client.post('/profiles/alice/enroll', json={'samples': [_events(rng) for _ in range(5)]})
+    assert response.status_code == 200
+    return rng
+
+def test_analyze_scores_enrolled_user(client, enrolled):
+    response = client.post('/analyze', json={'userId': 'alice', 'typingData': _events(enrolled)})
+
+    assert response.status_code == 200
+    assert response.json['enrolled'] is True
+    assert 0 <= response.json['risk_score'] < 0.5
+
+    response = client.post('/analyze', json={'userId': 'bob', 'typingData': _events(enrolled)})
+    assert response.json == {'status': 'success', 'risk_score': 0.5, 'enrolled': False}
+
+def test_analyze_rejects_bad_requests(client):
+    rng = np.random.default_rng(2)
+
+    response = client.post('/analyze', json={'typingData': _events(rng)})
+    assert response.status_code == 400 and response.json['error'] == 'userId is required'
+    assert client.post('/analyze', json={'userId': 'alice', 'typingData': _events(rng, 'ab')}).status_code == 422
+
+def test_batch_scores_samples_in_order(client, enrolled):
+    samples = [
+        {'userId': 'alice', 'typingData': _events(enrolled)},
+        {'userId': 'bob', **_columns(_events(enrolled))},
+        {'typingData': _events(enrolled)},
+        {'userId': 'alice', **_columns(_events(enrolled))}
+    ]
+    response = client.post('/analyze/batch', json={'samples': samples})
+
+    results = response.json['results']
+    assert response.status_code == 200
+    assert [result.get('userId') for result in results] == ['alice', 'bob', None, 'alice']
+    assert results[0]['enrolled'] and results[3]['enrolled'] and not results[1]['enrolled']
+    assert 'error' in results[2]
+
+def test_batch_speaks_msgpack(client, enrolled):
+    body = msgpack.packb({'samples': [{'userId': 'alice', **_columns(_events(enrolled))}]})
+    response = client.post('/analyze/batch', data=body, content_type='application/msgpack',
+                           headers={'Accept': 'application/msgpack'})
+
+    assert response.mimetype == 'application/msgpack'
+    payload = msgpack.unpackb(response.data, raw=False)
+    assert payload['results'][0]['userId'] == 'alice' and payload['results'][0]['enrolled']
+
+def test_batch_size_is_limited(client, analytics, monkeypatch):
+    monkeypatch.setattr(analytics, 'MAX_BATCH_SIZE', 1)
+    response = client.post('/analyze/batch', json={'samples': [{}, {}]})
+    assert response.status_code == 413
+
+def test_stream_scores_sessions_as_events_arrive(client, enrolled):
+    events = _columns(_events(enrolled))
+    first = {key: values[:4] for key, values in events.items()}
+    rest = {key: values[4:] for key, values in events.items()}
+
+    response = client.post('/analyze/stream', json={'chunks': [{'sessionId': 's1', 'userId': 'alice', **first}]})
+    assert response.json['results'] == [{'sessionId': 's1', 'userId': 'alice', 'risk_score': None, 'events': 4}]
+
+    response = client.post('/analyze/stream', json={'chunks': [
+        {'sessionId': 's1', 'userId': 'alice', 'final': True, **rest},
+        {'userId': 'alice', **rest}
+    ]})
+    result, = response.json['results']
+    assert result['sessionId'] == 's1' and result['enrolled'] and result['events'] == len(events['keys'])
+    assert response.json['errors'][0]['sessionId'] is None
+
+    # The final chunk ended the session
+    response = client.post('/analyze/stream', json={'chunks': [{'sessionId': 's1', 'userId': 'alice', **first}]})
+    assert response.json['results'][0]['events'] == 4
+
+def test_requests_are_shed_when_saturated(client, analytics, monkeypatch):
+    admission = analytics.admission
+    monkeypatch.setattr(admission, 'max_queued', 0)
+    held = [admission.acquire() for _ in range(admission.max_in_flight)]
+    assert all(held)
+    try:
+        response = client.post('/analyze', json={'userId': 'alice', 'typingData': []})
+        assert response.status_code == 200
+        assert response.headers['Retry-After'] == '1'
+        assert response.json == {'status': 'degraded', 'risk_score': analytics.FALLBACK_RISK_SCORE, 'shed': True}
+
+        response = client.post('/analyze/batch', data=msgpack.packb({'samples': []}),
+                               content_type='application/msgpack', headers={'Accept': 'application/msgpack'})
+        assert msgpack.unpackb(response.data, raw=False)['shed'] is True
+    finally:
+        for _ in held:
+            admission.release()
+    assert client.post('/analyze/batch', json={'samples': []}).json['results'] == []
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from keystroke_engine import (
+    FEATURE_COUNT, InsufficientKeystrokesError, build_profile, features_from_arrays, pair_keystrokes,
+    parse_events, update_profile
+)
+
+def _typed(keys, start=0.0, dwell=80.0, gap=150.0):
+    events = []
+    for i, key in enumerate(keys):
+        press = start + i * gap
+        events.append({'key': key, 'timestamp': press, 'keydown': True})
+        events.append({'key': key, 'timestamp': press + dwell, 'keydown': False})
+    return events
+
+def test_pairing_drops_auto_repeat_and_unmatched_events():
+    events = [
+        {'key': 'a', 'timestamp': 0, 'eventType': 'keydown'},
+        {'key': 'a', 'timestamp': 30, 'eventType': 'keydown'},
+        {'key': 'a', 'timestamp': 60, 'eventType': 'keydown'},
+        {'key': 'b', 'timestamp': 70, 'eventType': 'keydown'},
+        {'key': 'a', 'timestamp': 80, 'eventType': 'keyup'},
+        {'key': 'b', 'timestamp': 120, 'eventType': 'keyup'},
+        {'key': 'c', 'timestamp': 130, 'eventType': 'keyup'},
+        {'key': 'd', 'timestamp': 140, 'eventType': 'keydown'}
+    ]
+    press, release = pair_keystrokes(*parse_events(events))
+
+    # The keyup pairs with the last repeat, not the first keydown
+    assert press.tolist() == [60, 70]
+    assert release.tolist() == [80, 120]
+
+def test_pairing_orders_keystrokes_by_press_time():
+    events = _typed('abc') + [{'key': 'a', 'timestamp': 1000, 'keydown': True},
+                              {'key': 'a', 'timestamp': 1050, 'keydown': False}]
+    press, release = pair_keystrokes(*parse_events(events))
+
+    assert press.tolist() == [0, 150, 300, 1000]
+    assert (release - press).tolist() == [80, 80, 80, 50]
+
+def test_features_need_enough_keystrokes():
+    with pytest.raises(InsufficientKeystrokesError):
+        features_from_arrays(*parse_events(_typed('abc')))
+
+    features = features_from_arrays(*parse_events(_typed('abcd')))
+    assert features.shape == (FEATURE_COUNT,)
+    assert features[0] == 80.0
+
+def test_profile_ignores_missing_features():
+    samples = np.array([[1.0, np.nan], [3.0, 10.0], [5.0, 20.0]])
+    profile = build_profile(samples)
+
+    assert profile.count == 3
+    np.testing.assert_allclose(profile.mean, [3.0, 15.0])
+    np.testing.assert_allclose(profile.m2, [8.0, 50.0])
+
+    updated = update_profile(profile, [np.nan, 25.0])
+    assert updated.count == 4
+    np.testing.assert_allclose(updated.mean, [3.0, 17.5])
+    np.testing.assert_allclose(updated.m2[0], profile.m2[0])
+
+def test_online_updates_match_batch_profile():
+    samples = np.random.default_rng(7).normal(100.0, 20.0, size=(40, FEATURE_COUNT))
+    profile = build_profile(samples[:5])
+    for row in samples[5:]:
+        profile = update_profile(profile, row, max_samples=1000)
+    expected = build_profile(samples)
+
+    assert profile.count == expected.count
+    np.testing.assert_allclose(profile.mean, expected.mean)
+    np.testing.assert_allclose(profile.m2, expected.m2)
+    np.testing.assert_allclose(profile.scale, samples.std(axis=0))
+
+def test_updates_decay_once_max_samples_is_reached():
+    profile = build_profile(np.zeros((10, FEATURE_COUNT)))
+    for _ in range(5):
+        profile = update_profile(profile, np.full(FEATURE_COUNT, 10.0), max_samples=10)
+
+    assert profile.count == 10
+    # Newer samples weigh more than in a plain average over all 15
+    assert (profile.mean > 10.0 * 5 / 15).all()
@@ -0,0 +1,106 @@
+import fakeredis
+import numpy as np
+import pytest
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, create_engine, event
+from sqlalchemy.orm import Session, declarative_base
+from keystroke_engine import FEATURE_COUNT, build_profile
+from profile_store import DIRTY_KEY, MISSING, ProfileStore, pack_profile, unpack_profile
+
+Base = declarative_base()
+
+class TypingProfile(Base):
+    __tablename__ = 'typing_profiles'
+
+    user_id = Column(String(255), primary_key=True)
+    sample_count = Column(Integer, nullable=False)
+    profile = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    return engine
+
+@pytest.fixture
+def store(engine):
+    session = Session(engine)
+    yield ProfileStore(fakeredis.FakeRedis(), session, TypingProfile, local_ttl=0)
+    session.close()
+
+def _samples(seed, rows=5):
+    return np.random.default_rng(seed).normal(100.0, 20.0, size=(rows, FEATURE_COUNT))
+
+def _count_queries(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+def test_pack_round_trip():
+    profile = build_profile(_samples(1))
+    unpacked = unpack_profile(pack_profile(profile))
+
+    assert unpacked.count == profile.count
+    np.testing.assert_array_equal(unpacked.mean, profile.mean)
+    np.testing.assert_array_equal(unpacked.m2, profile.m2)
+
+def test_unpack_rejects_other_feature_sets():
+    assert unpack_profile(np.zeros(5, dtype='<f8').tobytes()) is None
+    assert unpack_profile(MISSING) is None
+
+def test_enrolled_profile_is_restored_from_postgres(store):
+    enrolled = store.enroll('u1', _samples(1))
+    store.redis.flushall()
+
+    restored = store.get('u1')
+    assert restored.count == enrolled.count
+    np.testing.assert_allclose(restored.mean, enrolled.mean)
+    assert store.redis.get('kd:profile:u1') == pack_profile(enrolled)
+
+def test_unenrolled_users_are_answered_from_redis(store, engine):
+    statements = _count_queries(engine)
+
+    assert store.get('nobody') is None
+    assert store.redis.get('kd:profile:nobody') == MISSING
+    assert 0 < store.redis.ttl('kd:profile:nobody') <= store.missing_ttl
+
+    statements.clear()
+    assert store.get('nobody') is None
+    assert statements == []
+
+def test_get_many_restores_misses_in_one_query(store, engine):
+    for user_id in ('u1', 'u2'):
+        store.enroll(user_id, _samples(user_id == 'u1'))
+    store.redis.flushall()
+    statements = _count_queries(engine)
+
+    profiles = store.get_many(['u1', 'u2', 'u3', 'u4'])
+
+    assert len([s for s in statements if s.lstrip().upper().startswith('SELECT')]) == 1
+    assert profiles['u1'].count == profiles['u2'].count == 5
+    assert profiles['u3'] is None and profiles['u4'] is None
+
+def test_update_folds_sample_and_flushes(store, engine):
+    samples = _samples(2, rows=6)
+    store.enroll('u1', samples[:5])
+
+    updated = store.update('u1', samples[5])
+    assert updated.count == 6
+    assert store.redis.smembers(DIRTY_KEY) == {b'u1'}
+    assert store.update('nobody', samples[5]) is None
+
+    assert store.flush() == 1
+    with Session(engine) as session:
+        assert session.get(TypingProfile, 'u1').sample_count == 6
+
+def test_flush_counts_only_saved_profiles(store, engine):
+    store.enroll('u1', _samples(3))
+    store.redis.sadd(DIRTY_KEY, 'u1', 'stale', 'gone')
+    # A value from another feature set, and a user whose profile expired
+    store.redis.set('kd:profile:stale', np.zeros(5, dtype='<f8').tobytes())
+
+    assert store.flush() == 1
+    assert store.redis.scard(DIRTY_KEY) == 0
+    with Session(engine) as session:
+        assert session.query(TypingProfile).count() == 1
@@ -0,0 +1,37 @@
+import fakeredis
+import numpy as np
+from session_store import SessionStore, pack_events, unpack_events
+
+def _chunk(start, count):
+    timestamps = np.arange(start, start + count, dtype=np.float64) * 10
+    return np.arange(start, start + count), np.arange(count) % 2 == 0, timestamps
+
+def test_pack_round_trip():
+    key_ids, down, timestamps = unpack_events(pack_events(*_chunk(0, 4)))
+
+    assert key_ids.tolist() == [0, 1, 2, 3]
+    assert down.tolist() == [True, False, True, False]
+    assert timestamps.tolist() == [0.0, 10.0, 20.0, 30.0]
+
+def test_append_keeps_the_last_window_events():
+    store = SessionStore(fakeredis.FakeRedis(), window=5, ttl=60)
+
+    windows = store.append([('s1', _chunk(0, 3)), ('s2', _chunk(100, 2))])
+    assert windows['s1'][0].tolist() == [0, 1, 2]
+    assert windows['s2'][0].tolist() == [100, 101]
+
+    # A session appearing twice in one call is returned once
+    windows = store.append([('s1', _chunk(3, 2)), ('s1', _chunk(5, 2))])
+    assert list(windows) == ['s1']
+    assert windows['s1'][0].tolist() == [2, 3, 4, 5, 6]
+    assert 0 < store.redis.ttl('kd:session:s1') <= 60
+
+def test_empty_chunk_returns_current_window_and_end_clears_it():
+    store = SessionStore(fakeredis.FakeRedis(), window=5)
+    store.append([('s1', _chunk(0, 2))])
+
+    windows = store.append([('s1', _chunk(0, 0))])
+    assert windows['s1'][0].tolist() == [0, 1]
+
+    store.end(['s1'])
+    assert store.append([('s1', _chunk(0, 0))])['s1'][0].size == 0